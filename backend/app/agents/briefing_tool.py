@@ -0,0 +1,60 @@
+import asyncio
+from typing import Any, Dict
+from starlette.concurrency import run_in_threadpool
+from app.core.metrics import instrument_tool, timed_phase
+from app.core.names import normalize_hcp_name
+from app.core.single_flight import single_flight
+from app.database import with_session
+from .fetch_hcp_history_tool import fetch_hcp_history_snapshot
+from .summarize_history_tool import generate_summary
+from .suggest_next_action_tool import generate_suggestions
+
+
+@single_flight(
+    "briefing_tool",
+    key_fn=lambda hcp_name, history_limit=5, exact_name=False: (normalize_hcp_name(hcp_name), history_limit, exact_name),
+)
+@instrument_tool("briefing_tool")
+async def briefing_tool(hcp_name: str, history_limit: int = 5, exact_name: bool = False) -> Dict[str, Any]:
+    """
+    Builds a pre-meeting briefing for one HCP: the AI summary, the AI suggestions
+    and the most recent interactions.
+
+    The history is fetched once and both generations run concurrently on it, so a
+    page load costs one DB read and the time of the slower LLM call. If one of the
+    generations fails, the other is still returned and the failure is listed
+    under `errors`. `exact_name` limits the history to this exact HCP rather than
+    every name containing it.
+    """
+    with timed_phase("briefing_tool", "history"):
+        history_result = await run_in_threadpool(
+            with_session, fetch_hcp_history_snapshot, hcp_name,
+            page_size=max(history_limit, 5), exact_name=exact_name,
+        )
+    if history_result["status"] == "error":
+        return history_result
+
+    interactions = history_result["data"]
+    summary, suggestions = await asyncio.gather(
+        generate_summary(hcp_name, interactions),
+        generate_suggestions(hcp_name, interactions),
+    )
+
+    errors = {}
+    if summary["status"] == "error":
+        errors["summary"] = summary["message"]
+    if suggestions["status"] == "error":
+        errors["suggestions"] = suggestions["message"]
+    if len(errors) == 2:
+        return {"status": "error", "message": f"AI briefing generation failed: {errors['summary']}"}
+
+    return {
+        "status": "success",
+        "data": {
+            "hcp_name": hcp_name,
+            "summary": summary.get("data"),
+            "suggestions": suggestions.get("data", {}).get("suggestions"),
+            "recent_history": interactions[:history_limit],
+            "errors": errors,
+        },
+    }
@@ -1,19 +1,19 @@
 import json
 import re
-from typing import Dict, Any
-from langchain_groq import ChatGroq
-from app.core.config import settings
+import time
+from typing import AsyncIterator, Dict, Any
+from app.core.llm import ainvoke_llm, astream_llm
+from app.core.metrics import instrument_tool, record_json_parse_failure, timed_phase
 from datetime import date
 
-llm = ChatGroq(temperature=0, model_name="gemma2-9b-it", groq_api_key=settings.GROQ_API_KEY)
+# Minimum gap between progress events on the streaming endpoint.
+PROGRESS_INTERVAL_SECONDS = 0.25
 
-def conversation_tool(user_message: str, current_data: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Analyzes a user message to extract partial updates using Chain-of-Thought reasoning,
-    then merges them with the current data context in Python for 100% reliability.
-    """
+def _build_prompt(user_message: str, current_data: Dict[str, Any]) -> str:
     today = date.today().strftime('%Y-%m-%d')
-    context_str = json.dumps(current_data, indent=2)
+    # Compact context: empty fields carry no information and indentation costs tokens.
+    compact_data = {key: value for key, value in current_data.items() if value not in (None, "", [])}
+    context_str = json.dumps(compact_data, separators=(",", ":"), default=str)
 
     # This advanced prompt now includes materials and samples.
     prompt = f"""
@@ -57,34 +57,101 @@ def conversation_tool(user_message: str, current_data: Dict[str, Any]) -> Dict[s
 
     **YOUR RESPONSE:**
     """
+    return prompt
+
+def _merge_update(current_data: Dict[str, Any], partial_update: Dict[str, Any]) -> Dict[str, Any]:
+    """Merges the AI's partial update into the current data, appending to list fields."""
+    merged_data = current_data.copy()
+    partial_update = dict(partial_update)
+
+    # Special handling for list fields to append instead of replacing
+    for key in ['materials_shared', 'samples_distributed']:
+        if key in partial_update:
+            existing_list = merged_data.get(key) or []
+            new_items = partial_update[key]
+            merged_data[key] = existing_list + new_items
+            del partial_update[key] # Remove from partial update to avoid double-adding
+
+    merged_data.update(partial_update)
+    return merged_data
+
+@instrument_tool("conversation_tool")
+async def conversation_tool(user_message: str, current_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Analyzes a user message to extract partial updates using Chain-of-Thought reasoning,
+    then merges them with the current data context in Python for 100% reliability.
+    """
+    prompt = _build_prompt(user_message, current_data)
     try:
         # Step 1: Get the partial update from the AI.
-        response_content = llm.invoke(prompt).content
+        response_content = await ainvoke_llm("conversation_tool", prompt)
 
         # Robustly find and parse the JSON block from the response
-        json_match = re.search(r"```json\s*(\{.*?\})\s*```", response_content, re.DOTALL)
-        if not json_match:
-            json_match = re.search(r"(\{.*?\})", response_content, re.DOTALL)
+        with timed_phase("conversation_tool", "parse"):
+            json_match = re.search(r"```json\s*(\{.*?\})\s*```", response_content, re.DOTALL)
+            if not json_match:
+                json_match = re.search(r"(\{.*?\})", response_content, re.DOTALL)
 
-        if json_match:
-            partial_update = json.loads(json_match.group(1))
-        else:
-            partial_update = {}
+            if json_match:
+                partial_update = json.loads(json_match.group(1))
+            else:
+                record_json_parse_failure("conversation_tool")
+                partial_update = {}
 
         # Step 2: Perform the merge reliably in Python.
-        merged_data = current_data.copy()
-        
-        # Special handling for list fields to append instead of replacing
-        for key in ['materials_shared', 'samples_distributed']:
-            if key in partial_update:
-                existing_list = merged_data.get(key, [])
-                new_items = partial_update[key]
-                merged_data[key] = existing_list + new_items
-                del partial_update[key] # Remove from partial update to avoid double-adding
-
-        merged_data.update(partial_update)
+        merged_data = _merge_update(current_data, partial_update)
 
         return {"status": "success", "data": merged_data}
         
     except Exception as e:
-        return {"status": "error", "message": f"An unexpected error occurred: {str(e)}"}
\ No newline at end of file
+        if isinstance(e, json.JSONDecodeError):
+            record_json_parse_failure("conversation_tool")
+        return {"status": "error", "message": f"An unexpected error occurred: {str(e)}"}
+
+async def stream_conversation_tool(
+    user_message: str, current_data: Dict[str, Any]
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Streaming variant of conversation_tool. Yields events as the model works:
+
+    - {"event": "progress", "stage": "thinking" | "answering", "received_chars": n}
+    - {"event": "result", "data": merged_data}, as soon as the ```json block closes
+    - {"event": "error", "message": ...}
+
+    The upstream generation is abandoned right after the result, and also whenever
+    the consumer stops iterating (for example because the client disconnected).
+    """
+    prompt = _build_prompt(user_message, current_data)
+    response_content = ""
+    last_progress = 0.0
+    try:
+        stream = astream_llm("conversation_tool", prompt)
+        try:
+            async for chunk in stream:
+                response_content += chunk
+
+                json_match = re.search(r"```json\s*(\{.*?\})\s*```", response_content, re.DOTALL)
+                if json_match:
+                    partial_update = json.loads(json_match.group(1))
+                    yield {"event": "result", "data": _merge_update(current_data, partial_update)}
+                    return
+
+                now = time.monotonic()
+                if now - last_progress >= PROGRESS_INTERVAL_SECONDS:
+                    last_progress = now
+                    stage = "answering" if "</thinking>" in response_content else "thinking"
+                    yield {"event": "progress", "stage": stage, "received_chars": len(response_content)}
+        finally:
+            await stream.aclose()
+
+        # The model never closed a ```json block; fall back to any JSON object it produced.
+        json_match = re.search(r"(\{.*?\})", response_content, re.DOTALL)
+        if not json_match:
+            record_json_parse_failure("conversation_tool")
+        partial_update = json.loads(json_match.group(1)) if json_match else {}
+        yield {"event": "result", "data": _merge_update(current_data, partial_update)}
+
+    except Exception as e:
+        if isinstance(e, json.JSONDecodeError):
+            record_json_parse_failure("conversation_tool")
+        yield {"event": "error", "message": f"An unexpected error occurred: {str(e)}"}
\ No newline at end of file
@@ -0,0 +1,238 @@
+import re
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+# A local, rule-based parser for the edit commands reps type most often
+# ("change sentiment to Neutral", "move it to tomorrow at 3pm", "type is Call",
+# "add the dosing guide to materials"). Every clause of a command has to match one
+# of the anchored templates below; anything else is left to the LLM.
+
+SENTIMENTS = {"positive": "Positive", "neutral": "Neutral", "negative": "Negative"}
+INTERACTION_TYPES = {
+    "meeting": "Meeting", "in-person meeting": "Meeting", "in person meeting": "Meeting", "visit": "Meeting",
+    "call": "Call", "phone call": "Call", "phone": "Call",
+    "virtual": "Virtual", "virtual meeting": "Virtual", "video call": "Virtual", "video meeting": "Virtual",
+}
+LIST_TARGETS = {
+    "material": "materials_shared", "materials": "materials_shared", "materials shared": "materials_shared",
+    "sample": "samples_distributed", "samples": "samples_distributed", "samples distributed": "samples_distributed",
+}
+MONTHS = {
+    name: number
+    for number, names in enumerate([
+        ("january", "jan"), ("february", "feb"), ("march", "mar"), ("april", "apr"), ("may",), ("june", "jun"),
+        ("july", "jul"), ("august", "aug"), ("september", "sep", "sept"), ("october", "oct"),
+        ("november", "nov"), ("december", "dec"),
+    ], start=1)
+    for name in names
+}
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+_VERB = r"(?:please\s+)?(?:change|set|update|make|mark|move|reschedule|switch|correct|fix|shift)"
+_OBJ = r"(?:it|this|that|the\s+(?:meeting|interaction|call|visit|record|entry))"
+_MONTH = "|".join(sorted(MONTHS, key=len, reverse=True))
+_DATE = (
+    r"today|tomorrow|yesterday"
+    r"|(?:(?:next|last|this)\s+)?(?:" + "|".join(WEEKDAYS) + r")"
+    r"|\d{4}-\d{2}-\d{2}"
+    r"|(?:" + _MONTH + r")\.?\s+\d{1,2}(?:st|nd|rd|th)?(?:,?\s+\d{4})?"
+    r"|(?:the\s+)?\d{1,2}(?:st|nd|rd|th)?\s+(?:of\s+)?(?:" + _MONTH + r")\.?(?:,?\s+\d{4})?"
+    # A bare day needs "the" or an ordinal suffix, so "move it to 3" is not read as a date.
+    r"|the\s+\d{1,2}(?:st|nd|rd|th)?|\d{1,2}(?:st|nd|rd|th)"
+)
+_TIME = r"noon|midnight|\d{1,2}:\d{2}(?:\s*[ap]\.?m\.?)?|\d{1,2}\s*[ap]\.?m\.?"
+_SENTIMENT = "|".join(SENTIMENTS)
+_TYPE = "|".join(sorted(INTERACTION_TYPES, key=len, reverse=True))
+_LIST = "|".join(sorted(LIST_TARGETS, key=len, reverse=True))
+# "shared ..." and "gave ... samples" only take a short list of product-like names.
+# Pronouns, verbs, most prepositions and words like "concerns" or "feedback" mean
+# the rep is describing the conversation ("shared that he is retiring"), not
+# naming items; negations ("shared nothing") and generic nouns ("gave samples")
+# name nothing to record. Those clauses go to the LLM.
+_NOT_ITEM = (
+    r"and|that|this|these|those|which|who|what|how|why|when|if|whether"
+    r"|i|he|she|we|they|you|it|him|her|his|hers|them|their|us|our|my|me"
+    r"|about|with|on|for|to|from|at|in|into|by|over|regarding|during|after|before|around|like"
+    r"|is|was|are|were|be|been|will|would|could|should|might|can|has|have|had|did|do|does|not"
+    r"|concerns?|feedback|thoughts?|news|notes?|information|updates?|opinions?|ideas?|story|details"
+    r"|no|none|nothing|any|anything|something|everything|all|materials?|stuff|things?|info"
+)
+_WORD = rf"(?!(?:{_NOT_ITEM})\b)[\w.'+/-]+"
+_ITEM = rf"{_WORD}(?:\s+{_WORD}){{0,4}}"
+_ITEMS = rf"{_ITEM}(?:\s*(?:,|\band\b)\s*{_ITEM})*"
+# A sample list must name a product, not just "samples".
+_SAMPLES = rf"(?=.*\bsamples?\b)(?!(?:(?:the|some|a|our|free|few|several|\d+)\s+)*samples?$){_ITEMS}"
+
+# (pattern, confidence). Templates that name the field explicitly score highest.
+_TEMPLATES = [
+    (rf"(?:{_VERB}\s+)?(?:the\s+)?(?:sentiment|mood|tone)\s+(?:to\s+|as\s+|is\s+|was\s+|=\s*|:\s*)?(?P<sentiment>{_SENTIMENT})", 1.0),
+    (rf"(?:{_VERB}\s+)?{_OBJ}\s+(?:to\s+|as\s+)?(?P<sentiment>{_SENTIMENT})(?:\s+sentiment)?", 0.95),
+    (rf"(?:it|the\s+(?:meeting|interaction|call))\s+(?:is|was)\s+(?P<sentiment>{_SENTIMENT})", 0.95),
+    (rf"(?:{_VERB}\s+)?(?:the\s+)?(?:interaction\s+)?type\s+(?:to\s+|as\s+|is\s+|was\s+|=\s*|:\s*)?(?:an?\s+)?(?P<type>{_TYPE})", 1.0),
+    (rf"(?:{_VERB}\s+)?{_OBJ}\s+(?:to\s+|as\s+|into\s+)?(?:an?\s+)?(?P<type>{_TYPE})", 0.95),
+    (rf"(?:it|this)\s+(?:is|was)\s+(?:an?\s+)?(?P<type>{_TYPE})", 0.95),
+    (rf"(?:{_VERB}\s+)?(?:{_OBJ}\s+)?(?:the\s+)?(?:date\s+)?(?P<prep>to|for|on|is|was)\s+(?P<date>{_DATE})(?:\s+at\s+(?P<time>{_TIME}))?", 1.0),
+    (rf"(?:{_VERB}\s+)?(?:{_OBJ}\s+)?(?:the\s+)?time\s+(?:to\s+|is\s+|was\s+|=\s*|:\s*)?(?P<time>{_TIME})", 1.0),
+    (rf"(?:{_VERB}\s+)?{_OBJ}\s+(?:to|at)\s+(?P<time>{_TIME})", 0.95),
+    (rf"(?:also\s+)?(?:add|append|include)\s+(?P<items>.+?)\s+(?:to|in|into|under)\s+(?:the\s+)?(?P<list>{_LIST})(?:\s+list)?", 1.0),
+    (rf"(?:i\s+)?(?:also\s+)?shared\s+(?P<materials>{_ITEMS})", 0.9),
+    (rf"(?:i\s+)?(?:also\s+)?(?:left|gave|distributed|handed\s+out)\s+(?P<samples>{_SAMPLES})", 0.9),
+]
+_COMPILED = [(re.compile(rf"^{pattern}$", re.IGNORECASE), confidence) for pattern, confidence in _TEMPLATES]
+
+# Clauses are split on commas, semicolons, "and" and "then", but only where the
+# next clause starts like a new command, so "add A and B to materials" stays whole.
+_CLAUSE_START = (
+    r"(?:also\s+)?(?:change|set|update|make|mark|move|reschedule|switch|correct|fix|shift|add|append|include"
+    r"|shared|left|gave|distributed|the\s+(?:sentiment|type|date|time)|sentiment|type|date|time|it\s+was)\b"
+)
+_CLAUSE_SPLIT = re.compile(rf"\s*(?:,|;|\band\b|\bthen\b)\s*(?={_CLAUSE_START})", re.IGNORECASE)
+_ITEM_SPLIT = re.compile(r"\s*(?:,|\band\b)\s*", re.IGNORECASE)
+_ARTICLE = re.compile(r"^(?:the|a|an|some|one|our)\s+", re.IGNORECASE)
+
+
+@dataclass
+class ParsedEdit:
+    update: Dict[str, Any]
+    confidence: float
+
+
+def _as_date(value: Any) -> Optional[date]:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str):
+        try:
+            return date.fromisoformat(value[:10])
+        except ValueError:
+            return None
+    return None
+
+
+def _parse_date(text: str, today: date, current: date, past: bool = False) -> Optional[date]:
+    text = text.lower().strip()
+    if text == "today":
+        return today
+    if text == "tomorrow":
+        return today + timedelta(days=1)
+    if text == "yesterday":
+        return today - timedelta(days=1)
+
+    weekday = re.fullmatch(r"(?:(next|last|this)\s+)?(\w+)", text)
+    if weekday and weekday.group(2) in WEEKDAYS:
+        target = WEEKDAYS.index(weekday.group(2))
+        if weekday.group(1) == "last":
+            return today - timedelta(days=(today.weekday() - target - 1) % 7 + 1)
+        # "it was tuesday" is the most recent one; "this wednesday" on a Wednesday is today.
+        if past:
+            return today - timedelta(days=(today.weekday() - target) % 7)
+        if weekday.group(1) == "this" and target == today.weekday():
+            return today
+        return today + timedelta(days=(target - today.weekday() - 1) % 7 + 1)
+
+    try:
+        if re.fullmatch(r"\d{4}-\d{2}-\d{2}", text):
+            return date.fromisoformat(text)
+        month_first = re.fullmatch(rf"({_MONTH})\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?(?:,?\s+(\d{{4}}))?", text)
+        if month_first:
+            year = int(month_first.group(3)) if month_first.group(3) else current.year
+            return date(year, MONTHS[month_first.group(1)], int(month_first.group(2)))
+        day_first = re.fullmatch(
+            rf"(?:the\s+)?(\d{{1,2}})(?:st|nd|rd|th)?(?:\s+(?:of\s+)?({_MONTH})\.?(?:,?\s+(\d{{4}}))?)?", text
+        )
+        if day_first:
+            # A bare "the 21st" stays in the interaction's own month.
+            month = MONTHS[day_first.group(2)] if day_first.group(2) else current.month
+            year = int(day_first.group(3)) if day_first.group(3) else current.year
+            return date(year, month, int(day_first.group(1)))
+    except ValueError:
+        return None  # e.g. "February 30"
+    return None
+
+
+def _parse_time(text: str) -> Optional[str]:
+    text = text.lower().replace(".", "").strip()
+    if text == "noon":
+        return "12:00"
+    if text == "midnight":
+        return "00:00"
+    match = re.fullmatch(r"(\d{1,2})(?::(\d{2}))?\s*([ap]m)?", text)
+    if not match:
+        return None
+    hour, minute, meridiem = int(match.group(1)), int(match.group(2) or 0), match.group(3)
+    if meridiem:
+        if not 1 <= hour <= 12:
+            return None
+        hour = hour % 12 + (12 if meridiem == "pm" else 0)
+    if hour > 23 or minute > 59:
+        return None
+    return f"{hour:02d}:{minute:02d}"
+
+
+def _split_items(text: str) -> List[str]:
+    items = []
+    for raw in _ITEM_SPLIT.split(text):
+        item = _ARTICLE.sub("", raw.strip().strip("'\""))
+        if item:
+            items.append(item)
+    return items
+
+
+def _append(update: Dict[str, Any], current: Dict[str, Any], field: str, items: List[str]) -> None:
+    existing = list(update.get(field, current.get(field) or []))
+    existing.extend(item for item in items if item not in existing)
+    update[field] = existing
+
+
+def parse_edit_command(
+    command: str, current_interaction: Dict[str, Any], today: Optional[date] = None
+) -> Optional[ParsedEdit]:
+    """
+    Parses an edit command without the LLM.
+
+    Returns the update payload in the same shape edit_interaction_tool would, with a
+    confidence score, or None if any clause of the command isn't understood.
+    """
+    today = today or date.today()
+    current_date = _as_date(current_interaction.get("date")) or today
+    text = command.strip().strip("'\"").rstrip(".!").strip()
+    if not text:
+        return None
+
+    update: Dict[str, Any] = {}
+    confidence = 1.0
+    for clause in _CLAUSE_SPLIT.split(text):
+        clause = clause.rstrip(",; ")
+        for pattern, clause_confidence in _COMPILED:
+            match = pattern.match(clause)
+            if match:
+                break
+        else:
+            return None
+
+        fields = {key: value for key, value in match.groupdict().items() if value}
+        if "sentiment" in fields:
+            update["sentiment"] = SENTIMENTS[fields["sentiment"].lower()]
+        if "type" in fields:
+            update["interaction_type"] = INTERACTION_TYPES[re.sub(r"\s+", " ", fields["type"].lower())]
+        if "date" in fields:
+            parsed_date = _parse_date(fields["date"], today, current_date, past=fields["prep"].lower() == "was")
+            if parsed_date is None:
+                return None
+            update["date"] = parsed_date.isoformat()
+        if "time" in fields:
+            parsed_time = _parse_time(fields["time"])
+            if parsed_time is None:
+                return None
+            update["time"] = parsed_time
+        if "items" in fields:
+            _append(update, current_interaction, LIST_TARGETS[fields["list"].lower()], _split_items(fields["items"]))
+        if "materials" in fields:
+            _append(update, current_interaction, "materials_shared", _split_items(fields["materials"]))
+        if "samples" in fields:
+            _append(update, current_interaction, "samples_distributed", _split_items(fields["samples"]))
+        confidence = min(confidence, clause_confidence)
+
+    return ParsedEdit(update=update, confidence=confidence) if update else None
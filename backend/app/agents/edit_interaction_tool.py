@@ -1,23 +1,30 @@
-import os
 import json
 import re
+import time
 from typing import Dict, Any
-from langchain_groq import ChatGroq
 from app.core.config import settings
+from app.core.llm import ainvoke_llm
+from app.core.metrics import instrument_tool, record_edit, record_json_parse_failure, timed_phase
 from datetime import date
+from .edit_command_parser import parse_edit_command
 
-# Initialize the LLM once to be reused.
-llm = ChatGroq(
-    temperature=0,
-    model_name="gemma2-9b-it",
-    groq_api_key=settings.GROQ_API_KEY
-)
-
-def edit_interaction_tool(natural_language_command: str, current_interaction: Dict[str, Any]) -> Dict[str, Any]:
+@instrument_tool("edit_interaction_tool")
+async def edit_interaction_tool(natural_language_command: str, current_interaction: Dict[str, Any]) -> Dict[str, Any]:
     """
     Takes a natural language command and the current interaction data, then uses
     Chain-of-Thought reasoning to identify and return a precise JSON update payload.
+
+    Common, unambiguous commands are handled by a local rule-based parser first;
+    the LLM is only called when that parser is not confident.
     """
+    started = time.perf_counter()
+    if settings.EDIT_FAST_PATH_ENABLED:
+        with timed_phase("edit_interaction_tool", "local_parse"):
+            parsed = parse_edit_command(natural_language_command, current_interaction)
+        if parsed and parsed.confidence >= settings.EDIT_FAST_PATH_MIN_CONFIDENCE:
+            record_edit("local", time.perf_counter() - started)
+            return {"status": "success", "data": parsed.update, "source": "local"}
+
     today = date.today().strftime('%Y-%m-%d')
     context_str = json.dumps(current_interaction, indent=2, default=str) # Use default=str for dates/times
 
@@ -62,17 +69,20 @@ def edit_interaction_tool(natural_language_command: str, current_interaction: Di
     """
 
     try:
-        response_content = llm.invoke(prompt).content
+        response_content = await ainvoke_llm("edit_interaction_tool", prompt)
 
         # Robustly find and parse the JSON block from the response
-        json_match = re.search(r"```json\s*(\{.*?\})\s*```", response_content, re.DOTALL)
-        if json_match:
-            update_payload = json.loads(json_match.group(1))
-            return {"status": "success", "data": update_payload}
+        with timed_phase("edit_interaction_tool", "parse"):
+            json_match = re.search(r"```json\s*(\{.*?\})\s*```", response_content, re.DOTALL)
+            update_payload = json.loads(json_match.group(1)) if json_match else None
+        if update_payload is not None:
+            record_edit("llm", time.perf_counter() - started)
+            return {"status": "success", "data": update_payload, "source": "llm"}
         else:
             raise ValueError("No valid JSON block found in the AI's response.")
 
     except (json.JSONDecodeError, ValueError) as e:
+        record_json_parse_failure("edit_interaction_tool")
         return {
             "status": "error",
             "message": f"The AI returned data in an unexpected format. Error: {str(e)}",
@@ -1,16 +1,53 @@
 import math
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Query, Session
 from app import models
+from app.core.config import settings
+from app.core.metrics import instrument_crud
+from app.core.names import normalize_hcp_name
+from app.services.hcp_name_index import find_hcp_names
+from app.services.list_items import with_list_items
+from app.services.interaction_rows import projected_query, to_dicts
+from app.pagination import NEWEST_FIRST, apply_cursor, count_capped, encode_cursor
 from typing import List, Dict, Any, Optional
 from datetime import date
 
+def filter_history(
+    db: Session,
+    query: Query,
+    hcp_name: str,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    exact_name: bool = False
+) -> Query:
+    """Applies fetch_hcp_history_tool's name and date filters to an HCPInteraction query."""
+    # 1. Advanced Feature: Fuzzy Name Matching (case-insensitive)
+    # Partial names are resolved against the trigram name index, then matched
+    # with an indexed IN (...) instead of a leading-wildcard ILIKE scan.
+    if exact_name:
+        query = query.filter(models.HCPInteraction.hcp_name_normalized == normalize_hcp_name(hcp_name))
+    else:
+        matched_names = find_hcp_names(db, hcp_name)
+        query = query.filter(models.HCPInteraction.hcp_name_normalized.in_(matched_names))
+
+    # 2. Advanced Feature: Date Range Filtering
+    if start_date:
+        query = query.filter(models.HCPInteraction.date >= start_date)
+    if end_date:
+        query = query.filter(models.HCPInteraction.date <= end_date)
+    return query
+
+@instrument_crud
 def fetch_hcp_history_tool(
     db: Session,
     hcp_name: str,
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     page: int = 1,
-    page_size: int = 10
+    page_size: int = 10,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    exact_name: bool = False,
+    projected: bool = False
 ) -> Dict[str, Any]:
     """
     Retrieves a paginated and filtered list of interaction records for an HCP
@@ -23,8 +60,16 @@ def fetch_hcp_history_tool(
         hcp_name: The partial or full name of the HCP to search for (case-insensitive).
         start_date: Optional start date for the filter range.
         end_date: Optional end date for the filter range.
-        page: The page number to retrieve.
+        page: The page number to retrieve. Ignored when a cursor is given.
         page_size: The number of records per page.
+        cursor: Opaque `next_cursor` from a previous response. Keyset pages cost
+            the same no matter how deep the caller has paged.
+        include_total: Also report `total_records`. This is an estimate capped at
+            settings.HISTORY_COUNT_CAP, since an exact count scans every match.
+        exact_name: Match only this HCP's normalized name instead of every name
+            that contains it.
+        projected: Select only InteractionOut's columns and return the
+            interactions as plain dicts instead of ORM objects.
 
     Returns:
         A dictionary containing the list of interactions and pagination metadata.
@@ -33,53 +78,68 @@ def fetch_hcp_history_tool(
         return {"status": "error", "message": "HCP name must be provided."}
 
     try:
-        # Start building the base query
-        query = db.query(models.HCPInteraction)
+        # Steps 1 and 2: name and date range filters
+        base = projected_query(db) if projected else with_list_items(db.query(models.HCPInteraction))
+        query = filter_history(db, base, hcp_name, start_date, end_date, exact_name)
 
-        # 1. Advanced Feature: Fuzzy Name Matching (case-insensitive)
-        query = query.filter(models.HCPInteraction.hcp_name.ilike(f"%{hcp_name}%"))
+        # 3. Advanced Feature: Smart Pagination
+        # The total is opt-in and capped, so page 1 never pays for a full count.
+        total_records, total_is_exact = None, False
+        if include_total:
+            total_records, total_is_exact = count_capped(query, settings.HISTORY_COUNT_CAP)
 
-        # 2. Advanced Feature: Date Range Filtering
-        if start_date:
-            query = query.filter(models.HCPInteraction.date >= start_date)
-        if end_date:
-            query = query.filter(models.HCPInteraction.date <= end_date)
+        # Keyset pagination when a cursor is given; OFFSET only for legacy page numbers.
+        query = query.order_by(*NEWEST_FIRST)
+        if cursor:
+            query = apply_cursor(query, cursor)
+        elif page > 1:
+            query = query.offset((page - 1) * page_size)
 
-        # 3. Advanced Feature: Smart Pagination
-        # First, get the total count of records that match the filters
-        total_records = query.count()
-        if total_records == 0:
+        # Fetch one extra row to learn whether another page exists.
+        interactions = query.limit(page_size + 1).all()
+        has_more = len(interactions) > page_size
+        interactions = interactions[:page_size]
+
+        pagination = {
+            "total_records": total_records,
+            "total_is_exact": total_is_exact,
+            "current_page": None if cursor else page,
+            "page_size": page_size,
+            "total_pages": math.ceil(total_records / page_size) if total_is_exact else None,
+            "has_more": has_more,
+            "next_cursor": encode_cursor(interactions[-1]) if has_more else None
+        }
+
+        if not interactions:
             return {
                 "status": "success",
                 "message": f"No interactions found for '{hcp_name}'.",
                 "data": [],
-                "pagination": {
-                    "total_records": 0, "current_page": 1, "page_size": page_size, "total_pages": 0
-                }
+                "pagination": pagination
             }
-        
-        # Then, apply ordering, offset, and limit to get just the current page's data
-        interactions = (
-            query
-            .order_by(models.HCPInteraction.date.desc(), models.HCPInteraction.time.desc())
-            .offset((page - 1) * page_size)
-            .limit(page_size)
-            .all()
-        )
-
-        # Calculate total pages
-        total_pages = math.ceil(total_records / page_size)
 
         return {
             "status": "success",
-            "data": interactions,
-            "pagination": {
-                "total_records": total_records,
-                "current_page": page,
-                "page_size": page_size,
-                "total_pages": total_pages
-            }
+            "data": to_dicts(db, interactions) if projected else interactions,
+            "pagination": pagination
         }
 
     except Exception as e:
-        return {"status": "error", "message": f"A database error occurred: {str(e)}"}
\ No newline at end of file
+        return {"status": "error", "message": f"A database error occurred: {str(e)}"}
+
+def fetch_hcp_history_snapshot(db: Session, hcp_name: str, **filters) -> Dict[str, Any]:
+    """
+    Same as fetch_hcp_history_tool, but returns the interactions as plain dicts so
+    callers can close the session before doing slow work (like an LLM call) with them.
+    """
+    return fetch_hcp_history_tool(db=db, hcp_name=hcp_name, projected=True, **filters)
+
+def format_history_for_prompt(interactions: List[Dict[str, Any]], limit: int = 5) -> str:
+    """Renders the most recent `limit` interactions (as dicts) as prompt bullet points."""
+    formatted_history = ""
+    for interaction in interactions[:limit]:
+        formatted_history += (
+            f"- On {interaction['date']}, a {interaction['interaction_type']} with a '{interaction['sentiment']}' sentiment "
+            f"covered '{interaction['topics_discussed']}'. Outcome: '{interaction['outcomes']}'.\n"
+        )
+    return formatted_history
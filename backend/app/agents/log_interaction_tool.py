@@ -1,19 +1,12 @@
-import os
 import json
 import re
 from typing import Dict, Any
-from langchain_groq import ChatGroq
-from app.core.config import settings
+from app.core.llm import ainvoke_llm
+from app.core.metrics import instrument_tool, record_json_parse_failure, timed_phase
 from datetime import date
 
-# Initialize the LLM once to be reused.
-llm = ChatGroq(
-    temperature=0,
-    model_name="gemma2-9b-it",
-    groq_api_key=settings.GROQ_API_KEY
-)
-
-def log_interaction_tool(natural_language_input: str) -> Dict[str, Any]:
+@instrument_tool("log_interaction_tool")
+async def log_interaction_tool(natural_language_input: str) -> Dict[str, Any]:
     """
     Takes a natural language sentence about an HCP interaction and uses an advanced
     Chain-of-Thought prompt with few-shot examples to extract structured data.
@@ -70,23 +63,25 @@ def log_interaction_tool(natural_language_input: str) -> Dict[str, Any]:
     """
 
     try:
-        response_content = llm.invoke(prompt).content
+        response_content = await ainvoke_llm("log_interaction_tool", prompt)
+
+        with timed_phase("log_interaction_tool", "parse"):
+            # This regex is a robust way to find the JSON block, even with surrounding text.
+            json_match = re.search(r"```json\s*(\{.*?\})\s*```", response_content, re.DOTALL)
+
+            if not json_match:
+                # Fallback for if the LLM doesn't use the markdown block correctly
+                json_match = re.search(r"(\{.*?\})", response_content, re.DOTALL)
 
-        # This regex is a robust way to find the JSON block, even with surrounding text.
-        json_match = re.search(r"```json\s*(\{.*?\})\s*```", response_content, re.DOTALL)
-        
-        if not json_match:
-            # Fallback for if the LLM doesn't use the markdown block correctly
-            json_match = re.search(r"(\{.*?\})", response_content, re.DOTALL)
+            extracted_data = json.loads(json_match.group(1)) if json_match else None
 
-        if json_match:
-            json_str = json_match.group(1)
-            extracted_data = json.loads(json_str)
+        if extracted_data is not None:
             return {"status": "success", "data": extracted_data}
         else:
             raise ValueError("No valid JSON object found in the AI's response.")
 
     except (json.JSONDecodeError, ValueError) as e:
+        record_json_parse_failure("log_interaction_tool")
         return {
             "status": "error",
             "message": f"The AI returned data in an unexpected format. Error: {str(e)}",
@@ -1,49 +1,53 @@
-import os
 import json
-import re  # <-- FIX 1: Added the missing import for regular expressions
-from langchain_groq import ChatGroq
-from app.core.config import settings
-from sqlalchemy.orm import Session
-from typing import Dict, Any
+import re
+import time
+from app.core.llm import ainvoke_llm
+from app.core.llm_cache import llm_cache
+from app.core.names import normalize_hcp_name
+from app.core.single_flight import single_flight
+from app.core.metrics import instrument_tool, observe_phase, record_json_parse_failure, timed_phase
+from app.database import with_session
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, Any, List
 from datetime import date
 
 # Import the tool we will use to get the data
-from .fetch_hcp_history_tool import fetch_hcp_history_tool
+from .fetch_hcp_history_tool import fetch_hcp_history_snapshot, format_history_for_prompt
 
-# Initialize the LLM
-llm = ChatGroq(
-    temperature=0.5,
-    model_name="gemma2-9b-it",
-    groq_api_key=settings.GROQ_API_KEY
-)
-
-def suggest_next_action_tool(hcp_name: str, db: Session) -> Dict[str, Any]:
+# Concurrent requests for the same HCP (e.g. a team opening one dashboard) share one run.
+@single_flight("suggest_next_action_tool", key_fn=lambda hcp_name: normalize_hcp_name(hcp_name))
+@instrument_tool("suggest_next_action_tool")
+async def suggest_next_action_tool(hcp_name: str) -> Dict[str, Any]:
     """
     Analyzes an HCP's interaction history to provide advanced, strategic next steps,
     each with a clear rationale.
     """
-    history_result = fetch_hcp_history_tool(hcp_name=hcp_name, db=db)
+    # Read the history off the event loop in a short-lived session, which is
+    # closed before the LLM call so no pooled connection waits on the model.
+    with timed_phase("suggest_next_action_tool", "history"):
+        history_result = await run_in_threadpool(with_session, fetch_hcp_history_snapshot, hcp_name)
 
     if history_result["status"] == "error":
         return history_result
 
-    interactions = history_result["data"]
+    return await generate_suggestions(hcp_name, history_result["data"])
+
+async def generate_suggestions(hcp_name: str, interactions: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Suggests next actions from history that was already fetched (newest first, as plain
+    dicts). The combined briefing uses this to share one history fetch.
+    """
     today = date.today()
 
     if not interactions:
         return { "status": "success", "data": { "suggestions": [] } }
 
+    prompt_started = time.perf_counter()
     # Step 1: Create a richer, more narrative context for the LLM
-    last_interaction_date = interactions[0].date
+    last_interaction_date = interactions[0]['date']
     days_since_last_meeting = (today - last_interaction_date).days
     
-    formatted_history = ""
-    for interaction in interactions[:5]: # Analyze the last 5 interactions
-        formatted_history += (
-            # --- FIX 2: Correctly access .value for both enums ---
-            f"- On {interaction.date}, a {interaction.interaction_type.value} with a '{interaction.sentiment.value}' sentiment "
-            f"covered '{interaction.topics_discussed}'. Outcome: '{interaction.outcomes}'.\n"
-        )
+    formatted_history = format_history_for_prompt(interactions)
 
     # Step 2: Use an advanced Chain-of-Thought prompt
     prompt = f"""
@@ -93,17 +97,30 @@ def suggest_next_action_tool(hcp_name: str, db: Session) -> Dict[str, Any]:
 
     **YOUR RESPONSE:**
     """
+    observe_phase("suggest_next_action_tool", "prompt", time.perf_counter() - prompt_started)
 
     try:
-        response_content = llm.invoke(prompt).content
+        # Identical history produces an identical prompt, so reuse the last answer.
+        cache_key = llm_cache.make_key("suggest_next_action_tool", prompt)
+        response_content = llm_cache.get(cache_key)
+        from_cache = response_content is not None
+        if not from_cache:
+            response_content = await ainvoke_llm("suggest_next_action_tool", prompt)
         
         # Robustly find the JSON block in the response
-        json_match = re.search(r"```json\s*(\{.*?\})\s*```", response_content, re.DOTALL)
-        if json_match:
-            suggestions = json.loads(json_match.group(1))
+        with timed_phase("suggest_next_action_tool", "parse"):
+            json_match = re.search(r"```json\s*(\{.*?\})\s*```", response_content, re.DOTALL)
+            suggestions = json.loads(json_match.group(1)) if json_match else None
+        if suggestions is not None:
+            # Only fresh answers are stored, so a hit doesn't extend the entry's TTL.
+            if not from_cache:
+                llm_cache.set(cache_key, response_content, hcp_name)
             return {"status": "success", "data": suggestions}
         else:
             raise ValueError("No valid JSON block found in the AI's response.")
             
+    except (json.JSONDecodeError, ValueError) as e:
+        record_json_parse_failure("suggest_next_action_tool")
+        return {"status": "error", "message": f"AI suggestion generation failed: {str(e)}"}
     except Exception as e:
         return {"status": "error", "message": f"AI suggestion generation failed: {str(e)}"}
\ No newline at end of file
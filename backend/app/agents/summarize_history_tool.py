@@ -1,33 +1,47 @@
-import os
 import json
 import re
-from langchain_groq import ChatGroq
-from app.core.config import settings
-from sqlalchemy.orm import Session
-from typing import Dict, Any
+import time
+from app.core.llm import ainvoke_llm
+from app.core.llm_cache import llm_cache
+from app.core.names import normalize_hcp_name
+from app.core.single_flight import single_flight
+from app.core.metrics import instrument_tool, observe_phase, record_json_parse_failure, timed_phase
+from app.database import with_session
+from app.services.semantic_index import relevant_history_snapshot
+from starlette.concurrency import run_in_threadpool
+from typing import Dict, Any, List, Optional
 
 # Import the other tool we need to use
-from .fetch_hcp_history_tool import fetch_hcp_history_tool
+from .fetch_hcp_history_tool import fetch_hcp_history_snapshot, format_history_for_prompt
 
-# Initialize the LLM
-llm = ChatGroq(
-    temperature=0,
-    model_name="gemma2-9b-it",
-    groq_api_key=settings.GROQ_API_KEY
-)
-
-def summarize_history_tool(hcp_name: str, db: Session) -> Dict[str, Any]:
+# Concurrent requests for the same HCP (e.g. a team opening one dashboard) share one run.
+@single_flight("summarize_history_tool", key_fn=lambda hcp_name, focus=None: (normalize_hcp_name(hcp_name), focus))
+@instrument_tool("summarize_history_tool")
+async def summarize_history_tool(hcp_name: str, focus: Optional[str] = None) -> Dict[str, Any]:
     """
     Generates an advanced, structured summary of an HCP's interaction history
-    using Chain-of-Thought reasoning.
+    using Chain-of-Thought reasoning. With `focus` (e.g. "CardioPlus side effects"),
+    the past interactions most similar to it are summarized instead of the latest.
     """
-    # Step 1: Call the Fetch History Tool to get the data
-    history_result = fetch_hcp_history_tool(hcp_name=hcp_name, db=db)
+    # Step 1: Call the Fetch History Tool to get the data.
+    # It runs off the event loop in a short-lived session, which is closed
+    # before the LLM call so no pooled connection waits on the model.
+    with timed_phase("summarize_history_tool", "history"):
+        if focus:
+            history_result = await run_in_threadpool(with_session, relevant_history_snapshot, hcp_name, focus)
+        else:
+            history_result = await run_in_threadpool(with_session, fetch_hcp_history_snapshot, hcp_name)
 
     if history_result["status"] == "error":
         return history_result
 
-    interactions = history_result["data"]
+    return await generate_summary(hcp_name, history_result["data"])
+
+async def generate_summary(hcp_name: str, interactions: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Summarizes history that was already fetched (newest first, as plain
+    dicts). The combined briefing uses this to share one history fetch.
+    """
 
     if not interactions:
         return {
@@ -39,13 +53,9 @@ def summarize_history_tool(hcp_name: str, db: Session) -> Dict[str, Any]:
             }
         }
 
+    prompt_started = time.perf_counter()
     # Step 2: Format the fetched data into a readable string for the LLM
-    formatted_history = ""
-    for interaction in interactions[:5]: # Analyze the last 5 interactions
-        formatted_history += (
-            f"- On {interaction.date}, a {interaction.interaction_type.value} with a '{interaction.sentiment.value}' sentiment "
-            f"covered '{interaction.topics_discussed}'. Outcome: '{interaction.outcomes}'.\n"
-        )
+    formatted_history = format_history_for_prompt(interactions)
 
     # Step 3: Create an advanced Chain-of-Thought prompt
     prompt = f"""
@@ -80,17 +90,30 @@ def summarize_history_tool(hcp_name: str, db: Session) -> Dict[str, Any]:
 
     **YOUR RESPONSE:**
     """
+    observe_phase("summarize_history_tool", "prompt", time.perf_counter() - prompt_started)
 
     try:
-        response_content = llm.invoke(prompt).content
+        # Identical history produces an identical prompt, so reuse the last answer.
+        cache_key = llm_cache.make_key("summarize_history_tool", prompt)
+        response_content = llm_cache.get(cache_key)
+        from_cache = response_content is not None
+        if not from_cache:
+            response_content = await ainvoke_llm("summarize_history_tool", prompt)
 
         # Robustly find and parse the JSON block from the response
-        json_match = re.search(r"```json\s*(\{.*?\})\s*```", response_content, re.DOTALL)
-        if json_match:
-            summary_data = json.loads(json_match.group(1))
+        with timed_phase("summarize_history_tool", "parse"):
+            json_match = re.search(r"```json\s*(\{.*?\})\s*```", response_content, re.DOTALL)
+            summary_data = json.loads(json_match.group(1)) if json_match else None
+        if summary_data is not None:
+            # Only fresh answers are stored, so a hit doesn't extend the entry's TTL.
+            if not from_cache:
+                llm_cache.set(cache_key, response_content, hcp_name)
             return {"status": "success", "data": summary_data}
         else:
             raise ValueError("No valid JSON block found in the AI's response.")
 
+    except (json.JSONDecodeError, ValueError) as e:
+        record_json_parse_failure("summarize_history_tool")
+        return {"status": "error", "message": f"AI summary generation failed: {str(e)}"}
     except Exception as e:
         return {"status": "error", "message": f"AI summary generation failed: {str(e)}"}
\ No newline at end of file
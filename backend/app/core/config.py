@@ -1,4 +1,5 @@
 from pydantic_settings import BaseSettings
+from typing import Any, Dict, Optional
 import os
 
 class Settings(BaseSettings):
@@ -7,11 +8,145 @@ class Settings(BaseSettings):
     It automatically reads variables from the .env file.
     """
     DATABASE_URL: str
-    GROQ_API_KEY: str
+    # Only needed for the AI features; clients are created on first use.
+    GROQ_API_KEY: Optional[str] = None
+
+    # --- Concurrency ---
+    # Size of the worker threadpool used for sync routes and DB calls.
+    THREADPOOL_SIZE: int = 40
+    # Maximum number of LLM calls in flight across the whole process.
+    LLM_MAX_CONCURRENCY: int = 16
+    # Per-tool caps, applied on top of the global limit. Tools not listed here
+    # are only bounded by LLM_MAX_CONCURRENCY.
+    LLM_TOOL_CONCURRENCY: Dict[str, int] = {
+        "conversation_tool": 8,
+        "edit_interaction_tool": 8,
+        "log_interaction_tool": 4,
+        "summarize_history_tool": 4,
+        "suggest_next_action_tool": 4,
+    }
+
+    # --- LLM clients ---
+    # Defaults for every tool, overridden per tool by LLM_TOOL_SETTINGS (keys:
+    # model, temperature, timeout_seconds, max_retries).
+    LLM_DEFAULT_MODEL: str = "gemma2-9b-it"
+    LLM_DEFAULT_TEMPERATURE: float = 0.0
+    LLM_TIMEOUT_SECONDS: float = 30.0
+    LLM_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    # Retries inside the SDK; the scheduler retries instead (LLM_RETRY_ATTEMPTS).
+    LLM_MAX_RETRIES: int = 0
+    LLM_TOOL_SETTINGS: Dict[str, Dict[str, Any]] = {
+        "suggest_next_action_tool": {"temperature": 0.5},
+    }
+    # Points every client at a Groq-compatible stand-in server, e.g. for tests.
+    LLM_BASE_URL: Optional[str] = None
+    # One keep-alive pool shared by all tools.
+    LLM_HTTP_MAX_CONNECTIONS: int = 32
+    LLM_HTTP_MAX_KEEPALIVE: int = 16
+    LLM_HTTP_KEEPALIVE_SECONDS: float = 60.0
+
+    # --- LLM scheduler ---
+    # Provider quota the scheduler paces calls to; None disables that bucket.
+    # The defaults are Groq's free-tier limits for gemma2-9b-it.
+    LLM_RATE_LIMIT_REQUESTS_PER_MINUTE: Optional[int] = 30
+    LLM_RATE_LIMIT_TOKENS_PER_MINUTE: Optional[int] = 15000
+    # Added to the prompt estimate when reserving tokens; settled after the call.
+    LLM_ESTIMATED_COMPLETION_TOKENS: int = 300
+    # "interactive" calls are admitted before "standard", then "background".
+    LLM_TOOL_PRIORITY: Dict[str, str] = {
+        "conversation_tool": "interactive",
+        "edit_interaction_tool": "interactive",
+        "log_interaction_tool": "standard",
+        "summarize_history_tool": "background",
+        "suggest_next_action_tool": "background",
+    }
+    # Attempts per call for 429s, timeouts and 5xx, with jittered exponential backoff.
+    LLM_RETRY_ATTEMPTS: int = 4
+    LLM_RETRY_MAX_WAIT_SECONDS: float = 20.0
+
+    # --- LLM response cache ---
+    # One of "memory", "sqlite" or "none".
+    LLM_CACHE_BACKEND: str = "memory"
+    LLM_CACHE_PATH: str = "llm_cache.sqlite3"
+    LLM_CACHE_TTL_SECONDS: int = 3600
+    LLM_CACHE_MAX_ENTRIES: int = 1024
+
+    # --- Pagination ---
+    # Upper bound on rows scanned when a client opts into `total_records`.
+    HISTORY_COUNT_CAP: int = 10000
+
+    # --- Conversation sessions ---
+    CONVERSATION_SESSION_TTL_SECONDS: int = 1800
+    CONVERSATION_SESSION_MAX_IN_MEMORY: int = 1000
+    # Optional SQLite file that receives sessions evicted from memory.
+    CONVERSATION_SESSION_SPILL_PATH: Optional[str] = None
+
+    # --- Batch note extraction ---
+    BATCH_EXTRACTION_CONCURRENCY: int = 4
+
+    # --- Edit fast path ---
+    # Simple edit commands are parsed locally; the LLM handles the rest.
+    EDIT_FAST_PATH_ENABLED: bool = True
+    EDIT_FAST_PATH_MIN_CONFIDENCE: float = 0.9
+
+    # --- Briefing store ---
+    # Stored HCP briefings are regenerated in the background after writes,
+    # once an HCP has been quiet for the debounce window.
+    BRIEFING_STORE_ENABLED: bool = True
+    BRIEFING_DEBOUNCE_SECONDS: float = 30.0
+    BRIEFING_MAX_DELAY_SECONDS: float = 300.0
+    BRIEFING_WORKER_CONCURRENCY: int = 2
+
+    # --- List fields ---
+    # Build the list fields of API responses from hcp_interaction_list_items
+    # instead of the JSON columns. Enable once `python -m app.services.list_items
+    # backfill` has run; writes go to both either way.
+    LIST_ITEMS_READ_ENABLED: bool = False
+
+    # --- Semantic search ---
+    # Directory of the memory-mapped vector index over interaction notes. One
+    # process must own it: with several workers, include "{pid}" in the path.
+    SEMANTIC_INDEX_PATH: str = "semantic_index"
+    # Hashed feature dimensions; changing it rebuilds the index on first use.
+    SEMANTIC_INDEX_DIM: int = 1024
+    # The background sync picks up writes from other processes at least this often.
+    SEMANTIC_INDEX_SYNC_INTERVAL_SECONDS: float = 30.0
+    # and this process's own writes this long after they happen (bursts share a sync).
+    SEMANTIC_INDEX_SYNC_DEBOUNCE_SECONDS: float = 2.0
+    # Rows updated this long before the last sync are embedded again, in case
+    # their transaction committed after it.
+    SEMANTIC_INDEX_SYNC_OVERLAP_SECONDS: float = 60.0
+
+    # --- Conditional GET ---
+    # ETags on collection reads (validator: max(updated_at) and row count), 304s
+    # for matching If-None-Match, and a cache of rendered bodies keyed by ETag.
+    CONDITIONAL_GET_ENABLED: bool = True
+    # No ETag while the newest row is this recent; see app/core/http_cache.py.
+    CONDITIONAL_GET_SETTLE_SECONDS: float = 2.0
+    RESPONSE_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+
+    # --- Follow-up jobs ---
+    # New interactions without ai_suggested_followups get a row in followup_jobs;
+    # an in-process poller generates the follow-ups at background LLM priority.
+    FOLLOWUP_WORKER_ENABLED: bool = True
+    FOLLOWUP_WORKER_CONCURRENCY: int = 2
+    FOLLOWUP_POLL_SECONDS: float = 5.0
+    # A running job whose worker hasn't finished it within the lease is retried.
+    FOLLOWUP_LEASE_SECONDS: float = 600.0
+    # Failed jobs are retried with jittered exponential backoff, then dead-lettered.
+    FOLLOWUP_MAX_ATTEMPTS: int = 5
+    FOLLOWUP_RETRY_BASE_SECONDS: float = 30.0
+    FOLLOWUP_RETRY_MAX_SECONDS: float = 3600.0
+    # Past this many queued jobs, new ones go straight to the dead letter instead.
+    FOLLOWUP_MAX_QUEUED: int = 5000
+
+    # --- Metrics ---
+    # Lets clients request a Server-Timing header with `X-Server-Timing: 1`.
+    SERVER_TIMING_ENABLED: bool = True
 
     class Config:
         # This tells pydantic-settings where to find your variables
         env_file = ".env"
 
 # Create a single, reusable instance of the settings
-settings = Settings()
\ No newline at end of file
+settings = Settings()
@@ -0,0 +1,149 @@
+"""
+Conditional GET for collection reads.
+
+A collection's validator is `max(updated_at)` and `count(*)` over the filtered
+rows, one aggregate query that the updated_at and name indexes answer without
+touching the page query or serializing anything. Hashed together with the
+request's path and query string, it is the response's ETag: a matching
+`If-None-Match` gets a 304, and the same ETag keys an in-process cache of
+rendered response bodies, so a repeat read from another client skips the page
+query and serialization too.
+
+There are no deletes, so an insert always changes the count and an edit always
+moves updated_at forward (an edit that moves a row out of a filtered set lowers
+its count). updated_at only has whole seconds in MySQL, though, so
+two writes in the same second can leave max(updated_at) unchanged. While the
+newest row is younger than CONDITIONAL_GET_SETTLE_SECONDS no ETag is issued;
+once it is older, any later write lands on a later second.
+
+Generated follow-ups are written without moving updated_at (see
+app.services.followup_jobs), so the newest finished follow-up job is part of
+every validator too, and settles the same way.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+from fastapi import Request, Response
+from sqlalchemy import func, select
+from sqlalchemy.orm import Query
+from app import models
+from app.core.config import settings
+from app.core.metrics import record_response_cache
+
+
+class ResponseCache:
+    """LRU of rendered bodies (and their extra headers) by ETag, bounded in bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[str, Tuple[bytes, Dict[str, str]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, etag: str) -> Optional[Tuple[bytes, Dict[str, str]]]:
+        with self._lock:
+            entry = self._entries.get(etag)
+            if entry is not None:
+                self._entries.move_to_end(etag)
+            return entry
+
+    def set(self, etag: str, body: bytes, headers: Dict[str, str]) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(etag, None)
+            if previous is not None:
+                self.size -= len(previous[0])
+            self._entries[etag] = (body, headers)
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, (evicted, _) = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "bytes": self.size, "max_bytes": self.max_bytes}
+
+
+def collection_etag(request: Request, query: Query, whole_table: bool = False) -> Optional[str]:
+    """
+    Weak ETag for the rows of `query` (an HCPInteraction query with filters but no
+    ordering or paging) as rendered for this URL, or None while it can't be trusted.
+
+    For the unfiltered table, max(id) stands in for the count: rows never leave it,
+    so every insert raises max(id), and the primary key answers that without a scan.
+    """
+    M, J = models.HCPInteraction, models.FollowupJob
+    query = query.order_by(None)
+    followups = select(func.max(J.updated_at)).where(J.status == "done").scalar_subquery()
+    if whole_table:
+        # Separate subqueries, so each MAX is a single index lookup.
+        newest, count, followups_at = query.session.execute(select(
+            query.with_entities(func.max(M.updated_at)).scalar_subquery(),
+            query.with_entities(func.max(M.id)).scalar_subquery(),
+            followups,
+        )).one()
+    else:
+        newest, count, followups_at = query.with_entities(func.max(M.updated_at), func.count(M.id), followups).one()
+    settle = timedelta(seconds=settings.CONDITIONAL_GET_SETTLE_SECONDS)
+    if any(at is not None and at >= datetime.utcnow() - settle for at in (newest, followups_at)):
+        return None
+    raw = "\x00".join([
+        request.url.path, str(sorted(request.query_params.multi_items())),
+        newest.isoformat() if newest else "", str(count),
+        followups_at.isoformat() if followups_at else "",
+        # Settings that change how the same rows are rendered.
+        str(settings.LIST_ITEMS_READ_ENABLED),
+    ])
+    return 'W/"' + hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of `etag` against an If-None-Match header value."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+def conditional_response(
+    request: Request, route: str, query: Query, render: Callable[[], Tuple[bytes, Dict[str, str]]],
+    whole_table: bool = False
+) -> Response:
+    """
+    Answers a collection read: 304 if the client's copy is current, else the cached
+    or freshly rendered body. `render()` returns the JSON body and extra headers.
+    """
+    etag = collection_etag(request, query, whole_table) if settings.CONDITIONAL_GET_ENABLED else None
+    if etag is None:
+        record_response_cache(route, "uncacheable")
+        body, headers = render()
+        return Response(body, media_type="application/json", headers=headers)
+
+    # no-cache: browsers may keep the body but must revalidate it on every read.
+    validators = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        record_response_cache(route, "not_modified")
+        return Response(status_code=304, headers=validators)
+
+    cached = response_cache.get(etag)
+    if cached is not None:
+        record_response_cache(route, "hit")
+        body, headers = cached
+    else:
+        record_response_cache(route, "miss")
+        body, headers = render()
+        response_cache.set(etag, body, headers)
+    return Response(body, media_type="application/json", headers={**headers, **validators})
+
+
+# Create a single, shared response cache instance
+response_cache = ResponseCache(settings.RESPONSE_CACHE_MAX_BYTES)
@@ -0,0 +1,144 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Callable, Dict, Optional
+import groq
+from tenacity import AsyncRetrying, retry_if_exception, stop_after_attempt, wait_random_exponential
+from app.core.config import settings
+from app.core.llm_clients import llm_clients
+from app.core.llm_scheduler import PRIORITIES, estimate_tokens, llm_scheduler
+from app.core.metrics import observe_phase, record_llm_retry, record_tokens, timed_phase
+
+# Per-tool concurrency caps, created lazily so they bind to the running event loop.
+# The process-wide cap and the rate limits live in the scheduler.
+_tool_slots: Dict[str, asyncio.Semaphore] = {}
+
+# Lets work that nobody is waiting on (background refreshes, batch imports)
+# queue behind interactive calls of the same tool.
+_priority_floor: ContextVar[Optional[str]] = ContextVar("llm_priority_floor", default=None)
+
+RETRYABLE_ERRORS = (groq.RateLimitError, groq.APIConnectionError, groq.InternalServerError)
+
+
+def _get_tool_slots(tool_name: str) -> Optional[asyncio.Semaphore]:
+    limit = settings.LLM_TOOL_CONCURRENCY.get(tool_name)
+    if not limit:
+        return None
+    if tool_name not in _tool_slots:
+        _tool_slots[tool_name] = asyncio.Semaphore(limit)
+    return _tool_slots[tool_name]
+
+
+@contextmanager
+def llm_priority(priority_class: str):
+    """Runs the LLM calls made inside the block at `priority_class` or lower."""
+    token = _priority_floor.set(priority_class)
+    try:
+        yield
+    finally:
+        _priority_floor.reset(token)
+
+
+def priority_for(tool_name: str) -> int:
+    priority = PRIORITIES[settings.LLM_TOOL_PRIORITY.get(tool_name, "standard")]
+    floor = _priority_floor.get()
+    return max(priority, PRIORITIES[floor]) if floor else priority
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    response = getattr(error, "response", None)
+    try:
+        return float(response.headers.get("retry-after")) if response is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+@asynccontextmanager
+async def llm_slot(tool_name: str, prompt: str):
+    """
+    Holds one admission for `tool_name` for the duration of the block and yields
+    the scheduler's grant; set `grant.used_tokens` to settle the token estimate.
+
+    The per-tool slot is taken before queueing in the scheduler, so a busy tool
+    waiting on its own limit never holds a place another tool could use.
+    """
+    tool_slots = _get_tool_slots(tool_name)
+    queued_at = time.perf_counter()
+    if tool_slots is not None:
+        await tool_slots.acquire()
+    try:
+        grant = await llm_scheduler.acquire(priority_for(tool_name), estimate_tokens(prompt))
+        observe_phase(tool_name, "llm_queue", time.perf_counter() - queued_at)
+        succeeded = False
+        try:
+            yield grant
+            succeeded = True
+        except groq.RateLimitError as e:
+            llm_scheduler.rate_limited_by_provider(_retry_after(e))
+            raise
+        finally:
+            llm_scheduler.release(grant, succeeded=succeeded)
+    finally:
+        if tool_slots is not None:
+            tool_slots.release()
+
+
+def _retrying(tool_name: str, can_retry: Callable[[], bool] = lambda: True) -> AsyncRetrying:
+    """Jittered exponential backoff for transient failures; each attempt queues again."""
+    def before_sleep(retry_state):
+        error = retry_state.outcome.exception()
+        record_llm_retry(tool_name, "rate_limited" if isinstance(error, groq.RateLimitError) else "transient")
+
+    return AsyncRetrying(
+        retry=retry_if_exception(lambda e: isinstance(e, RETRYABLE_ERRORS) and can_retry()),
+        wait=wait_random_exponential(multiplier=0.5, max=settings.LLM_RETRY_MAX_WAIT_SECONDS),
+        stop=stop_after_attempt(settings.LLM_RETRY_ATTEMPTS),
+        before_sleep=before_sleep,
+        reraise=True,
+    )
+
+
+def _total_tokens(usage: Optional[dict]) -> Optional[int]:
+    return usage.get("total_tokens") if usage else None
+
+
+async def ainvoke_llm(tool_name: str, prompt: str) -> str:
+    """Runs a single LLM call with `tool_name`'s client and returns the response text."""
+    llm = llm_clients.get(tool_name)
+    async for attempt in _retrying(tool_name):
+        with attempt:
+            async with llm_slot(tool_name, prompt) as grant:
+                with timed_phase(tool_name, "llm"):
+                    response = await llm.ainvoke(prompt)
+                usage = getattr(response, "usage_metadata", None)
+                grant.used_tokens = _total_tokens(usage)
+    record_tokens(tool_name, usage)
+    return response.content
+
+
+async def astream_llm(tool_name: str, prompt: str) -> AsyncIterator[str]:
+    """
+    Streams the response text chunk by chunk, holding the slot until the stream ends.
+    Closing this generator early closes the upstream stream, which stops the generation.
+    A failure is only retried if nothing has been yielded yet.
+    """
+    llm = llm_clients.get(tool_name)
+    started_yielding = False
+    async for attempt in _retrying(tool_name, can_retry=lambda: not started_yielding):
+        with attempt:
+            async with llm_slot(tool_name, prompt) as grant:
+                stream = llm.astream(prompt)
+                usage = None
+                try:
+                    with timed_phase(tool_name, "llm"):
+                        async for chunk in stream:
+                            # Token usage, when reported, arrives on the final chunk.
+                            usage = getattr(chunk, "usage_metadata", None) or usage
+                            if chunk.content:
+                                started_yielding = True
+                                yield chunk.content
+                finally:
+                    await stream.aclose()
+                    grant.used_tokens = _total_tokens(usage)
+                    record_tokens(tool_name, usage)
@@ -0,0 +1,174 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from app.core.config import settings
+from app.core.llm_clients import tool_settings
+from app.core.metrics import record_cache_outcome
+from app.core.names import normalize_hcp_name
+
+
+class MemoryCacheBackend:
+    """In-process LRU cache with a per-entry TTL."""
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value, _ = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: str, tag: str) -> None:
+        with self._lock:
+            self._entries[key] = (time.time() + self.ttl_seconds, value, tag)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_tags_within(self, name: str) -> int:
+        """Drops every entry whose tag is a substring of `name`."""
+        with self._lock:
+            stale = [key for key, (_, _, tag) in self._entries.items() if tag in name]
+            for key in stale:
+                del self._entries[key]
+            return len(stale)
+
+
+class SQLiteCacheBackend:
+    """File-backed cache that survives restarts and can be shared by workers on one host."""
+
+    def __init__(self, path: str, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, tag TEXT NOT NULL, "
+            "expires_at REAL NOT NULL, last_access REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_last_access ON llm_cache (last_access)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_tag ON llm_cache (tag)")
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[1] < now:
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                return None
+            self._conn.execute("UPDATE llm_cache SET last_access = ? WHERE key = ?", (now, key))
+            return row[0]
+
+    def set(self, key: str, value: str, tag: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, tag, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, value, tag, now + self.ttl_seconds, now),
+            )
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                "SELECT key FROM llm_cache ORDER BY last_access "
+                "LIMIT MAX((SELECT COUNT(*) FROM llm_cache) - ?, 0))",
+                (self.max_entries,),
+            )
+
+    def invalidate_tags_within(self, name: str) -> int:
+        """Drops every entry whose tag is a substring of `name`."""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM llm_cache WHERE instr(?, tag) > 0", (name,))
+            return cursor.rowcount
+
+
+class LLMCache:
+    """
+    Content-addressed cache for LLM responses.
+
+    Keys are a hash of the model name, temperature and final prompt, so any change
+    to the underlying history produces a new key on its own. Entries are also tagged
+    with the HCP name the caller searched for, which lets writes drop them eagerly
+    instead of leaving them to expire.
+    """
+
+    def __init__(self, backend=None):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(tool_name: str, prompt: str) -> str:
+        # Keyed on the tool's configured model, so no client is needed for a hit.
+        config = tool_settings(tool_name)
+        raw = f"{config['model']}\x00{config['temperature']}\x00{prompt}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        if self.backend is None:
+            record_cache_outcome("disabled")
+            return None
+        value = self.backend.get(key)
+        if value is None:
+            self.misses += 1
+            record_cache_outcome("miss")
+        else:
+            self.hits += 1
+            record_cache_outcome("hit")
+        return value
+
+    def set(self, key: str, value: str, hcp_name: str) -> None:
+        if self.backend is not None:
+            self.backend.set(key, value, normalize_hcp_name(hcp_name))
+
+    def invalidate_hcp(self, hcp_name: str) -> None:
+        """
+        Drops cached responses for every search term that would match `hcp_name`.
+        History lookups are partial-name matches, so a write for "Dr. Mario Rossi"
+        must also invalidate entries cached under "rossi".
+        """
+        if self.backend is not None and hcp_name:
+            self.invalidations += self.backend.invalidate_tags_within(normalize_hcp_name(hcp_name))
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": settings.LLM_CACHE_BACKEND,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "invalidated_entries": self.invalidations,
+        }
+
+
+def _build_backend():
+    if settings.LLM_CACHE_BACKEND == "memory":
+        return MemoryCacheBackend(settings.LLM_CACHE_MAX_ENTRIES, settings.LLM_CACHE_TTL_SECONDS)
+    if settings.LLM_CACHE_BACKEND == "sqlite":
+        return SQLiteCacheBackend(
+            settings.LLM_CACHE_PATH, settings.LLM_CACHE_MAX_ENTRIES, settings.LLM_CACHE_TTL_SECONDS
+        )
+    return None
+
+
+# Create a single, shared cache instance
+llm_cache = LLMCache(_build_backend())
@@ -0,0 +1,119 @@
+"""
+Process-wide registry of LLM clients.
+
+Clients are built on first use rather than at import, so the app starts (and
+non-AI routes work) without an API key, and importing the agents costs nothing.
+Every client shares one keep-alive HTTP pool per sync/async flavour, so a call
+from any tool reuses warm connections instead of each tool holding its own pool.
+
+Model, temperature, timeout and retries come from settings: LLM_DEFAULT_* for
+all tools, overridden per tool by LLM_TOOL_SETTINGS. LLM_BASE_URL points every
+client at a local stand-in server instead of Groq; `override()` swaps in an
+in-process object for one tool.
+"""
+import threading
+from typing import Any, Dict, Optional
+import httpx
+from app.core.config import settings
+
+LOCAL_STAND_IN_API_KEY = "local-stand-in"
+
+
+def tool_settings(tool_name: str) -> Dict[str, Any]:
+    """The effective model settings for one tool."""
+    return {
+        "model": settings.LLM_DEFAULT_MODEL,
+        "temperature": settings.LLM_DEFAULT_TEMPERATURE,
+        "timeout_seconds": settings.LLM_TIMEOUT_SECONDS,
+        "max_retries": settings.LLM_MAX_RETRIES,
+        **settings.LLM_TOOL_SETTINGS.get(tool_name, {}),
+    }
+
+
+class LLMClientRegistry:
+    def __init__(self):
+        self._clients: Dict[str, Any] = {}
+        self._overrides: Dict[str, Any] = {}
+        self._http_client: Optional[httpx.Client] = None
+        self._http_async_client: Optional[httpx.AsyncClient] = None
+        self._lock = threading.Lock()
+
+    def get(self, tool_name: str):
+        """Returns the client for `tool_name`, creating it (and the shared pools) on first use."""
+        override = self._overrides.get(tool_name)
+        if override is not None:
+            return override
+        client = self._clients.get(tool_name)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(tool_name)
+                if client is None:
+                    client = self._clients[tool_name] = self._build(tool_name)
+        return client
+
+    def override(self, tool_name: str, client) -> None:
+        """Serves `client` for `tool_name` until `clear_overrides()`; for tests and benchmarks."""
+        self._overrides[tool_name] = client
+
+    def clear_overrides(self) -> None:
+        self._overrides.clear()
+
+    def reset(self) -> None:
+        """Drops the built clients so the next call re-reads settings."""
+        with self._lock:
+            self._clients.clear()
+
+    async def aclose(self) -> None:
+        """Closes the shared pools; the next call opens new ones."""
+        with self._lock:
+            self._clients.clear()
+            http_client, self._http_client = self._http_client, None
+            http_async_client, self._http_async_client = self._http_async_client, None
+        if http_client is not None:
+            http_client.close()
+        if http_async_client is not None:
+            await http_async_client.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "clients": sorted(self._clients),
+            "overrides": sorted(self._overrides),
+            "pool_open": self._http_async_client is not None,
+            "base_url": settings.LLM_BASE_URL,
+        }
+
+    def _pool_settings(self) -> Dict[str, Any]:
+        return {
+            "limits": httpx.Limits(
+                max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_SECONDS,
+            ),
+            "timeout": httpx.Timeout(settings.LLM_TIMEOUT_SECONDS, connect=settings.LLM_CONNECT_TIMEOUT_SECONDS),
+        }
+
+    def _build(self, tool_name: str):
+        # Imported here so the agents (and the app) import without loading the SDK.
+        from langchain_groq import ChatGroq
+
+        if self._http_client is None:
+            self._http_client = httpx.Client(**self._pool_settings())
+            self._http_async_client = httpx.AsyncClient(**self._pool_settings())
+        config = tool_settings(tool_name)
+        api_key = settings.GROQ_API_KEY or (LOCAL_STAND_IN_API_KEY if settings.LLM_BASE_URL else None)
+        if not api_key:
+            raise RuntimeError("GROQ_API_KEY is not set; AI features are unavailable.")
+        return ChatGroq(
+            model_name=config["model"],
+            temperature=config["temperature"],
+            request_timeout=config["timeout_seconds"],
+            max_retries=config["max_retries"],
+            groq_api_key=api_key,
+            groq_api_base=settings.LLM_BASE_URL,
+            http_client=self._http_client,
+            http_async_client=self._http_async_client,
+        )
+
+
+# Create a single, shared registry instance
+llm_clients = LLMClientRegistry()
@@ -0,0 +1,204 @@
+"""
+Rate-limit-aware admission control for LLM calls.
+
+Every call waits here for three things: a free concurrency slot, one request
+from the requests-per-minute bucket and its estimated tokens (prompt estimate
+plus expected completion) from the tokens-per-minute bucket. Waiters are served
+strictly by priority class, then arrival order, so interactive calls overtake a
+backlog of background summaries. The head of the queue is never bypassed, so a
+large request can't be starved by a stream of small ones.
+
+The buckets refill at the configured quota times an adaptive scale. A 429 halves
+the scale, drains the buckets and pauses admission for the provider's
+Retry-After, so a burst of failures doesn't turn into a burst of retries. Each
+successful call recovers a little of the scale.
+"""
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Any, Dict, Optional
+from app.core.config import settings
+from app.core.metrics import LLM_QUEUE_DEPTH, LLM_QUEUE_WAIT, LLM_RATE_SCALE
+
+PRIORITIES = {"interactive": 0, "standard": 1, "background": 2}
+MIN_RATE_SCALE = 0.1
+RATE_SCALE_RECOVERY = 0.05
+
+
+def estimate_tokens(prompt: str) -> int:
+    """Prompt tokens (about four characters each) plus the expected completion."""
+    return len(prompt) // 4 + settings.LLM_ESTIMATED_COMPLETION_TOKENS
+
+
+class TokenBucket:
+    """Holds up to one minute of quota; refills continuously."""
+
+    def __init__(self, per_minute: Optional[int]):
+        self.capacity = float(per_minute) if per_minute else None
+        self.tokens = self.capacity or 0.0
+        self.updated_at = time.monotonic()
+
+    def refill(self, now: float, scale: float) -> None:
+        if self.capacity is not None:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.capacity / 60 * scale)
+        self.updated_at = now
+
+    def seconds_until(self, amount: float, scale: float) -> float:
+        if self.capacity is None:
+            return 0.0
+        # A request larger than the whole bucket only has to wait for a full one.
+        missing = min(amount, self.capacity) - self.tokens
+        return max(missing, 0.0) * 60 / (self.capacity * scale)
+
+    def take(self, amount: float) -> None:
+        if self.capacity is not None:
+            self.tokens -= amount  # May go negative; later callers wait off the debt.
+
+    def give_back(self, amount: float) -> None:
+        if self.capacity is not None:
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+    def drain(self) -> None:
+        self.tokens = min(self.tokens, 0.0)
+
+
+class Grant:
+    """One admitted call. Set `used_tokens` once the response reports usage."""
+
+    def __init__(self, estimated_tokens: int):
+        self.estimated_tokens = estimated_tokens
+        self.used_tokens: Optional[int] = None
+
+
+class LLMScheduler:
+    def __init__(self):
+        self.configure()
+
+    def configure(self) -> None:
+        """(Re)reads the limits from settings and clears all state."""
+        self.max_concurrency = settings.LLM_MAX_CONCURRENCY
+        self.requests = TokenBucket(settings.LLM_RATE_LIMIT_REQUESTS_PER_MINUTE)
+        self.tokens = TokenBucket(settings.LLM_RATE_LIMIT_TOKENS_PER_MINUTE)
+        self.rate_scale = 1.0
+        self.paused_until = 0.0
+        self.in_flight = 0
+        self._queue: list = []  # heap of (priority, sequence, future, estimated tokens)
+        self._sequence = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.granted = 0
+        self.rate_limited = 0
+        LLM_RATE_SCALE.set(self.rate_scale)
+
+    async def acquire(self, priority: int, estimated_tokens: int) -> Grant:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self.configure()  # State from a previous (closed) event loop is meaningless here.
+            self._loop = loop
+        future = loop.create_future()
+        heapq.heappush(self._queue, (priority, next(self._sequence), future, estimated_tokens))
+        self._update_depth()
+        queued_at = time.perf_counter()
+        self._pump()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release(future.result(), succeeded=False)  # Granted just as the caller gave up
+            else:
+                self._pump()  # The cancelled waiter may have been blocking the head of the queue.
+            raise
+        finally:
+            self._update_depth()
+        LLM_QUEUE_WAIT.observe(time.perf_counter() - queued_at, _priority_name(priority))
+        return future.result()
+
+    def release(self, grant: Grant, succeeded: bool = True) -> None:
+        self.in_flight -= 1
+        if grant.used_tokens is not None:
+            # Settle the estimate against what the call actually used.
+            difference = grant.estimated_tokens - grant.used_tokens
+            if difference > 0:
+                self.tokens.give_back(difference)
+            else:
+                self.tokens.take(-difference)
+        if succeeded:
+            self.rate_scale = min(1.0, self.rate_scale + RATE_SCALE_RECOVERY)
+            LLM_RATE_SCALE.set(self.rate_scale)
+        self._pump()
+
+    def rate_limited_by_provider(self, retry_after: Optional[float]) -> None:
+        """Backs off after a 429: slower refill, empty buckets, and a pause."""
+        self.rate_limited += 1
+        now = time.monotonic()
+        self.rate_scale = max(MIN_RATE_SCALE, self.rate_scale / 2)
+        LLM_RATE_SCALE.set(self.rate_scale)
+        self.requests.refill(now, self.rate_scale)
+        self.tokens.refill(now, self.rate_scale)
+        self.requests.drain()
+        self.tokens.drain()
+        if retry_after:
+            self.paused_until = max(self.paused_until, now + retry_after)
+
+    def stats(self) -> Dict[str, Any]:
+        depth = {name: 0 for name in PRIORITIES}
+        for priority, _, future, _ in self._queue:
+            if not future.done():
+                depth[_priority_name(priority)] += 1
+        return {
+            "queued": depth,
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "requests_available": None if self.requests.capacity is None else round(self.requests.tokens, 1),
+            "tokens_available": None if self.tokens.capacity is None else round(self.tokens.tokens),
+            "rate_scale": round(self.rate_scale, 3),
+            "paused_for_seconds": round(max(self.paused_until - time.monotonic(), 0.0), 2),
+            "granted": self.granted,
+            "rate_limited": self.rate_limited,
+        }
+
+    def _update_depth(self) -> None:
+        for name, count in self.stats()["queued"].items():
+            LLM_QUEUE_DEPTH.set(count, name)
+
+    def _pump(self) -> None:
+        """Grants as many queued calls, in order, as the slots and buckets allow."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._queue:
+            _, _, future, estimated_tokens = self._queue[0]
+            if future.done():  # Cancelled while waiting
+                heapq.heappop(self._queue)
+                continue
+            if self.in_flight >= self.max_concurrency:
+                return  # release() pumps again
+            now = time.monotonic()
+            self.requests.refill(now, self.rate_scale)
+            self.tokens.refill(now, self.rate_scale)
+            wait = max(
+                self.paused_until - now,
+                self.requests.seconds_until(1, self.rate_scale),
+                self.tokens.seconds_until(estimated_tokens, self.rate_scale),
+            )
+            if wait > 0:
+                self._timer = self._loop.call_later(wait, self._pump)
+                return
+            heapq.heappop(self._queue)
+            self.requests.take(1)
+            self.tokens.take(estimated_tokens)
+            self.in_flight += 1
+            self.granted += 1
+            future.set_result(Grant(estimated_tokens))
+
+
+def _priority_name(priority: int) -> str:
+    for name, value in PRIORITIES.items():
+        if value == priority:
+            return name
+    return str(priority)
+
+
+# Create a single, shared scheduler instance
+llm_scheduler = LLMScheduler()
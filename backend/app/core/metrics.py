@@ -0,0 +1,297 @@
+"""
+In-process metrics for agent tools, LLM calls and CRUD functions.
+
+Histograms and counters are kept per label set and rendered in the Prometheus
+text exposition format by `render_prometheus()` (served at GET /metrics).
+
+Timings can also be returned on the response itself: when a request sends
+`X-Server-Timing: 1`, every phase timed while handling it is listed in a
+`Server-Timing` response header (see ServerTimingMiddleware).
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Dict, List, Optional, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Tuple[str, str] = None) -> str:
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_number(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {_format_number(value)}")
+        return lines
+
+
+class Gauge:
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def set(self, value: float, *label_values: str) -> None:
+        with self._lock:
+            self._values[label_values] = value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} gauge"]
+        with self._lock:
+            for label_values, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, label_values)} {_format_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> (per-bucket counts with a final +Inf slot, sum, count)
+        self._series: Dict[Tuple[str, ...], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *label_values: str) -> None:
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][bisect_left(self.buckets, value)] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_values, (counts, total, count) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == float("inf") else _format_number(bound)
+                    labels = _format_labels(self.labels, label_values, ("le", le))
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.labels, label_values)
+                lines.append(f"{self.name}_sum{labels} {_format_number(total)}")
+                lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+TOOL_DURATION = Histogram(
+    "hcp_tool_duration_seconds", "End-to-end duration of agent tool calls.", ["tool", "status"])
+TOOL_PHASE_DURATION = Histogram(
+    "hcp_tool_phase_duration_seconds", "Duration of each phase inside an agent tool.", ["tool", "phase"])
+LLM_TOKENS = Histogram(
+    "hcp_llm_tokens", "Prompt and completion tokens per LLM call.", ["tool", "kind"], buckets=TOKEN_BUCKETS)
+JSON_PARSE_FAILURES = Counter(
+    "hcp_llm_json_parse_failures_total", "LLM responses without a parseable JSON block.", ["tool"])
+CACHE_REQUESTS = Counter(
+    "hcp_llm_cache_requests_total", "LLM response cache lookups by outcome.", ["outcome"])
+CRUD_DURATION = Histogram(
+    "hcp_crud_duration_seconds", "Duration of CRUD functions.", ["operation"])
+SINGLE_FLIGHT = Counter(
+    "hcp_single_flight_calls_total", "Coalesced tool calls; followers shared a leader's execution.", ["tool", "role"])
+LLM_QUEUE_DEPTH = Gauge(
+    "hcp_llm_queue_depth", "LLM calls waiting in the scheduler, by priority class.", ["priority"])
+LLM_QUEUE_WAIT = Histogram(
+    "hcp_llm_queue_wait_seconds", "Time LLM calls waited in the scheduler, by priority class.", ["priority"])
+LLM_RATE_SCALE = Gauge(
+    "hcp_llm_rate_scale", "Fraction of the configured LLM quota the scheduler currently admits.")
+LLM_RETRIES = Counter(
+    "hcp_llm_retries_total", "LLM calls retried after a transient failure.", ["tool", "reason"])
+RESPONSE_CACHE = Counter(
+    "hcp_response_cache_requests_total",
+    "Conditional collection reads by outcome (not_modified, hit, miss, uncacheable).", ["route", "outcome"])
+FOLLOWUP_JOBS = Counter(
+    "hcp_followup_jobs_total",
+    "Follow-up generation jobs by outcome (enqueued, shed, done, retried, dead).", ["outcome"])
+FOLLOWUP_QUEUE_DEPTH = Gauge(
+    "hcp_followup_jobs_queued", "Follow-up generation jobs waiting in followup_jobs, as of the last poll.")
+EDIT_DURATION = Histogram(
+    "hcp_edit_duration_seconds", "Duration of successful AI edits by the path that served them (local, llm).",
+    ["source"])
+
+REGISTRY = [
+    TOOL_DURATION, TOOL_PHASE_DURATION, LLM_TOKENS, JSON_PARSE_FAILURES, CACHE_REQUESTS, CRUD_DURATION, SINGLE_FLIGHT,
+    LLM_QUEUE_DEPTH, LLM_QUEUE_WAIT, LLM_RATE_SCALE, LLM_RETRIES, RESPONSE_CACHE, FOLLOWUP_JOBS, FOLLOWUP_QUEUE_DEPTH,
+    EDIT_DURATION,
+]
+
+
+def render_prometheus() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# --- Server-Timing ---
+# Holds the (name, seconds) entries of the current request when it opted in.
+# run_in_threadpool copies the context, so phases timed in worker threads land
+# in the same list.
+_server_timings: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("server_timings", default=None)
+
+
+def start_server_timing() -> List[Tuple[str, float]]:
+    timings: List[Tuple[str, float]] = []
+    _server_timings.set(timings)
+    return timings
+
+
+def format_server_timing(timings: List[Tuple[str, float]]) -> str:
+    return ", ".join(f"{name};dur={1000 * seconds:.2f}" for name, seconds in timings)
+
+
+def _add_server_timing(name: str, seconds: float) -> None:
+    timings = _server_timings.get()
+    if timings is not None:
+        timings.append((name.replace(" ", "_"), seconds))
+
+
+def observe_phase(tool: str, phase: str, seconds: float) -> None:
+    TOOL_PHASE_DURATION.observe(seconds, tool, phase)
+    _add_server_timing(f"{tool}.{phase}", seconds)
+
+
+@contextmanager
+def timed_phase(tool: str, phase: str):
+    """Times one phase of an agent tool (e.g. "history", "prompt", "llm", "parse")."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_phase(tool, phase, time.perf_counter() - started)
+
+
+def record_tokens(tool: str, usage: Optional[dict]) -> None:
+    """Records the `usage_metadata` LangChain attaches to a response, when present."""
+    if not usage:
+        return
+    if usage.get("input_tokens") is not None:
+        LLM_TOKENS.observe(usage["input_tokens"], tool, "prompt")
+    if usage.get("output_tokens") is not None:
+        LLM_TOKENS.observe(usage["output_tokens"], tool, "completion")
+
+
+def record_json_parse_failure(tool: str) -> None:
+    JSON_PARSE_FAILURES.inc(tool)
+
+
+def record_cache_outcome(outcome: str) -> None:
+    CACHE_REQUESTS.inc(outcome)
+
+
+def record_single_flight(tool: str, role: str) -> None:
+    SINGLE_FLIGHT.inc(tool, role)
+
+
+def record_llm_retry(tool: str, reason: str) -> None:
+    LLM_RETRIES.inc(tool, reason)
+
+
+def record_response_cache(route: str, outcome: str) -> None:
+    RESPONSE_CACHE.inc(route, outcome)
+
+
+def record_followup_job(outcome: str) -> None:
+    FOLLOWUP_JOBS.inc(outcome)
+
+
+def record_edit(source: str, seconds: float) -> None:
+    EDIT_DURATION.observe(seconds, source)
+
+
+def instrument_tool(tool: str):
+    """Decorates an async agent tool to record its duration by the returned status."""
+    def decorator(fn):
+        @wraps(fn)
+        async def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            status = "exception"
+            try:
+                result = await fn(*args, **kwargs)
+                status = result.get("status", "unknown") if isinstance(result, dict) else "unknown"
+                return result
+            finally:
+                elapsed = time.perf_counter() - started
+                TOOL_DURATION.observe(elapsed, tool, status)
+                _add_server_timing(tool, elapsed)
+        return wrapper
+    return decorator
+
+
+def instrument_crud(fn):
+    """Decorates a CRUD function to record its duration under its own name."""
+    operation = fn.__name__
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            CRUD_DURATION.observe(elapsed, operation)
+            _add_server_timing(f"crud.{operation}", elapsed)
+    return wrapper
+
+
+class ServerTimingMiddleware:
+    """
+    Adds a `Server-Timing` header to responses of requests that send
+    `X-Server-Timing: 1`. Streaming responses only include the phases that
+    finished before their first byte.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or (b"x-server-timing", b"1") not in scope["headers"]:
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        timings = start_server_timing()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                entries = timings + [("total", time.perf_counter() - started)]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", format_server_timing(entries).encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_timing)
@@ -0,0 +1,17 @@
+import re
+from typing import Set
+
+_NON_ALNUM = re.compile(r"[\W_]+")
+
+
+def normalize_hcp_name(name: str) -> str:
+    """
+    Canonical form used for HCP name lookups: case-folded, with punctuation and
+    repeated whitespace collapsed to single spaces ("Dr. Mario  Rossi" -> "dr mario rossi").
+    """
+    return _NON_ALNUM.sub(" ", (name or "").casefold()).strip()
+
+
+def name_trigrams(normalized_name: str) -> Set[str]:
+    """Distinct 3-character substrings of an already-normalized name."""
+    return {normalized_name[i:i + 3] for i in range(len(normalized_name) - 2)}
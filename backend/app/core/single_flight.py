@@ -0,0 +1,58 @@
+import asyncio
+from functools import wraps
+from typing import Any, Awaitable, Callable, Dict, Hashable
+from app.core.metrics import record_single_flight
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key: the first caller starts the
+    work, later callers await the same in-flight task and get the same result,
+    or the same exception. Once the task finishes the key is released, so this
+    never serves stale results; it only removes duplicate concurrent work.
+
+    The work runs in its own task, so a caller that is cancelled (for example
+    because its client disconnected) does not cancel it for the others.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, asyncio.Task] = {}
+
+    async def run(self, key: Hashable, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        label = str(key[0] if isinstance(key, tuple) else key)
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn(*args, **kwargs))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._release(key, done))
+            record_single_flight(label, "leader")
+        else:
+            record_single_flight(label, "follower")
+        return await asyncio.shield(task)
+
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    def _release(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved in case every caller went away.
+            task.exception()
+
+
+# Create a single, shared group for the whole process
+single_flight_group = SingleFlight()
+
+
+def single_flight(tool: str, key_fn: Callable[..., Hashable]):
+    """
+    Decorates an async tool so concurrent calls with the same `key_fn(*args, **kwargs)`
+    share one execution.
+    """
+    def decorator(fn):
+        @wraps(fn)
+        async def wrapper(*args, **kwargs):
+            return await single_flight_group.run((tool, key_fn(*args, **kwargs)), fn, *args, **kwargs)
+        return wrapper
+    return decorator
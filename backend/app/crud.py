@@ -1,16 +1,141 @@
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 from . import models, schemas
-from typing import List
+from .core.names import normalize_hcp_name
+from .core.llm_cache import llm_cache
+from .core.metrics import instrument_crud
+from .services.hcp_name_index import register_hcp_name
+from .services.briefing_store import briefing_refresher
+from .services.followup_jobs import followup_worker
+from .services import list_items, rollups
+from .services.interaction_rows import projected_query
+from .services.semantic_index import semantic_index
+from typing import Any, Dict, List, Optional
+from datetime import date, datetime, timedelta
+from .pagination import NEWEST_FIRST, apply_cursor
 
+@instrument_crud
 def get_interaction(db: Session, interaction_id: int):
-    return db.query(models.HCPInteraction).filter(models.HCPInteraction.id == interaction_id).first()
+    query = list_items.with_list_items(db.query(models.HCPInteraction))
+    return query.filter(models.HCPInteraction.id == interaction_id).first()
 
-def get_all_interactions(db: Session, skip: int = 0, limit: int = 100) -> List[models.HCPInteraction]:
-    return db.query(models.HCPInteraction).offset(skip).limit(limit).all()
+@instrument_crud
+def get_interaction_snapshot(db: Session, interaction_id: int) -> Optional[Dict[str, Any]]:
+    """Returns the interaction as a plain dict, detached from the session, or None."""
+    db_interaction = get_interaction(db, interaction_id)
+    if db_interaction is None:
+        return None
+    return schemas.InteractionOut.model_validate(db_interaction).model_dump()
 
+def _interactions_query(db: Session, projected: bool):
+    # Projected reads return rows of InteractionOut's columns (see interaction_rows.to_dicts).
+    return projected_query(db) if projected else list_items.with_list_items(db.query(models.HCPInteraction))
+
+@instrument_crud
+def get_all_interactions(
+    db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None, projected: bool = False
+) -> List[models.HCPInteraction]:
+    query = _interactions_query(db, projected).order_by(*NEWEST_FIRST)
+    if cursor:
+        # Keyset pagination: `skip` is ignored and deep pages cost the same as page 1.
+        query = apply_cursor(query, cursor)
+    else:
+        query = query.offset(skip)
+    return query.limit(limit).all()
+
+@instrument_crud
+def get_interactions_by_items(
+    db: Session,
+    filters: Dict[str, Optional[str]],
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    projected: bool = False,
+) -> List[models.HCPInteraction]:
+    """Interactions, newest first, having every given `{list field: value}` pair."""
+    M = models.HCPInteraction
+    query = list_items.filter_by_items(_interactions_query(db, projected), filters)
+    if start_date:
+        query = query.filter(M.date >= start_date)
+    if end_date:
+        query = query.filter(M.date <= end_date)
+    query = query.order_by(*NEWEST_FIRST)
+    if cursor:
+        query = apply_cursor(query, cursor)
+    return query.limit(limit).all()
+
+@instrument_crud
 def create_interaction(db: Session, interaction: schemas.InteractionCreate) -> models.HCPInteraction:
-    db_interaction = models.HCPInteraction(**interaction.model_dump())
+    data = interaction.model_dump()
+    db_interaction = models.HCPInteraction(**data, list_items=list_items.build_items(data))
     db.add(db_interaction)
+    # Follow-ups are generated in the background; the job commits with the row.
+    needs_followups = data["ai_suggested_followups"] is None
+    if needs_followups:
+        followup_worker.enqueue(db, db_interaction)
+    register_hcp_name(db, db_interaction.hcp_name)
+    rollups.record_interactions(db, [data])
     db.commit()
     db.refresh(db_interaction)
-    return db_interaction
\ No newline at end of file
+    llm_cache.invalidate_hcp(db_interaction.hcp_name)
+    briefing_refresher.schedule(db_interaction.hcp_name)
+    semantic_index.mark_dirty()
+    if needs_followups:
+        followup_worker.notify()
+    return db_interaction
+
+# Edits to these fields move an interaction between rollup buckets or counters.
+ROLLUP_FIELDS = {"hcp_name", "date", "interaction_type", "sentiment"}
+
+@instrument_crud
+def update_interaction_if_unmodified(
+    db: Session, interaction_id: int, expected_updated_at: datetime, changes: Dict[str, Any]
+) -> Dict[str, Any]:
+    """
+    Applies `changes` with a single `UPDATE ... WHERE id = ? AND updated_at = ?`.
+
+    This is an optimistic-concurrency check: if anyone else wrote the row since
+    `expected_updated_at` was read, nothing is written and the current timestamp
+    is reported back as a conflict.
+    """
+    M = models.HCPInteraction
+    # MySQL DATETIME stores whole seconds, so the new timestamp must land on a
+    # later second than the one being replaced or a second edit could not tell.
+    new_updated_at = datetime.utcnow().replace(microsecond=0)
+    if new_updated_at <= expected_updated_at:
+        new_updated_at = expected_updated_at.replace(microsecond=0) + timedelta(seconds=1)
+
+    values = dict(changes, updated_at=new_updated_at)
+    if "hcp_name" in changes:
+        values["hcp_name_normalized"] = normalize_hcp_name(changes["hcp_name"])
+        register_hcp_name(db, changes["hcp_name"])
+
+    old_bucket = None
+    if changes.keys() & ROLLUP_FIELDS:
+        old_bucket = db.query(M.hcp_name_normalized, M.date).filter(M.id == interaction_id).first()
+
+    result = db.execute(
+        update(M)
+        .where(M.id == interaction_id, M.updated_at == expected_updated_at)
+        .values(**values)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 1:
+        if old_bucket is not None:
+            # Recount the buckets the row left and the ones it moved into.
+            new_name = values.get("hcp_name_normalized", old_bucket.hcp_name_normalized)
+            new_date = changes.get("date", old_bucket.date)
+            rollups.recompute_buckets(db, old_bucket.hcp_name_normalized, [old_bucket.date])
+            if (new_name, new_date) != tuple(old_bucket):
+                rollups.recompute_buckets(db, new_name, [new_date])
+        list_items.replace_items(db, interaction_id, changes)
+        db.commit()
+        semantic_index.mark_dirty()
+        return {"status": "success", "updated_at": new_updated_at}
+
+    db.rollback()
+    current_updated_at = db.query(M.updated_at).filter(M.id == interaction_id).scalar()
+    if current_updated_at is None:
+        return {"status": "not_found"}
+    return {"status": "conflict", "current_updated_at": current_updated_at}
@@ -15,4 +15,13 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def with_session(fn, *args, **kwargs):
+    """
+    Runs `fn(db, *args, **kwargs)` in a short-lived session and closes it right away.
+    AI flows use this to read or write in small phases, so no pooled connection is
+    held while they wait on the LLM.
+    """
+    with SessionLocal() as db:
+        return fn(db, *args, **kwargs)
@@ -1,16 +1,49 @@
+from contextlib import asynccontextmanager
+from anyio import to_thread
 from fastapi import FastAPI
-from .database import engine, Base
+from fastapi.responses import PlainTextResponse
+from .database import engine
 from .routers import interactions  # Import the consolidated router
 from fastapi.middleware.cors import CORSMiddleware
+from .core.config import settings
+from .core.llm_clients import llm_clients
+from .core.metrics import ServerTimingMiddleware, render_prometheus
+from .migrations import pending_migrations
+from .services.briefing_store import briefing_refresher
+from .services.followup_jobs import followup_worker
+from .services.semantic_index import semantic_index
 from dotenv import load_dotenv
 load_dotenv()
-# Create database tables on startup
-Base.metadata.create_all(bind=engine)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema changes are applied at deploy time (python -m app.migrations upgrade).
+    pending = pending_migrations(engine)
+    if pending:
+        raise RuntimeError(
+            f"{len(pending)} schema migrations are pending; run `python -m app.migrations upgrade` first."
+        )
+    # Sync routes and DB calls share this threadpool; LLM calls never occupy it.
+    to_thread.current_default_thread_limiter().total_tokens = settings.THREADPOOL_SIZE
+    if settings.BRIEFING_STORE_ENABLED:
+        briefing_refresher.start()
+    if settings.FOLLOWUP_WORKER_ENABLED:
+        followup_worker.start()
+    # Embeds new and edited notes off the request path (the whole table on a cold index).
+    semantic_index.start()
+    yield
+    await semantic_index.stop()
+    if settings.FOLLOWUP_WORKER_ENABLED:
+        await followup_worker.stop()
+    if settings.BRIEFING_STORE_ENABLED:
+        await briefing_refresher.stop()
+    await llm_clients.aclose()
 
 app = FastAPI(
     title="AI-First HCP CRM Backend",
     description="A CRM backend powered by FastAPI and AI Agent Tools.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware to allow communication with the frontend
@@ -20,11 +53,19 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Server-Timing", "X-Briefing-Generated-At", "X-Briefing-Stale", "ETag"],
 )
+if settings.SERVER_TIMING_ENABLED:
+    app.add_middleware(ServerTimingMiddleware)
 
 # Include all the API routes from the interactions router
 app.include_router(interactions.router)
 
 @app.get("/", tags=["Root"])
 def read_root():
-    return {"status": "AI-First CRM Backend is running"}
\ No newline at end of file
+    return {"status": "AI-First CRM Backend is running"}
+
+@app.get("/metrics", tags=["Root"], response_class=PlainTextResponse)
+def read_metrics():
+    """Tool, LLM and CRUD metrics in the Prometheus text exposition format."""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,141 @@
+"""
+Versioned schema migrations, applied at deploy time rather than on app import:
+
+    cd backend
+    python -m app.migrations upgrade     # apply every pending migration, in order
+    python -m app.migrations status      # list applied and pending migrations
+
+Each migration runs in its own transaction and is then recorded in
+schema_migrations. MySQL commits DDL as it goes, so a migration that fails
+halfway is not rolled back; every step checks what already exists before
+changing it, which makes re-running `upgrade` safe after a failure and on a
+database first set up by an older create_all or by hand. Run it from one deploy
+step, not from every app instance. The app refuses to start while migrations are
+pending.
+
+Index builds on a large hcp_interactions table take a while; MySQL builds them
+online (reads and writes carry on meanwhile).
+"""
+import sys
+from typing import Callable, List, NamedTuple, Set
+from sqlalchemy import inspect, insert, select
+from sqlalchemy.engine import Connection, Engine
+from app import models
+from app.database import Base
+
+M = models.HCPInteraction
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    apply: Callable[[Connection], None]
+
+
+MIGRATIONS: List[Migration] = []
+
+
+def migration(version: int, name: str):
+    """Registers the decorated function as migration `version`. Versions must increase."""
+    def register(fn: Callable[[Connection], None]):
+        if MIGRATIONS and version <= MIGRATIONS[-1].version:
+            raise ValueError(f"Migration {version} ({name}) is out of order")
+        MIGRATIONS.append(Migration(version, name, fn))
+        return fn
+    return register
+
+
+def _has_column(connection: Connection, table: str, column: str) -> bool:
+    return column in {c["name"] for c in inspect(connection).get_columns(table)}
+
+
+def _has_index(connection: Connection, table: str, index: str) -> bool:
+    return index in {i["name"] for i in inspect(connection).get_indexes(table)}
+
+
+def _create_index(connection: Connection, name: str, table=M.__table__) -> None:
+    index = next(index for index in table.indexes if index.name == name)
+    index.create(connection, checkfirst=True)
+
+
+def _drop_index(connection: Connection, table: str, name: str) -> None:
+    if _has_index(connection, table, name):
+        on_table = f" ON {table}" if connection.dialect.name == "mysql" else ""
+        connection.exec_driver_sql(f"DROP INDEX {name}{on_table}")
+
+
+@migration(1, "create tables")
+def _create_tables(connection: Connection) -> None:
+    # Creates only missing tables (with their indexes); existing ones are left alone.
+    Base.metadata.create_all(bind=connection)
+
+
+@migration(2, "add hcp_interactions.hcp_name_normalized")
+def _add_normalized_name(connection: Connection) -> None:
+    # Filled by `python -m app.services.hcp_name_index rebuild`.
+    if not _has_column(connection, M.__tablename__, "hcp_name_normalized"):
+        column_type = M.__table__.c.hcp_name_normalized.type.compile(dialect=connection.dialect)
+        connection.exec_driver_sql(
+            f"ALTER TABLE {M.__tablename__} ADD COLUMN hcp_name_normalized {column_type}"
+        )
+
+
+@migration(3, "index hcp_interactions.updated_at")
+def _index_updated_at(connection: Connection) -> None:
+    _create_index(connection, "ix_hcp_interactions_updated_at")
+
+
+@migration(4, "composite indexes for history and list reads")
+def _composite_indexes(connection: Connection) -> None:
+    _create_index(connection, "ix_hcp_interactions_name_date_time_id")
+    _create_index(connection, "ix_hcp_interactions_date_time_id")
+    # Its one column is the leading column of ix_hcp_interactions_name_date_time_id.
+    _drop_index(connection, M.__tablename__, "ix_hcp_interactions_hcp_name_normalized")
+
+
+@migration(5, "create followup_jobs")
+def _create_followup_jobs(connection: Connection) -> None:
+    models.FollowupJob.__table__.create(connection, checkfirst=True)
+
+
+@migration(6, "index followup_jobs.status, updated_at")
+def _index_followup_jobs_updated_at(connection: Connection) -> None:
+    _create_index(connection, "ix_followup_jobs_status_updated_at", models.FollowupJob.__table__)
+
+
+def applied_versions(connection: Connection) -> Set[int]:
+    if not inspect(connection).has_table(models.SchemaMigration.__tablename__):
+        return set()
+    return set(connection.execute(select(models.SchemaMigration.version)).scalars())
+
+
+def pending_migrations(engine: Engine) -> List[Migration]:
+    with engine.connect() as connection:
+        applied = applied_versions(connection)
+    return [m for m in MIGRATIONS if m.version not in applied]
+
+
+def upgrade(engine: Engine) -> List[Migration]:
+    """Applies every pending migration in version order. Returns the ones applied."""
+    models.SchemaMigration.__table__.create(engine, checkfirst=True)
+    pending = pending_migrations(engine)
+    for m in pending:
+        with engine.begin() as connection:
+            m.apply(connection)
+            connection.execute(insert(models.SchemaMigration).values(version=m.version, name=m.name))
+    return pending
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] not in (["upgrade"], ["status"]):
+        sys.exit("usage: python -m app.migrations upgrade|status")
+    from app.database import engine
+    if sys.argv[1] == "upgrade":
+        applied = upgrade(engine)
+        for m in applied:
+            print(f"Applied {m.version:04d} {m.name}")
+        print(f"Applied {len(applied)} migrations." if applied else "Schema is up to date.")
+    else:
+        pending = {m.version for m in pending_migrations(engine)}
+        for m in MIGRATIONS:
+            print(f"{'pending' if m.version in pending else 'applied':<9}{m.version:04d} {m.name}")
@@ -1,5 +1,7 @@
-from sqlalchemy import (Column, Integer, String, DateTime, Text, Enum, JSON, Date, Time)
+from sqlalchemy import (Column, Integer, String, DateTime, Text, Enum, JSON, Date, Time, ForeignKey, Index)
+from sqlalchemy.orm import relationship, validates
 from .database import Base
+from .core.names import normalize_hcp_name
 import enum
 from datetime import datetime
 
@@ -15,9 +17,17 @@ class SentimentEnum(str, enum.Enum):
 
 class HCPInteraction(Base):
     __tablename__ = "hcp_interactions"
+    __table_args__ = (
+        # One HCP's interactions newest first (NEWEST_FIRST): history, summaries, rollups.
+        Index("ix_hcp_interactions_name_date_time_id", "hcp_name_normalized", "date", "time", "id"),
+        # Every interaction newest first: the interaction list and its cursor pages.
+        Index("ix_hcp_interactions_date_time_id", "date", "time", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     hcp_name = Column(String(255), nullable=False)
+    # Kept in sync with hcp_name; history lookups filter on this indexed column.
+    hcp_name_normalized = Column(String(255), nullable=True)
     
     # --- FIX APPLIED HERE ---
     # The 'values_callable' tells SQLAlchemy to use the .value of the enum
@@ -44,4 +54,140 @@ class HCPInteraction(Base):
     follow_up_actions = Column(JSON, nullable=True)
     ai_suggested_followups = Column(JSON, nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
-    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
\ No newline at end of file
+    # Indexed so the semantic index can find rows changed since its last sync.
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, index=True)
+
+    # Row-per-value copy of the JSON list columns above, for indexed filtering.
+    list_items = relationship(
+        "HCPInteractionListItem",
+        order_by="(HCPInteractionListItem.field, HCPInteractionListItem.position)",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+    )
+
+    @validates("hcp_name")
+    def _sync_normalized_name(self, key, value):
+        self.hcp_name_normalized = normalize_hcp_name(value)
+        return value
+
+class HCPInteractionListItem(Base):
+    """One entry of an interaction's list field (attendees, materials_shared, ...)."""
+    __tablename__ = "hcp_interaction_list_items"
+    __table_args__ = (
+        Index("ix_list_items_field_value", "field", "value_key", "interaction_id"),
+    )
+
+    interaction_id = Column(Integer, ForeignKey("hcp_interactions.id", ondelete="CASCADE"), primary_key=True)
+    field = Column(String(32), primary_key=True)
+    position = Column(Integer, primary_key=True)
+    value = Column(Text, nullable=False)
+    # Case- and whitespace-folded, length-capped copy of `value` that filters match on.
+    value_key = Column(String(255), nullable=False)
+
+class HCPName(Base):
+    """One row per distinct normalized HCP name, the unit the trigram index points at."""
+    __tablename__ = "hcp_names"
+
+    id = Column(Integer, primary_key=True, index=True)
+    name_normalized = Column(String(255), nullable=False, unique=True)
+    display_name = Column(String(255), nullable=False)
+    trigram_count = Column(Integer, nullable=False)
+
+class HCPNameTrigram(Base):
+    """Posting list: which HCP names contain a given trigram."""
+    __tablename__ = "hcp_name_trigrams"
+
+    trigram = Column(String(3), primary_key=True)
+    hcp_name_id = Column(Integer, ForeignKey("hcp_names.id", ondelete="CASCADE"), primary_key=True)
+
+class HCPBriefing(Base):
+    """
+    The latest generated briefing (summary + suggestions) for one HCP, with the
+    watermark of the interactions it was generated from.
+    """
+    __tablename__ = "hcp_briefings"
+
+    hcp_name_normalized = Column(String(255), primary_key=True)
+    hcp_name = Column(String(255), nullable=False)
+    summary = Column(JSON, nullable=True)
+    suggestions = Column(JSON, nullable=True)
+    recent_history = Column(JSON, nullable=True)
+    errors = Column(JSON, nullable=True)
+    # max(updated_at) and count(*) of the HCP's interactions when generation started
+    source_updated_at = Column(DateTime, nullable=True)
+    source_count = Column(Integer, nullable=False, default=0)
+    generated_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+class HCPInteractionRollup(Base):
+    """Interaction counts for one HCP in one week or month, maintained by app.services.rollups."""
+    __tablename__ = "hcp_interaction_rollups"
+
+    hcp_name_normalized = Column(String(255), primary_key=True)
+    period = Column(String(8), primary_key=True)  # "week" or "month"
+    period_start = Column(Date, primary_key=True)
+    hcp_name = Column(String(255), nullable=False)
+    total = Column(Integer, nullable=False, default=0)
+    meetings = Column(Integer, nullable=False, default=0)
+    calls = Column(Integer, nullable=False, default=0)
+    virtual = Column(Integer, nullable=False, default=0)
+    positive = Column(Integer, nullable=False, default=0)
+    neutral = Column(Integer, nullable=False, default=0)
+    negative = Column(Integer, nullable=False, default=0)
+    last_interaction_date = Column(Date, nullable=True)
+
+class ExtractionBatch(Base):
+    """A batch of free-text notes submitted for structured extraction."""
+    __tablename__ = "extraction_batches"
+
+    id = Column(String(64), primary_key=True)
+    total_notes = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class ExtractionBatchItem(Base):
+    """The stored outcome for one note, so a resumed batch can skip finished work."""
+    __tablename__ = "extraction_batch_items"
+
+    batch_id = Column(String(64), ForeignKey("extraction_batches.id", ondelete="CASCADE"), primary_key=True)
+    item_index = Column(Integer, primary_key=True)
+    note_hash = Column(String(64), nullable=False)
+    # "success", "invalid" (extracted but failed validation) or "failed"
+    status = Column(String(16), nullable=False)
+    result = Column(JSON, nullable=True)
+    errors = Column(JSON, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class FollowupJob(Base):
+    """
+    A queued request to generate an interaction's ai_suggested_followups; the
+    durable queue behind app.services.followup_jobs.
+    """
+    __tablename__ = "followup_jobs"
+    __table_args__ = (
+        # The poller's claim query: due jobs in one status, oldest first.
+        Index("ix_followup_jobs_status_run_after", "status", "run_after"),
+        # The newest finished job, part of the collection ETags (app.core.http_cache).
+        Index("ix_followup_jobs_status_updated_at", "status", "updated_at"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    interaction_id = Column(Integer, ForeignKey("hcp_interactions.id", ondelete="CASCADE"), nullable=False)
+    # Lets a job be added in the same flush as a new interaction, before it has an id.
+    interaction = relationship("HCPInteraction")
+    # "queued", "running", "done" or "dead" (out of attempts; see last_error)
+    status = Column(String(16), nullable=False, default="queued")
+    attempts = Column(Integer, nullable=False, default=0)
+    run_after = Column(DateTime, nullable=False, default=datetime.utcnow)
+    # A running job whose lease expires (its worker died) is queued again.
+    locked_until = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+class SchemaMigration(Base):
+    """One row per applied schema migration (see app.migrations)."""
+    __tablename__ = "schema_migrations"
+
+    version = Column(Integer, primary_key=True)
+    name = Column(String(255), nullable=False)
+    applied_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,70 @@
+import base64
+import json
+from datetime import date, time
+from typing import Optional, Tuple
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Query
+from . import models
+
+# Newest first, with the primary key as a tie-breaker so the order is total.
+NEWEST_FIRST = (
+    models.HCPInteraction.date.desc(),
+    models.HCPInteraction.time.desc(),
+    models.HCPInteraction.id.desc(),
+)
+
+
+def encode_cursor(interaction: models.HCPInteraction) -> str:
+    """Builds an opaque cursor pointing just past `interaction` in NEWEST_FIRST order."""
+    raw = json.dumps([interaction.date.isoformat(), interaction.time.isoformat(), interaction.id])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[date, time, int]:
+    """Reverses encode_cursor. Raises ValueError for anything it did not produce."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw_date, raw_time, raw_id = json.loads(base64.urlsafe_b64decode(padded))
+        return date.fromisoformat(raw_date), time.fromisoformat(raw_time), int(raw_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def apply_cursor(query: Query, cursor: str) -> Query:
+    """
+    Restricts `query` to rows that come after `cursor` in NEWEST_FIRST order.
+
+    The row comparison is spelled out as OR-ed ranges (with a leading `date <= ?`)
+    because MySQL only turns that form into an index range scan.
+    """
+    cursor_date, cursor_time, cursor_id = decode_cursor(cursor)
+    M = models.HCPInteraction
+    return query.filter(
+        M.date <= cursor_date,
+        or_(
+            M.date < cursor_date,
+            and_(M.date == cursor_date, M.time < cursor_time),
+            and_(M.date == cursor_date, M.time == cursor_time, M.id < cursor_id),
+        ),
+    )
+
+
+def count_capped(query: Query, cap: int) -> Tuple[int, bool]:
+    """
+    Counts the rows of `query`, but stops scanning after `cap + 1` of them.
+
+    Returns the count and whether it is exact. A capped count is a lower bound,
+    which keeps the cost of the opt-in total bounded on very large result sets.
+    """
+    limited = query.order_by(None).with_entities(models.HCPInteraction.id).limit(cap + 1).subquery()
+    total = query.session.query(func.count()).select_from(limited).scalar()
+    if total > cap:
+        return cap, False
+    return total, True
+
+
+def next_cursor(rows: list, page_size: int) -> Optional[str]:
+    """Returns the cursor for the following page, or None if `rows` was the last one."""
+    if len(rows) < page_size or not rows:
+        return None
+    return encode_cursor(rows[-1])
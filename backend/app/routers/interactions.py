@@ -1,19 +1,43 @@
-from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi import APIRouter, Depends, HTTPException, Body, Query, Request, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
+import json
+import orjson
+import uuid
 from typing import List, Dict, Any, Optional
-from datetime import date
-from pydantic import BaseModel
+from datetime import date, datetime
+from pydantic import BaseModel, Field, ValidationError
+from starlette.concurrency import run_in_threadpool
 
 # Local application imports
 from .. import crud, models, schemas
-from ..database import get_db
+from ..database import get_db, with_session
+from ..pagination import decode_cursor, next_cursor
+from ..services.hcp_name_index import search_hcp_names
+from ..services.conversation_sessions import conversation_sessions, changed_fields
+from ..services.bulk_ingest import BulkIngestor
+from ..services.export import FORMATS, export_interactions
+from ..services.rollups import get_analytics_overview, get_hcp_analytics
+from ..services.list_items import FIELD_ALIASES, hcps_with_value, top_values
+from ..services.interaction_rows import to_dicts
+from ..services.semantic_index import search_interactions
+from ..services.followup_jobs import followup_worker, job_counts
+from ..services.batch_extraction import run_extraction_batch, start_extraction_batch, get_batch_status
+from ..services.briefing_store import (
+    PRIORITY_READ, briefing_refresher, get_stored_briefing, is_known_hcp, refresh_briefing
+)
+from ..core.config import settings
+from ..core.http_cache import conditional_response
+from ..core.llm_cache import llm_cache
+from ..core.llm_scheduler import llm_scheduler
 
 # Import all AI agent tools
-from ..agents.conversation_tool import conversation_tool
+from ..agents.conversation_tool import conversation_tool, stream_conversation_tool
 from ..agents.edit_interaction_tool import edit_interaction_tool
-from ..agents.fetch_hcp_history_tool import fetch_hcp_history_tool
+from ..agents.fetch_hcp_history_tool import fetch_hcp_history_tool, filter_history
 from ..agents.summarize_history_tool import summarize_history_tool
 from ..agents.suggest_next_action_tool import suggest_next_action_tool
+from ..agents.briefing_tool import briefing_tool
 
 # Initialize the router
 router = APIRouter(
@@ -26,27 +50,300 @@ class ConversationRequest(BaseModel):
     message: str
     current_data: Dict[str, Any]
 
+def _validate_cursor(cursor: Optional[str]):
+    if cursor:
+        try:
+            decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+class ExtractionBatchRequest(BaseModel):
+    notes: List[str]
+    # Re-submit with the same id to resume a partially finished batch.
+    batch_id: Optional[str] = Field(None, max_length=64)
+
+class ConversationSessionCreate(BaseModel):
+    current_data: Dict[str, Any] = {}
+
+class ConversationSessionMessage(BaseModel):
+    message: str
+
+async def _load_stored_briefing(hcp_name: str, wait_if_stale: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    Returns the stored briefing for an exact HCP name, generating it first if the
+    HCP exists but has none yet. Returns None for partial names.
+
+    A stale briefing is regenerated before returning when `wait_if_stale` is set;
+    otherwise it is returned as is, and a refresh is queued ahead of write-triggered ones.
+    """
+    if not settings.BRIEFING_STORE_ENABLED:
+        return None
+    stored = await run_in_threadpool(with_session, get_stored_briefing, hcp_name)
+    if stored is None:
+        if not await run_in_threadpool(with_session, is_known_hcp, hcp_name):
+            return None
+        return await refresh_briefing(hcp_name)
+    if stored["freshness"]["stale"]:
+        if wait_if_stale:
+            return await refresh_briefing(hcp_name)
+        briefing_refresher.schedule(hcp_name, priority=PRIORITY_READ, delay=0)
+    return stored
+
+def _set_freshness_headers(response: Response, stored: Dict[str, Any]) -> None:
+    freshness = stored["freshness"]
+    response.headers["X-Briefing-Generated-At"] = freshness["generated_at"].isoformat()
+    response.headers["X-Briefing-Stale"] = "true" if freshness["stale"] else "false"
+
+async def _iter_ndjson_lines(request: Request):
+    """Yields `(index, line)` for each non-blank line of an NDJSON body as it arrives."""
+    index, buffer = 0, b""
+    async for data in request.stream():
+        buffer += data
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield index, line
+                index += 1
+    if buffer.strip():
+        yield index, buffer
+
 # --- Manual CRM Endpoints ---
+# These only touch the database, so they stay sync and run in the threadpool.
+# The AI endpoints below are async and never hold a thread while waiting on the LLM.
 
 @router.post("/", response_model=schemas.InteractionOut, status_code=201, summary="Log Interaction via Form")
 def create_new_interaction(interaction: schemas.InteractionCreate, db: Session = Depends(get_db)):
     """Creates a new HCP interaction from the structured web form."""
     return crud.create_interaction(db=db, interaction=interaction)
 
+@router.post("/bulk", summary="Bulk Log Interactions")
+async def bulk_create_interactions(
+    request: Request,
+    chunk_size: int = Query(500, ge=1, le=10000),
+    transaction_size: int = Query(1000, ge=1, le=10000)
+):
+    """
+    Ingests many interactions at once, for back-filling from other systems.
+
+    The body is either a JSON array of InteractionCreate objects, or (with
+    `Content-Type: application/x-ndjson`) one object per line. NDJSON is read
+    incrementally, so memory stays flat however large the upload is. Rows are
+    validated `chunk_size` at a time and inserted with batched executemany,
+    `transaction_size` rows per transaction. Bad rows are reported by index and
+    don't abort the batch.
+    """
+    ingestor = BulkIngestor(transaction_size=transaction_size)
+    chunk = []
+
+    async def flush_chunk():
+        await run_in_threadpool(with_session, ingestor.add_chunk, list(chunk))
+        chunk.clear()
+
+    if request.headers.get("content-type", "").startswith("application/x-ndjson"):
+        async for index, line in _iter_ndjson_lines(request):
+            try:
+                chunk.append((index, json.loads(line)))
+            except ValueError as e:
+                ingestor.record_parse_error(index, f"Invalid JSON: {e}")
+            if len(chunk) >= chunk_size:
+                await flush_chunk()
+    else:
+        try:
+            payload = json.loads(await request.body())
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON: {e}")
+        if not isinstance(payload, list):
+            raise HTTPException(status_code=400, detail="Expected a JSON array of interactions.")
+        for index, record in enumerate(payload):
+            chunk.append((index, record))
+            if len(chunk) >= chunk_size:
+                await flush_chunk()
+
+    if chunk:
+        await flush_chunk()
+    return await run_in_threadpool(with_session, ingestor.finish)
+
 @router.get("/", response_model=List[schemas.InteractionOut], summary="Get All Interactions")
-def read_all_interactions(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Retrieves all HCP interactions with pagination."""
-    return crud.get_all_interactions(db, skip=skip, limit=limit)
+def read_all_interactions(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Retrieves all HCP interactions, newest first, with pagination.
+    The `X-Next-Cursor` response header holds the cursor for the next page.
+    Responses carry an ETag; send it back as If-None-Match to get a 304 when
+    nothing has changed.
+    """
+    _validate_cursor(cursor)
+
+    def render():
+        rows = crud.get_all_interactions(db, skip=skip, limit=limit, cursor=cursor, projected=True)
+        cursor_for_next_page = next_cursor(rows, limit)
+        headers = {"X-Next-Cursor": cursor_for_next_page} if cursor_for_next_page else {}
+        return orjson.dumps(to_dicts(db, rows)), headers
+
+    return conditional_response(
+        request, "read_all_interactions", db.query(models.HCPInteraction), render, whole_table=True
+    )
+
+@router.get("/export", summary="Export Interactions")
+def export_all_interactions(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    compression: Optional[str] = Query(None, pattern="^zstd$"),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    hcp_name: Optional[str] = None,
+    batch_size: int = Query(1000, ge=1, le=10000)
+):
+    """
+    Streams every matching interaction as NDJSON or CSV, optionally zstd-compressed,
+    for analytics dumps. Filter by date range and (partial) HCP name. Rows are read
+    with a server-side cursor, so memory use doesn't grow with the table.
+    """
+    media_type, extension = FORMATS[format]
+    filename = f"interactions.{extension}"
+    if compression:
+        media_type, filename = "application/zstd", filename + ".zst"
+    chunks = export_interactions(
+        export_format=format, compress=bool(compression), start_date=start_date,
+        end_date=end_date, hcp_name=hcp_name, batch_size=batch_size
+    )
+    return StreamingResponse(
+        chunks, media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.get("/hcps/search", response_model=List[Dict[str, Any]], summary="Search HCP Names")
+def search_hcps(q: str, limit: int = 10, db: Session = Depends(get_db)):
+    """Ranked fuzzy lookup of known HCP names, tolerant of typos and partial names."""
+    return search_hcp_names(db, q, limit=limit)
+
+@router.get("/search", response_model=List[Dict[str, Any]], summary="Search Interaction Notes")
+def search_interaction_notes(
+    q: str = Query(..., min_length=1),
+    k: int = Query(10, ge=1, le=100),
+    hcp_name: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Interactions whose topics, outcomes or voice note summary best match `q`
+    (e.g. "CardioPlus side effects"), best first, each with a similarity `score`.
+    Runs against a local vector index; optionally narrowed to a (partial) HCP
+    name and date range. The index is synced in the background, so a note saved
+    a moment ago may not be found yet.
+    """
+    return ORJSONResponse(
+        search_interactions(db, q, k=k, hcp_name=hcp_name, start_date=start_date, end_date=end_date)
+    )
+
+@router.get("/by-item", response_model=List[schemas.InteractionOut], summary="Find Interactions by Material, Sample or Attendee")
+def read_interactions_by_item(
+    material: Optional[str] = None,
+    sample: Optional[str] = None,
+    attendee: Optional[str] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Interactions, newest first, where the given material was shared, sample
+    distributed and/or attendee present (exact value, case-insensitive). Matches
+    are index lookups on the list-item table. Pages with `X-Next-Cursor`.
+    """
+    if not (material or sample or attendee):
+        raise HTTPException(status_code=422, detail="Provide at least one of material, sample or attendee.")
+    _validate_cursor(cursor)
+    rows = crud.get_interactions_by_items(
+        db, {"materials_shared": material, "samples_distributed": sample, "attendees": attendee},
+        start_date=start_date, end_date=end_date, limit=limit, cursor=cursor, projected=True
+    )
+    cursor_for_next_page = next_cursor(rows, limit)
+    headers = {"X-Next-Cursor": cursor_for_next_page} if cursor_for_next_page else {}
+    return ORJSONResponse(to_dicts(db, rows), headers=headers)
+
+@router.get("/items/{field}/top", response_model=List[Dict[str, Any]], summary="Most Frequent List Values")
+def read_top_item_values(
+    field: str,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    limit: int = Query(20, ge=1, le=500),
+    db: Session = Depends(get_db)
+):
+    """
+    Most frequent values of a list field (`material`, `sample`, `attendee`,
+    `follow_up`, `ai_followup`), e.g. the most-shared brochures this quarter.
+    """
+    if field not in FIELD_ALIASES:
+        raise HTTPException(status_code=404, detail=f"Unknown field '{field}'. Use one of {sorted(FIELD_ALIASES)}.")
+    return top_values(db, FIELD_ALIASES[field], start_date=start_date, end_date=end_date, limit=limit)
+
+@router.get("/items/{field}/hcps", response_model=List[Dict[str, Any]], summary="HCPs by List Value")
+def read_hcps_by_item_value(
+    field: str,
+    value: str,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    """
+    HCPs with an interaction carrying `value` in the list field, e.g. who got the
+    starter kit sample this month: `/items/sample/hcps?value=starter kit sample&start_date=...`.
+    """
+    if field not in FIELD_ALIASES:
+        raise HTTPException(status_code=404, detail=f"Unknown field '{field}'. Use one of {sorted(FIELD_ALIASES)}.")
+    return hcps_with_value(db, FIELD_ALIASES[field], value, start_date=start_date, end_date=end_date, limit=limit)
+
+@router.get("/analytics/hcps", response_model=List[Dict[str, Any]], summary="HCP Analytics Overview")
+def read_hcp_analytics_overview(
+    period: str = Query("month", pattern="^(week|month)$"),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
+    """
+    Interaction counts by type and sentiment per HCP over the selected weeks or
+    months, with days since last contact. HCPs not contacted longest come first.
+    """
+    return get_analytics_overview(
+        db, period=period, start_date=start_date, end_date=end_date, limit=limit, offset=offset
+    )
+
+@router.get("/analytics/hcps/{hcp_name}", response_model=Dict[str, Any], summary="HCP Analytics")
+def read_hcp_analytics(
+    hcp_name: str,
+    period: str = Query("month", pattern="^(week|month)$"),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Per-week or per-month interaction counts by type and sentiment for one HCP
+    (exact name), read from the rollup table rather than the interactions.
+    """
+    analytics = get_hcp_analytics(db, hcp_name, period=period, start_date=start_date, end_date=end_date)
+    if analytics is None:
+        raise HTTPException(status_code=404, detail=f"No interactions found for HCP '{hcp_name}'.")
+    return analytics
 
 # --- AI Agent Endpoints ---
 
 @router.post("/ai/conversation", summary="Handle Conversational AI Chat")
-def handle_conversation(request: ConversationRequest):
+async def handle_conversation(request: ConversationRequest):
     """
     Manages the stateful conversation, taking the user's message and
     the current form data to provide a context-aware response.
     """
-    result = conversation_tool(
+    result = await conversation_tool(
         user_message=request.message,
         current_data=request.current_data
     )
@@ -54,72 +351,277 @@ def handle_conversation(request: ConversationRequest):
         raise HTTPException(status_code=400, detail=result["message"])
     return result["data"]
 
+@router.post("/ai/conversation/stream", summary="Stream Conversational AI Chat")
+async def stream_conversation(request: ConversationRequest, http_request: Request):
+    """
+    Streaming version of /ai/conversation, as newline-delimited JSON events.
+    Progress events arrive while the model reasons, and the merged form data is sent
+    as soon as the model's JSON block is complete. If the client disconnects, the
+    upstream generation is cancelled.
+    """
+    async def event_stream():
+        events = stream_conversation_tool(
+            user_message=request.message,
+            current_data=request.current_data
+        )
+        try:
+            async for event in events:
+                if await http_request.is_disconnected():
+                    break
+                yield json.dumps(event, default=str) + "\n"
+        finally:
+            await events.aclose()
+
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
+
+@router.post("/ai/conversation/sessions", status_code=201, summary="Start a Server-Side Conversation")
+async def start_conversation_session(request: ConversationSessionCreate = Body(default_factory=ConversationSessionCreate)):
+    """
+    Creates a server-side draft for a chat conversation. Later turns only send the
+    new message to /ai/conversation/sessions/{conversation_id}/messages.
+    """
+    conversation_id = conversation_sessions.create(request.current_data)
+    return {"conversation_id": conversation_id, "data": request.current_data}
+
+@router.get("/ai/conversation/sessions/{conversation_id}", summary="Get Conversation Draft")
+async def get_conversation_session(conversation_id: str):
+    """Returns the full draft held for a conversation."""
+    data = conversation_sessions.get(conversation_id)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Conversation not found or expired")
+    return {"conversation_id": conversation_id, "data": data}
+
+@router.post("/ai/conversation/sessions/{conversation_id}/messages", summary="Send a Message to a Conversation")
+async def send_conversation_message(conversation_id: str, request: ConversationSessionMessage):
+    """
+    Applies one chat turn to the server-side draft and returns only the fields
+    that changed.
+    """
+    if conversation_sessions.get(conversation_id) is None:
+        raise HTTPException(status_code=404, detail="Conversation not found or expired")
+    async with conversation_sessions.lock(conversation_id):
+        # Re-read under the lock: an earlier turn may have changed, ended or expired it.
+        current_data = conversation_sessions.get(conversation_id)
+        if current_data is None:
+            raise HTTPException(status_code=404, detail="Conversation not found or expired")
+
+        result = await conversation_tool(user_message=request.message, current_data=current_data)
+        if result["status"] == "error":
+            raise HTTPException(status_code=400, detail=result["message"])
+
+        conversation_sessions.put(conversation_id, result["data"])
+    return {"conversation_id": conversation_id, "changes": changed_fields(current_data, result["data"])}
+
+@router.delete("/ai/conversation/sessions/{conversation_id}", status_code=204, summary="End a Conversation")
+async def end_conversation_session(conversation_id: str):
+    """Discards the server-side draft, for example after the interaction is saved."""
+    conversation_sessions.delete(conversation_id)
+
+@router.post("/ai/extract/batch", summary="Batch Extract Interactions from Notes")
+async def extract_interactions_batch(request: ExtractionBatchRequest, http_request: Request):
+    """
+    Runs many free-text notes through log_interaction_tool with bounded parallelism
+    at background LLM priority. Results are validated against
+    InteractionCreate and streamed back as NDJSON as each note completes. Valid
+    results can be posted straight to /interactions/bulk.
+
+    Every outcome is stored under `batch_id` (generated if omitted and returned in the
+    first event). Re-submitting the same notes with that id replays finished notes and
+    only processes the rest.
+    """
+    batch_id = request.batch_id or uuid.uuid4().hex
+    await run_in_threadpool(with_session, start_extraction_batch, batch_id, len(request.notes))
+
+    async def event_stream():
+        events = run_extraction_batch(batch_id, request.notes)
+        try:
+            async for event in events:
+                if await http_request.is_disconnected():
+                    break
+                yield json.dumps(event, default=str) + "\n"
+        finally:
+            await events.aclose()
+
+    return StreamingResponse(event_stream(), media_type="application/x-ndjson")
+
+@router.get("/ai/extract/batch/{batch_id}", summary="Batch Extraction Progress")
+def get_extraction_batch(batch_id: str, db: Session = Depends(get_db)):
+    """Reports how many notes of a batch succeeded, failed validation, failed, or haven't started."""
+    status = get_batch_status(db, batch_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return status
+
 @router.patch("/ai/{interaction_id}", response_model=schemas.InteractionOut, summary="Edit Saved Interaction via AI")
-def update_saved_interaction_from_text(
+async def update_saved_interaction_from_text(
     interaction_id: int,
-    command: str = Body(..., embed=True),
-    db: Session = Depends(get_db)
+    command: str = Body(...),
+    expected_updated_at: Optional[datetime] = Body(None)
 ):
-    """Updates a saved HCP interaction using a natural language command."""
-    # 1. Fetch the existing record
-    db_interaction = crud.get_interaction(db, interaction_id=interaction_id)
-    if not db_interaction:
-        raise HTTPException(status_code=404, detail="Interaction not found")
+    """
+    Updates a saved HCP interaction using a natural language command.
 
-    # 2. Convert the record to a dictionary to provide as context
-    current_data = schemas.InteractionOut.from_orm(db_interaction).model_dump()
+    No DB connection is held while the LLM runs: the record is read in one short
+    session, and the result is applied in another with an optimistic-concurrency
+    check. Pass `expected_updated_at` to get a 409 if the record changed since you read it.
+    """
+    # 1. Read a snapshot of the existing record; the connection goes back to the pool right away
+    current_data = await run_in_threadpool(with_session, crud.get_interaction_snapshot, interaction_id)
+    if current_data is None:
+        raise HTTPException(status_code=404, detail="Interaction not found")
 
-    # 3. Call the advanced AI tool with the command AND the current data
-    result = edit_interaction_tool(
+    # 2. Call the advanced AI tool with the command AND the current data
+    result = await edit_interaction_tool(
         natural_language_command=command,
         current_interaction=current_data
     )
     if result["status"] == "error":
         raise HTTPException(status_code=400, detail=result["message"])
 
-    # 4. Apply the partial update returned by the AI
-    update_data = result["data"]
-    for field, value in update_data.items():
-        if hasattr(db_interaction, field):
-            setattr(db_interaction, field, value)
+    # 3. Validate the partial update returned by the AI against the full record
+    update_data = {
+        field: value for field, value in result["data"].items()
+        if field in schemas.InteractionCreate.model_fields
+    }
+    try:
+        validated = schemas.InteractionCreate.model_validate({**current_data, **update_data})
+    except ValidationError as e:
+        reasons = "; ".join(error["msg"] for error in e.errors())
+        raise HTTPException(status_code=400, detail=f"The AI proposed an invalid update: {reasons}")
+    changes = {field: getattr(validated, field) for field in update_data}
+    if not changes:
+        return current_data
+
+    # 4. Apply it as one guarded UPDATE in a short transaction
+    outcome = await run_in_threadpool(
+        with_session, crud.update_interaction_if_unmodified,
+        interaction_id, expected_updated_at or current_data["updated_at"], changes
+    )
+    if outcome["status"] == "not_found":
+        raise HTTPException(status_code=404, detail="Interaction not found")
+    if outcome["status"] == "conflict":
+        raise HTTPException(status_code=409, detail={
+            "message": "The interaction was modified by someone else. Re-read it and try again.",
+            "current_updated_at": outcome["current_updated_at"].isoformat()
+        })
 
-    db.commit()
-    db.refresh(db_interaction)
-    return db_interaction
+    for name in {current_data["hcp_name"], changes.get("hcp_name", current_data["hcp_name"])}:
+        llm_cache.invalidate_hcp(name)
+        briefing_refresher.schedule(name)
+    return {**current_data, **changes, "updated_at": outcome["updated_at"]}
 
 @router.get("/ai/history/{hcp_name}", response_model=schemas.PaginatedHistoryResponse, summary="Fetch Advanced Interaction History")
 def get_interaction_history(
     hcp_name: str,
+    request: Request,
     db: Session = Depends(get_db),
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
     page: int = 1,
-    page_size: int = 10
+    page_size: int = 10,
+    cursor: Optional[str] = None,
+    include_total: bool = False
 ):
     """
     Retrieves a paginated and filtered interaction history for a specific HCP.
     Example: /interactions/ai/history/Rossi?start_date=2025-01-01&page=1
+    Pass `pagination.next_cursor` back as `cursor` to page without OFFSET.
+    Supports If-None-Match like the interaction list.
     """
-    result = fetch_hcp_history_tool(
-        db=db, hcp_name=hcp_name, start_date=start_date,
-        end_date=end_date, page=page, page_size=page_size
-    )
-    if result["status"] == "error":
-        raise HTTPException(status_code=500, detail=result["message"])
-    return result
+    _validate_cursor(cursor)
+
+    def render():
+        result = fetch_hcp_history_tool(
+            db=db, hcp_name=hcp_name, start_date=start_date,
+            end_date=end_date, page=page, page_size=page_size,
+            cursor=cursor, include_total=include_total, projected=True
+        )
+        if result["status"] == "error":
+            raise HTTPException(status_code=500, detail=result["message"])
+        # Same body as PaginatedHistoryResponse, without validating the rows again.
+        return orjson.dumps({"data": result["data"], "pagination": result["pagination"]}), {}
+
+    matching = filter_history(db, db.query(models.HCPInteraction), hcp_name, start_date, end_date)
+    return conditional_response(request, "get_interaction_history", matching, render)
 
 @router.get("/ai/summary/{hcp_name}", response_model=Dict[str, Any], summary="Summarize History via AI")
-def get_interaction_summary(hcp_name: str, db: Session = Depends(get_db)):
-    """Generates an AI-powered summary of an HCP's interaction history."""
-    result = summarize_history_tool(hcp_name=hcp_name, db=db)
+async def get_interaction_summary(
+    hcp_name: str, response: Response, focus: Optional[str] = None, exact_name: bool = False
+):
+    """
+    Returns the AI-powered summary of an HCP's interaction history. Like the history
+    search, `hcp_name` also matches partial names.
+
+    With `exact_name=true` only that HCP's interactions are summarized, and the
+    summary is served from the briefing store (regenerated first if interactions
+    changed since); X-Briefing-Generated-At reports when. With `focus`, summarizes
+    the interactions most relevant to that topic instead of the latest ones; this
+    is always generated live.
+    """
+    stored = await _load_stored_briefing(hcp_name, wait_if_stale=True) if exact_name and not focus else None
+    if stored is not None and stored["summary"] is not None:
+        _set_freshness_headers(response, stored)
+        return stored["summary"]
+
+    result = await summarize_history_tool(hcp_name=hcp_name, focus=focus)
     if result["status"] == "error":
         raise HTTPException(status_code=500, detail=result["message"])
     return result.get("data", {"summary": "No summary generated."})
 
 @router.get("/ai/suggestions/{hcp_name}", response_model=Dict[str, Any], summary="Get AI Suggestions")
-def get_next_action_suggestions(hcp_name: str, db: Session = Depends(get_db)):
-    """Generates a list of AI-powered next-step suggestions for an HCP."""
-    result = suggest_next_action_tool(hcp_name=hcp_name, db=db)
+async def get_next_action_suggestions(hcp_name: str, response: Response, exact_name: bool = False):
+    """
+    Returns AI-powered next-step suggestions for an HCP. With `exact_name=true` they
+    come from the briefing store, as for /ai/summary.
+    """
+    stored = await _load_stored_briefing(hcp_name, wait_if_stale=True) if exact_name else None
+    if stored is not None and stored["suggestions"] is not None:
+        _set_freshness_headers(response, stored)
+        return {"suggestions": stored["suggestions"]}
+
+    result = await suggest_next_action_tool(hcp_name=hcp_name)
+    if result["status"] == "error":
+        raise HTTPException(status_code=500, detail=result["message"])
+    return result.get("data", {"suggestions": []})
+
+@router.get("/ai/briefing/{hcp_name}", response_model=Dict[str, Any], summary="Get AI Briefing for an HCP")
+async def get_hcp_briefing(hcp_name: str, history_limit: int = Query(5, ge=1, le=50), exact_name: bool = False):
+    """
+    Returns the AI summary, the AI suggestions and the most recent interactions for
+    an HCP in one response. Replaces calling /ai/summary and /ai/suggestions
+    separately: the history is read once and both generations run concurrently.
+
+    By default the briefing is generated on the spot and, like the history search,
+    covers partial name matches. With `exact_name=true` it covers only that HCP and
+    the stored briefing is returned right away, with a `freshness` block saying when
+    it was generated and whether interactions have changed since (a refresh is then
+    already queued).
+    """
+    stored = await _load_stored_briefing(hcp_name) if exact_name else None
+    if stored is not None:
+        return {**stored, "recent_history": stored["recent_history"][:history_limit]}
+
+    result = await briefing_tool(hcp_name=hcp_name, history_limit=history_limit)
     if result["status"] == "error":
         raise HTTPException(status_code=500, detail=result["message"])
-    return result.get("data", {"suggestions": []})
\ No newline at end of file
+    return {**result["data"], "freshness": {"stored": False}}
+
+@router.get("/ai/briefings/stats", response_model=Dict[str, Any], summary="Briefing Refresher Statistics")
+def get_briefing_refresher_stats():
+    """Reports the background briefing refresher's queue and counters."""
+    return briefing_refresher.stats()
+
+@router.get("/ai/followups/stats", response_model=Dict[str, Any], summary="Follow-up Job Statistics")
+def get_followup_job_stats(db: Session = Depends(get_db)):
+    """Follow-up generation jobs by status (dead ones are out of attempts) and this process's worker counters."""
+    return {"jobs": job_counts(db), "worker": followup_worker.stats()}
+
+@router.get("/ai/scheduler/stats", response_model=Dict[str, Any], summary="LLM Scheduler Statistics")
+def get_llm_scheduler_stats():
+    """Queue depth by priority, calls in flight, remaining quota and the current back-off state."""
+    return llm_scheduler.stats()
+
+@router.get("/ai/cache/stats", response_model=Dict[str, Any], summary="LLM Cache Statistics")
+def get_llm_cache_stats():
+    """Reports hit/miss counters for the summary and suggestion response cache."""
+    return llm_cache.stats()
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, model_validator, validator
 from typing import List, Optional
 from datetime import date, time, datetime
 
@@ -43,6 +43,16 @@ class InteractionOut(InteractionBase):
     class Config:
         from_attributes = True
 
+    @model_validator(mode="before")
+    @classmethod
+    def lists_from_child_rows(cls, data):
+        # When the list items were eager-loaded, the list fields come from them.
+        from .services.list_items import lists_from_items  # Deferred: schemas stays free of DB imports
+        lists = lists_from_items(data) if hasattr(data, "__table__") else None
+        if lists is None:
+            return data
+        return {**{name: getattr(data, name) for name in cls.model_fields}, **lists}
+
 class PaginatedHistoryResponse(BaseModel):
     data: List[InteractionOut]
     pagination: dict
\ No newline at end of file
@@ -0,0 +1,178 @@
+import asyncio
+import hashlib
+from typing import Any, AsyncIterator, Dict, List, Optional
+from pydantic import ValidationError
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app import models, schemas
+from app.agents.log_interaction_tool import log_interaction_tool
+from app.core.config import settings
+from app.core.llm import llm_priority
+from app.database import with_session
+from app.services.list_items import LIST_FIELDS
+
+
+def note_hash(note: str) -> str:
+    return hashlib.sha256(note.encode("utf-8")).hexdigest()
+
+
+def coerce_extracted(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Adapts log_interaction_tool output to InteractionCreate. The prompt asks for ""
+    when a field is not mentioned and often returns single strings for list fields.
+    """
+    coerced = {}
+    for key, value in data.items():
+        if isinstance(value, str) and not value.strip():
+            continue  # Let validation report missing required fields
+        if key in LIST_FIELDS and isinstance(value, str):
+            value = [value]
+        coerced[key] = value
+    return coerced
+
+
+def start_extraction_batch(db: Session, batch_id: str, total_notes: int) -> None:
+    """
+    Creates the batch row, or updates its note count when the batch is resubmitted.
+    Run it before streaming starts, so a database error still gets a proper status.
+    """
+    batch = db.get(models.ExtractionBatch, batch_id)
+    if batch is None:
+        db.add(models.ExtractionBatch(id=batch_id, total_notes=total_notes))
+        try:
+            db.commit()
+            return
+        except IntegrityError:
+            # A concurrent first submission of the same id created it. Roll back fully
+            # so the next read gets a fresh snapshot that includes their row.
+            db.rollback()
+            batch = db.get(models.ExtractionBatch, batch_id)
+    if batch.total_notes != total_notes:
+        batch.total_notes = total_notes
+        db.commit()
+
+
+def _load_finished_items(db: Session, batch_id: str) -> Dict[int, models.ExtractionBatchItem]:
+    items = (
+        db.query(models.ExtractionBatchItem)
+        .filter(models.ExtractionBatchItem.batch_id == batch_id, models.ExtractionBatchItem.status != "failed")
+        .all()
+    )
+    db.expunge_all()
+    return {item.item_index: item for item in items}
+
+
+def _save_item(db: Session, batch_id: str, event: Dict[str, Any], hashed: str) -> None:
+    item = dict(
+        batch_id=batch_id,
+        item_index=event["index"],
+        note_hash=hashed,
+        status=event["status"],
+        result=event.get("data"),
+        errors=event.get("errors"),
+    )
+    db.merge(models.ExtractionBatchItem(**item))
+    try:
+        db.commit()
+    except IntegrityError:
+        # A concurrent run of the same batch saved this note first; merge now updates it.
+        db.rollback()
+        db.merge(models.ExtractionBatchItem(**item))
+        db.commit()
+
+
+async def _extract_one(index: int, note: str) -> Dict[str, Any]:
+    # ainvoke_llm already backs off and retries rate limits; a note that still
+    # fails is recorded as failed and retried when the batch is resubmitted.
+    with llm_priority("background"):
+        result = await log_interaction_tool(note)
+
+    if result["status"] == "error":
+        return {"index": index, "status": "failed", "errors": [result["message"]]}
+
+    try:
+        interaction = schemas.InteractionCreate.model_validate(coerce_extracted(result["data"]))
+    except ValidationError as e:
+        return {
+            "index": index,
+            "status": "invalid",
+            "data": result["data"],
+            "errors": [f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()],
+        }
+    return {"index": index, "status": "success", "data": interaction.model_dump(mode="json")}
+
+
+async def run_extraction_batch(batch_id: str, notes: List[str]) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Extracts structured interactions from `notes` with bounded parallelism and
+    yields one event per note as it completes (in completion order, tagged by index).
+
+    Every outcome is stored under `batch_id`. Re-submitting the same batch id replays
+    finished notes from storage and only sends failed or changed notes to the LLM,
+    so a large import picks up where it stopped. The batch must already exist
+    (start_extraction_batch).
+    """
+    finished = await run_in_threadpool(with_session, _load_finished_items, batch_id)
+    hashes = [note_hash(note) for note in notes]
+
+    pending = []
+    replayed = 0
+    for index, note in enumerate(notes):
+        item: Optional[models.ExtractionBatchItem] = finished.get(index)
+        if item is not None and item.note_hash == hashes[index]:
+            replayed += 1
+        else:
+            pending.append(index)
+
+    yield {"event": "batch", "batch_id": batch_id, "total": len(notes), "resumed": replayed, "pending": len(pending)}
+
+    for index in sorted(set(range(len(notes))) - set(pending)):
+        item = finished[index]
+        yield {"event": "item", "index": index, "status": item.status, "data": item.result,
+               "errors": item.errors, "resumed": True}
+
+    slots = asyncio.Semaphore(settings.BATCH_EXTRACTION_CONCURRENCY)
+
+    async def bounded(index: int) -> Dict[str, Any]:
+        async with slots:
+            event = await _extract_one(index, notes[index])
+        await run_in_threadpool(with_session, _save_item, batch_id, event, hashes[index])
+        return event
+
+    counts = {"success": 0, "invalid": 0, "failed": 0}
+    tasks = [asyncio.ensure_future(bounded(index)) for index in pending]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            event = await next_done
+            counts[event["status"]] += 1
+            yield {"event": "item", **event}
+    finally:
+        # Stop outstanding work if the consumer went away; finished items are already saved.
+        for task in tasks:
+            task.cancel()
+
+    yield {"event": "done", "batch_id": batch_id, "resumed": replayed, **counts}
+
+
+def get_batch_status(db: Session, batch_id: str) -> Optional[Dict[str, Any]]:
+    batch = db.get(models.ExtractionBatch, batch_id)
+    if batch is None:
+        return None
+    Item = models.ExtractionBatchItem
+    counts = dict(
+        db.query(Item.status, func.count())
+        .filter(Item.batch_id == batch_id)
+        .group_by(Item.status)
+        .all()
+    )
+    return {
+        "batch_id": batch_id,
+        "total": batch.total_notes,
+        "success": counts.get("success", 0),
+        "invalid": counts.get("invalid", 0),
+        "failed": counts.get("failed", 0),
+        "not_started": batch.total_notes - sum(counts.values()),
+        "created_at": batch.created_at,
+    }
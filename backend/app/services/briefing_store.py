@@ -0,0 +1,246 @@
+"""
+Materialized HCP briefings.
+
+`hcp_briefings` holds the latest summary and suggestions for each HCP, together
+with the watermark (max `updated_at` and row count) of the interactions they were
+generated from. Reads that ask for an exact HCP name (`exact_name=true`) serve
+the stored row and compare its watermark with the current one to report
+freshness. /ai/briefing returns a stale row as is; /ai/summary and
+/ai/suggestions wait for a refresh instead, so the form never shows a briefing
+from before its own write.
+
+`BriefingRefresher` regenerates briefings in the background. Writes call
+`schedule()` for the HCPs they touch. Repeated writes for one HCP are debounced
+into a single refresh, due BRIEFING_DEBOUNCE_SECONDS after the last write (but
+no later than BRIEFING_MAX_DELAY_SECONDS after the first). Due refreshes run from
+a priority queue, so a reader waiting on a stale briefing goes ahead of batches
+of writes.
+"""
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Set, Tuple
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app import models
+from app.core.config import settings
+from app.core.llm import llm_priority
+from app.core.names import normalize_hcp_name
+from app.core.single_flight import single_flight
+from app.database import with_session
+
+# Lower runs first.
+PRIORITY_READ = 0
+PRIORITY_WRITE = 1
+PRIORITY_BACKFILL = 2
+
+STORED_HISTORY_ITEMS = 50
+
+
+def current_watermark(db: Session, hcp_name_normalized: str) -> Tuple[Optional[datetime], int]:
+    M = models.HCPInteraction
+    latest, count = (
+        db.query(func.max(M.updated_at), func.count(M.id))
+        .filter(M.hcp_name_normalized == hcp_name_normalized)
+        .one()
+    )
+    return latest, count
+
+
+def is_known_hcp(db: Session, hcp_name: str) -> bool:
+    normalized = normalize_hcp_name(hcp_name)
+    return db.query(models.HCPName.id).filter(models.HCPName.name_normalized == normalized).first() is not None
+
+
+def get_stored_briefing(db: Session, hcp_name: str) -> Optional[Dict[str, Any]]:
+    """Returns the stored briefing with a `freshness` block, or None if there is none."""
+    normalized = normalize_hcp_name(hcp_name)
+    row = db.get(models.HCPBriefing, normalized)
+    if row is None:
+        return None
+    latest, count = current_watermark(db, normalized)
+    return {
+        "hcp_name": row.hcp_name,
+        "summary": row.summary,
+        "suggestions": row.suggestions,
+        "recent_history": row.recent_history or [],
+        "errors": row.errors or {},
+        "freshness": {
+            "stored": True,
+            "generated_at": row.generated_at,
+            "age_seconds": round((datetime.utcnow() - row.generated_at).total_seconds(), 1),
+            "source_updated_at": row.source_updated_at,
+            "stale": (latest, count) != (row.source_updated_at, row.source_count),
+            "refresh_pending": briefing_refresher.is_pending(normalized),
+        },
+    }
+
+
+def _save_briefing(db: Session, hcp_name: str, data: Dict[str, Any], watermark: Tuple[Optional[datetime], int]) -> None:
+    db.merge(models.HCPBriefing(
+        hcp_name_normalized=normalize_hcp_name(hcp_name),
+        hcp_name=hcp_name,
+        summary=data["summary"],
+        suggestions=data["suggestions"],
+        recent_history=jsonable_encoder(data["recent_history"]),
+        errors=data["errors"],
+        source_updated_at=watermark[0],
+        source_count=watermark[1],
+        generated_at=datetime.utcnow(),
+    ))
+    db.commit()
+
+
+@single_flight("refresh_briefing", key_fn=lambda hcp_name: normalize_hcp_name(hcp_name))
+async def refresh_briefing(hcp_name: str) -> Optional[Dict[str, Any]]:
+    """
+    Regenerates and stores the briefing for this exact HCP, then returns it as
+    `get_stored_briefing` would. Returns None if generation failed entirely.
+    """
+    from app.agents.briefing_tool import briefing_tool
+
+    normalized = normalize_hcp_name(hcp_name)
+    # Take the watermark before generating, so a write that lands meanwhile
+    # leaves the stored briefing marked stale rather than looking current.
+    watermark = await run_in_threadpool(with_session, current_watermark, normalized)
+    result = await briefing_tool(hcp_name=hcp_name, history_limit=STORED_HISTORY_ITEMS, exact_name=True)
+    if result["status"] == "error":
+        return None
+    await run_in_threadpool(with_session, _save_briefing, hcp_name, result["data"], watermark)
+    return await run_in_threadpool(with_session, get_stored_briefing, hcp_name)
+
+
+class BriefingRefresher:
+    """
+    In-process background worker that keeps `hcp_briefings` current.
+
+    `schedule()` is safe to call from any thread (CRUD code runs in the threadpool)
+    and does nothing while the worker isn't running.
+    """
+
+    def __init__(self, debounce_seconds: float, max_delay_seconds: float, concurrency: int):
+        self.debounce_seconds = debounce_seconds
+        self.max_delay_seconds = max_delay_seconds
+        self.concurrency = concurrency
+        # normalized name -> [due_at, first_scheduled_at, priority, display name]
+        self._pending: Dict[str, list] = {}
+        self._ready: list = []  # heap of (priority, due_at, sequence, normalized name)
+        self._running_names: Set[str] = set()
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.refreshed = 0
+        self.failed = 0
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._dispatcher = asyncio.ensure_future(self._dispatch())
+
+    async def stop(self) -> None:
+        tasks = [self._dispatcher, *self._tasks] if self._dispatcher else list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop = self._dispatcher = None
+        self._tasks.clear()
+
+    def schedule(self, hcp_name: str, priority: int = PRIORITY_WRITE, delay: Optional[float] = None) -> None:
+        loop = self._loop
+        normalized = normalize_hcp_name(hcp_name)
+        if loop is None or not normalized:
+            return
+        now = time.monotonic()
+        delay = self.debounce_seconds if delay is None else delay
+        with self._lock:
+            entry = self._pending.get(normalized)
+            if entry is None:
+                self._pending[normalized] = [now + delay, now, priority, hcp_name]
+            else:
+                # Push the refresh back while writes keep coming, up to the cap.
+                entry[0] = min(max(entry[0], now + delay), entry[1] + self.max_delay_seconds)
+                entry[2] = min(entry[2], priority)
+                entry[3] = hcp_name
+                if delay == 0:
+                    entry[0] = now
+        loop.call_soon_threadsafe(self._wake.set)
+
+    def is_pending(self, hcp_name_normalized: str) -> bool:
+        with self._lock:
+            return hcp_name_normalized in self._pending or hcp_name_normalized in self._running_names
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "running": self._loop is not None,
+                "pending": len(self._pending),
+                "ready": len(self._ready),
+                "in_progress": len(self._running_names),
+                "refreshed": self.refreshed,
+                "failed": self.failed,
+            }
+
+    def _promote_due(self, now: float) -> Optional[float]:
+        """Moves due entries to the ready heap; returns seconds until the next one is due."""
+        next_due = None
+        with self._lock:
+            for normalized, (due_at, _, priority, _) in list(self._pending.items()):
+                if normalized in self._running_names:
+                    continue  # Refresh again once the current run finishes.
+                if due_at <= now:
+                    heapq.heappush(self._ready, (priority, due_at, next(self._sequence), normalized))
+                    self._running_names.add(normalized)
+                elif next_due is None or due_at < next_due:
+                    next_due = due_at
+        return None if next_due is None else max(next_due - now, 0)
+
+    async def _dispatch(self) -> None:
+        slots = asyncio.Semaphore(self.concurrency)
+        while True:
+            wait = self._promote_due(time.monotonic())
+            if self._ready:
+                await slots.acquire()
+                _, _, _, normalized = heapq.heappop(self._ready)
+                with self._lock:
+                    hcp_name = self._pending.pop(normalized)[3]
+                task = asyncio.ensure_future(self._refresh(normalized, hcp_name))
+                self._tasks.add(task)
+                task.add_done_callback(lambda done: (self._tasks.discard(done), slots.release()))
+                continue
+
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _refresh(self, normalized: str, hcp_name: str) -> None:
+        try:
+            with llm_priority("background"):
+                stored = await refresh_briefing(hcp_name)
+            if stored is None:
+                self.failed += 1
+            else:
+                self.refreshed += 1
+        except Exception:
+            self.failed += 1
+        finally:
+            with self._lock:
+                self._running_names.discard(normalized)
+            self._wake.set()
+
+
+# Create a single, shared refresher instance; app.main starts it with the app.
+briefing_refresher = BriefingRefresher(
+    debounce_seconds=settings.BRIEFING_DEBOUNCE_SECONDS,
+    max_delay_seconds=settings.BRIEFING_MAX_DELAY_SECONDS,
+    concurrency=settings.BRIEFING_WORKER_CONCURRENCY,
+)
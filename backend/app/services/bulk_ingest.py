@@ -0,0 +1,120 @@
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+from pydantic import ValidationError
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+from app import schemas
+from app.core.llm_cache import llm_cache
+from app.core.names import normalize_hcp_name
+from app.services.hcp_name_index import register_hcp_name
+from app.services import list_items, rollups
+from app.services.briefing_store import PRIORITY_BACKFILL, briefing_refresher
+from app.services.semantic_index import semantic_index
+
+
+class BulkIngestor:
+    """
+    Validates and inserts a large stream of InteractionCreate payloads.
+
+    Records are fed in chunks with `add_chunk`. Valid rows are buffered and written
+    with one executemany INSERT per `transaction_size` rows, each in its own
+    transaction. Invalid rows, and rows the database rejects, are reported by their
+    position in the input; they never abort the rest of the batch.
+    """
+
+    def __init__(self, transaction_size: int = 1000, max_reported_errors: int = 1000):
+        if transaction_size < 1:
+            raise ValueError(f"transaction_size must be at least 1, got {transaction_size}")
+        self.transaction_size = transaction_size
+        self.max_reported_errors = max_reported_errors
+        self.received = 0
+        self.inserted = 0
+        self.failed = 0
+        self.errors: List[Dict[str, Any]] = []
+        self._pending: List[Tuple[int, Dict[str, Any]]] = []
+        self._known_names = set()
+
+    def add_chunk(self, db: Session, records: List[Tuple[int, Any]]) -> None:
+        """Validates `(index, payload)` pairs and flushes whenever a full transaction is buffered."""
+        for index, payload in records:
+            self.received += 1
+            try:
+                interaction = schemas.InteractionCreate.model_validate(payload)
+            except ValidationError as e:
+                self._record_error(index, [
+                    f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}"
+                    for error in e.errors()
+                ])
+                continue
+            self._pending.append((index, self._to_row(interaction)))
+
+        while len(self._pending) >= self.transaction_size:
+            batch = self._pending[:self.transaction_size]
+            self._pending = self._pending[self.transaction_size:]
+            self._insert_batch(db, batch)
+
+    def record_parse_error(self, index: int, message: str) -> None:
+        self.received += 1
+        self._record_error(index, [message])
+
+    def finish(self, db: Session) -> Dict[str, Any]:
+        """Flushes the remaining rows and returns the per-batch report."""
+        if self._pending:
+            self._insert_batch(db, self._pending)
+            self._pending = []
+        return {
+            "received": self.received,
+            "inserted": self.inserted,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errors_truncated": self.failed > len(self.errors),
+        }
+
+    def _to_row(self, interaction: schemas.InteractionCreate) -> Dict[str, Any]:
+        # Core inserts skip ORM validators and may skip column defaults, so fill them here.
+        now = datetime.utcnow()
+        row = interaction.model_dump()
+        row["hcp_name_normalized"] = normalize_hcp_name(row["hcp_name"])
+        row["created_at"] = now
+        row["updated_at"] = now
+        return row
+
+    def _insert_batch(self, db: Session, batch: List[Tuple[int, Dict[str, Any]]]) -> None:
+        try:
+            self._register_names(db, batch)
+            list_items.insert_interactions(db, [row for _, row in batch])
+            rollups.record_interactions(db, [row for _, row in batch])
+            db.commit()
+            self.inserted += len(batch)
+        except SQLAlchemyError:
+            db.rollback()
+            # The rollback undid any name registrations from this batch as well.
+            self._known_names.clear()
+            # Find the offending rows one at a time; the good ones still go in.
+            for index, row in batch:
+                try:
+                    self._register_names(db, [(index, row)])
+                    list_items.insert_interactions(db, [row])
+                    rollups.record_interactions(db, [row])
+                    db.commit()
+                    self.inserted += 1
+                except SQLAlchemyError as e:
+                    db.rollback()
+                    self._known_names.discard(row["hcp_name_normalized"])
+                    self._record_error(index, [f"Database rejected the row: {getattr(e, 'orig', None) or e}"])
+
+        for name in {row["hcp_name"] for _, row in batch}:
+            llm_cache.invalidate_hcp(name)
+            briefing_refresher.schedule(name, priority=PRIORITY_BACKFILL)
+        semantic_index.mark_dirty()
+
+    def _register_names(self, db: Session, batch: List[Tuple[int, Dict[str, Any]]]) -> None:
+        for _, row in batch:
+            if row["hcp_name_normalized"] not in self._known_names:
+                register_hcp_name(db, row["hcp_name"])
+                self._known_names.add(row["hcp_name_normalized"])
+
+    def _record_error(self, index: int, messages: List[str]) -> None:
+        self.failed += 1
+        if len(self.errors) < self.max_reported_errors:
+            self.errors.append({"index": index, "errors": messages})
@@ -0,0 +1,114 @@
+import asyncio
+import json
+import sqlite3
+import time
+import uuid
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+from app.core.config import settings
+
+
+class ConversationSessionStore:
+    """
+    Holds the draft interaction for each chat conversation, so the browser only has
+    to send the new message on every turn.
+
+    Sessions live in memory in least-recently-used order and expire after a TTL of
+    inactivity. When more than `max_in_memory` are live, the oldest ones spill to an
+    optional SQLite file and are loaded back on their next turn. Without a spill file
+    they are dropped.
+    """
+
+    def __init__(self, ttl_seconds: int, max_in_memory: int, spill_path: Optional[str] = None):
+        self.ttl_seconds = ttl_seconds
+        self.max_in_memory = max_in_memory
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict()
+        # Weak, so a lock lives only while a turn holds or waits on it: nothing builds
+        # up for unknown ids, and eviction never drops a lock that is in use.
+        self._locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+        self._spill = None
+        if spill_path:
+            self._spill = sqlite3.connect(spill_path, check_same_thread=False, isolation_level=None)
+            self._spill.execute(
+                "CREATE TABLE IF NOT EXISTS conversation_sessions ("
+                "id TEXT PRIMARY KEY, data TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def create(self, initial_data: Optional[Dict[str, Any]] = None) -> str:
+        conversation_id = uuid.uuid4().hex
+        self.put(conversation_id, initial_data or {})
+        return conversation_id
+
+    def get(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        now = time.time()
+        entry = self._sessions.get(conversation_id)
+        if entry is not None:
+            expires_at, data = entry
+            if expires_at < now:
+                self.delete(conversation_id)
+                return None
+            self._sessions.move_to_end(conversation_id)
+            return data
+
+        if self._spill is None:
+            return None
+        row = self._spill.execute(
+            "SELECT data, expires_at FROM conversation_sessions WHERE id = ?", (conversation_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        self._spill.execute("DELETE FROM conversation_sessions WHERE id = ?", (conversation_id,))
+        if row[1] < now:
+            return None
+        data = json.loads(row[0])
+        self.put(conversation_id, data)
+        return data
+
+    def put(self, conversation_id: str, data: Dict[str, Any]) -> None:
+        now = time.time()
+        self._sessions[conversation_id] = (now + self.ttl_seconds, data)
+        self._sessions.move_to_end(conversation_id)
+        self._evict(now)
+
+    def delete(self, conversation_id: str) -> None:
+        self._sessions.pop(conversation_id, None)
+        if self._spill is not None:
+            self._spill.execute("DELETE FROM conversation_sessions WHERE id = ?", (conversation_id,))
+
+    def lock(self, conversation_id: str) -> asyncio.Lock:
+        """Serializes turns within one conversation so concurrent messages don't lose updates."""
+        lock = self._locks.get(conversation_id)
+        if lock is None:
+            lock = self._locks[conversation_id] = asyncio.Lock()
+        return lock
+
+    def _evict(self, now: float) -> None:
+        # Least recently used first, so expired sessions cluster at the front.
+        spilled = False
+        while self._sessions:
+            oldest_id, (expires_at, data) = next(iter(self._sessions.items()))
+            if expires_at >= now and len(self._sessions) <= self.max_in_memory:
+                break
+            del self._sessions[oldest_id]
+            if expires_at >= now and self._spill is not None:
+                self._spill.execute(
+                    "INSERT OR REPLACE INTO conversation_sessions (id, data, expires_at) VALUES (?, ?, ?)",
+                    (oldest_id, json.dumps(data, default=str), expires_at),
+                )
+                spilled = True
+        if spilled:
+            self._spill.execute("DELETE FROM conversation_sessions WHERE expires_at < ?", (now,))
+
+
+def changed_fields(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+    """Returns only the keys of `after` whose values differ from `before`."""
+    return {key: value for key, value in after.items() if before.get(key) != value}
+
+
+# Create a single, shared store instance
+conversation_sessions = ConversationSessionStore(
+    ttl_seconds=settings.CONVERSATION_SESSION_TTL_SECONDS,
+    max_in_memory=settings.CONVERSATION_SESSION_MAX_IN_MEMORY,
+    spill_path=settings.CONVERSATION_SESSION_SPILL_PATH,
+)
@@ -0,0 +1,111 @@
+"""
+Streaming export of `hcp_interactions` as NDJSON or CSV, optionally zstd-compressed.
+
+Rows are read with a server-side cursor (`stream_results` + `yield_per`) and only
+the exported columns are selected, so no ORM objects are built and memory stays
+flat however many rows match. Output is produced one batch at a time.
+"""
+import csv
+import io
+from datetime import date
+from typing import Iterable, Iterator, List, Optional
+import orjson
+import zstandard
+from sqlalchemy import select
+from app import models
+from app.database import SessionLocal
+from app.services.hcp_name_index import find_hcp_names
+from app.services.list_items import LIST_FIELDS
+
+M = models.HCPInteraction
+EXPORT_COLUMNS = [
+    M.id, M.hcp_name, M.interaction_type, M.date, M.time, M.attendees, M.topics_discussed,
+    M.voice_note_summary, M.materials_shared, M.samples_distributed, M.sentiment, M.outcomes,
+    M.follow_up_actions, M.ai_suggested_followups, M.created_at, M.updated_at,
+]
+FIELD_NAMES = [column.key for column in EXPORT_COLUMNS]
+
+FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "csv": ("text/csv; charset=utf-8", "csv"),
+}
+
+
+def _iter_batches(start_date: Optional[date], end_date: Optional[date], hcp_name: Optional[str],
+                  batch_size: int) -> Iterator[List[tuple]]:
+    with SessionLocal() as db:
+        query = select(*EXPORT_COLUMNS).order_by(M.id)
+        if hcp_name:
+            query = query.where(M.hcp_name_normalized.in_(find_hcp_names(db, hcp_name)))
+        if start_date:
+            query = query.where(M.date >= start_date)
+        if end_date:
+            query = query.where(M.date <= end_date)
+
+        result = db.execute(query.execution_options(stream_results=True, yield_per=batch_size))
+        for partition in result.partitions():
+            yield partition
+
+
+def _value(row_value):
+    # Enum columns come back as enum members; export their plain values.
+    return getattr(row_value, "value", row_value)
+
+
+def _csv_value(name: str, value):
+    if value is None:
+        return None
+    if name in LIST_FIELDS:
+        return orjson.dumps(value).decode()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()  # Same date/time format as the NDJSON export
+    return _value(value)
+
+
+def _ndjson_chunks(batches: Iterable[List[tuple]]) -> Iterator[bytes]:
+    for batch in batches:
+        yield b"".join(
+            orjson.dumps({name: _value(value) for name, value in zip(FIELD_NAMES, row)}) + b"\n"
+            for row in batch
+        )
+
+
+def _csv_chunks(batches: Iterable[List[tuple]]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(FIELD_NAMES)
+    for batch in batches:
+        for row in batch:
+            writer.writerow([
+                _csv_value(name, value) for name, value in zip(FIELD_NAMES, row)
+            ])
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def _zstd_chunks(chunks: Iterable[bytes], level: int) -> Iterator[bytes]:
+    compressor = zstandard.ZstdCompressor(level=level).compressobj()
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_interactions(
+    export_format: str = "ndjson",
+    compress: bool = False,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    hcp_name: Optional[str] = None,
+    batch_size: int = 1000,
+    zstd_level: int = 3,
+) -> Iterator[bytes]:
+    """
+    Yields the export as byte chunks, one per `batch_size` rows. The session stays
+    open until the iterator is exhausted or closed.
+    """
+    batches = _iter_batches(start_date, end_date, hcp_name, batch_size)
+    chunks = _csv_chunks(batches) if export_format == "csv" else _ndjson_chunks(batches)
+    return _zstd_chunks(chunks, zstd_level) if compress else chunks
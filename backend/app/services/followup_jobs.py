@@ -0,0 +1,319 @@
+"""
+Background generation of ai_suggested_followups for new interactions.
+
+Creating an interaction without follow-ups adds a row to `followup_jobs` in the
+same transaction, so the request pays for one more insert and never waits on the
+LLM. `FollowupWorker` polls that table from inside the app process (there is no
+separate broker): it claims due jobs under a lease, generates the follow-ups with
+suggest_next_action_tool's prompt at background LLM priority, and writes them back
+to the interaction. Jobs live in the database, so nothing is lost on a restart,
+and any app process can run them.
+
+A failed job is retried with jittered exponential backoff until it runs out of
+attempts; then it is left in the table as "dead", with its last error, for
+`python -m app.services.followup_jobs requeue`. A job whose worker died is
+retried once its lease runs out. For backpressure, each process runs at most
+FOLLOWUP_WORKER_CONCURRENCY jobs at a time, and their LLM calls queue behind
+everything interactive. Once more than FOLLOWUP_MAX_QUEUED jobs are waiting, new
+ones go straight to the dead letter instead of growing the backlog further.
+"""
+import asyncio
+import random
+import sys
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app import models
+from app.core.config import settings
+from app.core.llm import llm_priority
+from app.core.metrics import FOLLOWUP_QUEUE_DEPTH, record_followup_job
+from app.database import with_session
+from app.services import list_items
+
+J = models.FollowupJob
+M = models.HCPInteraction
+
+QUEUE_FULL = "Queue was full; requeue with `python -m app.services.followup_jobs requeue`."
+
+
+def retry_delay(attempt: int, base_seconds: float, max_seconds: float) -> float:
+    """Seconds to wait before retrying after failed attempt number `attempt` (1-based)."""
+    return min(base_seconds * 2 ** (attempt - 1), max_seconds) * random.uniform(0.5, 1.0)
+
+
+def poll_jobs(
+    db: Session, limit: int, lease_seconds: float, max_attempts: int
+) -> Tuple[List[Tuple[int, int, int]], int]:
+    """
+    Claims up to `limit` due jobs. Returns their (job id, interaction id, attempt)
+    and the number of jobs still queued. The attempt number fences the claim: a
+    worker whose lease ran out can no longer finish or fail the job.
+    """
+    now = datetime.utcnow()
+    # Jobs whose worker died (or hung) past the lease: retry them, or give up.
+    expired = (J.status == "running", J.locked_until < now)
+    db.execute(update(J).where(*expired, J.attempts >= max_attempts).values(
+        status="dead", locked_until=None, last_error="Lease expired on the last attempt."
+    ))
+    db.execute(update(J).where(*expired).values(status="queued", run_after=now, locked_until=None))
+
+    claimed = db.execute(
+        select(J.id, J.interaction_id, J.attempts)
+        .where(J.status == "queued", J.run_after <= now)
+        .order_by(J.run_after)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    ).all()
+    if claimed:
+        db.execute(update(J).where(J.id.in_([job.id for job in claimed])).values(
+            status="running", attempts=J.attempts + 1, locked_until=now + timedelta(seconds=lease_seconds)
+        ))
+    db.commit()
+    queued = db.query(func.count(J.id)).filter(J.status == "queued").scalar()
+    return [(job.id, job.interaction_id, job.attempts + 1) for job in claimed], queued
+
+
+def finish_job(db: Session, job_id: int, attempt: int) -> None:
+    db.execute(update(J).where(J.id == job_id, J.status == "running", J.attempts == attempt).values(
+        status="done", locked_until=None, last_error=None
+    ))
+    db.commit()
+
+
+def fail_job(
+    db: Session, job_id: int, attempt: int, error: str,
+    max_attempts: int, retry_base_seconds: float, retry_max_seconds: float
+) -> Optional[str]:
+    """Schedules a retry or dead-letters the job. Returns "retried", "dead", or None if the claim was lost."""
+    job = db.get(J, job_id)
+    if job is None or job.status != "running" or job.attempts != attempt:
+        return None
+    job.last_error = error[:2000]
+    job.locked_until = None
+    if attempt >= max_attempts:
+        job.status = "dead"
+    else:
+        job.status = "queued"
+        job.run_after = datetime.utcnow() + timedelta(
+            seconds=retry_delay(attempt, retry_base_seconds, retry_max_seconds)
+        )
+    db.commit()
+    return "dead" if job.status == "dead" else "retried"
+
+
+def requeue_dead(db: Session) -> int:
+    """Puts every dead job back in the queue with fresh attempts. Returns how many."""
+    result = db.execute(update(J).where(J.status == "dead").values(
+        status="queued", attempts=0, run_after=datetime.utcnow(), last_error=None
+    ))
+    db.commit()
+    return result.rowcount
+
+
+def job_counts(db: Session) -> Dict[str, int]:
+    counts = dict(db.query(J.status, func.count(J.id)).group_by(J.status).all())
+    return {status: counts.get(status, 0) for status in ("queued", "running", "done", "dead")}
+
+
+def _pending_hcp_name(db: Session, interaction_id: int) -> Optional[str]:
+    row = db.query(M.hcp_name, M.ai_suggested_followups).filter(M.id == interaction_id).first()
+    return row.hcp_name if row is not None and row.ai_suggested_followups is None else None
+
+
+def _save_followups(db: Session, interaction_id: int, followups: List[str]) -> bool:
+    """
+    Writes the follow-ups unless the interaction is gone or has follow-ups by now
+    (a user's edit wins), and mirrors them into the list items.
+
+    The field is the system's, not the user's, so updated_at stays put: a client
+    editing with the updated_at it was given still succeeds, and the HCP's
+    briefing isn't marked stale. Collection ETags follow finished jobs instead
+    (see app.core.http_cache). The unchanged updated_at also guards the write,
+    since every user edit moves it.
+    """
+    for _ in range(3):
+        current = db.query(M.updated_at, M.ai_suggested_followups).filter(M.id == interaction_id).first()
+        if current is None or current.ai_suggested_followups is not None:
+            return False
+        result = db.execute(
+            update(M)
+            .where(M.id == interaction_id, M.updated_at == current.updated_at)
+            # Set explicitly, or the column's onupdate would move it.
+            .values(ai_suggested_followups=followups, updated_at=M.updated_at)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 1:
+            list_items.replace_items(db, interaction_id, {"ai_suggested_followups": followups})
+            db.commit()
+            return True
+        db.rollback()
+    raise RuntimeError("The interaction kept changing while its follow-ups were saved.")
+
+
+async def generate_followups(interaction_id: int) -> Optional[List[str]]:
+    """
+    Generates and stores the follow-ups of one interaction from its HCP's history.
+    Returns None without calling the LLM if there is nothing to do. Raises on failure.
+    """
+    from app.agents.fetch_hcp_history_tool import fetch_hcp_history_snapshot
+    from app.agents.suggest_next_action_tool import generate_suggestions
+
+    hcp_name = await run_in_threadpool(with_session, _pending_hcp_name, interaction_id)
+    if hcp_name is None:
+        return None
+    history = await run_in_threadpool(with_session, fetch_hcp_history_snapshot, hcp_name, exact_name=True)
+    if history["status"] == "error":
+        raise RuntimeError(history["message"])
+    result = await generate_suggestions(hcp_name, history["data"])
+    if result["status"] == "error":
+        raise RuntimeError(result["message"])
+    followups = [
+        str(item["suggestion"]) for item in result["data"].get("suggestions", [])
+        if isinstance(item, dict) and item.get("suggestion")
+    ]
+    if not followups:
+        raise ValueError("The AI returned no suggestions.")
+    saved = await run_in_threadpool(with_session, _save_followups, interaction_id, followups)
+    return followups if saved else None
+
+
+class FollowupWorker:
+    """
+    In-process poller for `followup_jobs`.
+
+    `enqueue()` and `notify()` are safe to call from any thread (CRUD code runs in
+    the threadpool). Jobs are enqueued whether or not the worker runs in this
+    process; another process's worker, or this one after a restart, picks them up.
+    """
+
+    def __init__(self, concurrency: int, poll_seconds: float, lease_seconds: float, max_attempts: int,
+                 retry_base_seconds: float, retry_max_seconds: float, max_queued: int):
+        self.concurrency = concurrency
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.max_queued = max_queued
+        # Jobs waiting as of the last poll, plus those enqueued here since.
+        self.queued = 0
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._poller: Optional[asyncio.Task] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.counters = {"done": 0, "retried": 0, "dead": 0, "db_errors": 0}
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._poller = asyncio.ensure_future(self._poll())
+
+    async def stop(self) -> None:
+        # Cancelled jobs stay "running" until their lease expires, then run again.
+        tasks = [self._poller, *self._tasks] if self._poller else list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop = self._poller = None
+        self._tasks.clear()
+
+    def enqueue(self, db: Session, interaction: models.HCPInteraction) -> None:
+        """Adds a job for `interaction` to the session; it is committed along with the caller's insert."""
+        with self._lock:
+            # Without a running poller there is no current depth to go by.
+            shed = self._loop is not None and self.queued >= self.max_queued
+            if not shed:
+                self.queued += 1
+        if shed:
+            db.add(models.FollowupJob(interaction=interaction, status="dead", last_error=QUEUE_FULL))
+        else:
+            db.add(models.FollowupJob(interaction=interaction))
+        record_followup_job("shed" if shed else "enqueued")
+
+    def notify(self) -> None:
+        """Wakes the poller after a commit added jobs. Does nothing while it isn't running."""
+        loop = self._loop
+        if loop is not None:
+            loop.call_soon_threadsafe(self._wake.set)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "running": self._loop is not None,
+            "in_progress": len(self._tasks),
+            "queued_at_last_poll": self.queued,
+            "concurrency": self.concurrency,
+            **self.counters,
+        }
+
+    async def _poll(self) -> None:
+        while True:
+            self._wake.clear()
+            free = self.concurrency - len(self._tasks)
+            if free > 0:
+                try:
+                    claimed, queued = await run_in_threadpool(
+                        with_session, poll_jobs, free, self.lease_seconds, self.max_attempts
+                    )
+                except Exception:
+                    self.counters["db_errors"] += 1  # e.g. the database is briefly away; try next poll
+                    claimed = []
+                else:
+                    with self._lock:
+                        self.queued = queued
+                    FOLLOWUP_QUEUE_DEPTH.set(queued)
+                for job_id, interaction_id, attempt in claimed:
+                    task = asyncio.ensure_future(self._run(job_id, interaction_id, attempt))
+                    self._tasks.add(task)
+                    task.add_done_callback(lambda done: (self._tasks.discard(done), self._wake.set()))
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _run(self, job_id: int, interaction_id: int, attempt: int) -> None:
+        error = None
+        try:
+            with llm_priority("background"):
+                await generate_followups(interaction_id)
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        try:
+            if error is None:
+                await run_in_threadpool(with_session, finish_job, job_id, attempt)
+                outcome = "done"
+            else:
+                outcome = await run_in_threadpool(
+                    with_session, fail_job, job_id, attempt, error,
+                    self.max_attempts, self.retry_base_seconds, self.retry_max_seconds
+                )
+        except Exception:
+            # The job stays claimed; it runs again once its lease expires.
+            self.counters["db_errors"] += 1
+            return
+        if outcome is not None:
+            self.counters[outcome] += 1
+            record_followup_job(outcome)
+
+
+# Create a single, shared worker instance; app.main starts it with the app.
+followup_worker = FollowupWorker(
+    concurrency=settings.FOLLOWUP_WORKER_CONCURRENCY,
+    poll_seconds=settings.FOLLOWUP_POLL_SECONDS,
+    lease_seconds=settings.FOLLOWUP_LEASE_SECONDS,
+    max_attempts=settings.FOLLOWUP_MAX_ATTEMPTS,
+    retry_base_seconds=settings.FOLLOWUP_RETRY_BASE_SECONDS,
+    retry_max_seconds=settings.FOLLOWUP_RETRY_MAX_SECONDS,
+    max_queued=settings.FOLLOWUP_MAX_QUEUED,
+)
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["requeue"]:
+        sys.exit("usage: python -m app.services.followup_jobs requeue")
+    from app.database import SessionLocal
+    with SessionLocal() as session:
+        print(f"Requeued {requeue_dead(session)} dead follow-up jobs.")
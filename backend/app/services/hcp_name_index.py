@@ -0,0 +1,147 @@
+"""
+Trigram index over distinct HCP names.
+
+Interaction rows only store `hcp_name_normalized`. Partial and fuzzy lookups run
+against `hcp_names` / `hcp_name_trigrams`, whose size grows with the number of
+distinct HCPs rather than the number of interactions. The matched names are then
+used for an indexed `IN (...)` filter on `hcp_interactions`.
+
+Rebuild for rows written before the index existed:
+    python -m app.services.hcp_name_index rebuild
+"""
+import sys
+from typing import Any, Dict, List
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app import models
+from app.core.names import normalize_hcp_name, name_trigrams
+
+
+def register_hcp_name(db: Session, hcp_name: str) -> None:
+    """
+    Adds `hcp_name` to the index if it is not there yet. Runs inside a savepoint so
+    it joins the caller's transaction, and a concurrent insert of the same new name
+    is harmless.
+    """
+    normalized = normalize_hcp_name(hcp_name)
+    if not normalized:
+        return
+    exists = db.query(models.HCPName.id).filter(models.HCPName.name_normalized == normalized).first()
+    if exists:
+        return
+
+    trigrams = name_trigrams(normalized)
+    try:
+        with db.begin_nested():
+            entry = models.HCPName(
+                name_normalized=normalized, display_name=hcp_name, trigram_count=len(trigrams)
+            )
+            db.add(entry)
+            db.flush()
+            db.add_all(models.HCPNameTrigram(trigram=t, hcp_name_id=entry.id) for t in trigrams)
+    except IntegrityError:
+        # Another writer registered the same name first.
+        pass
+
+
+def find_hcp_names(db: Session, hcp_name: str) -> List[str]:
+    """
+    Returns every normalized HCP name that contains `hcp_name` as a substring,
+    matching the old `ILIKE '%name%'` semantics on the normalized form.
+    """
+    query_normalized = normalize_hcp_name(hcp_name)
+    if not query_normalized:
+        return []
+
+    trigrams = name_trigrams(query_normalized)
+    if not trigrams:
+        # Too short for trigrams; the names table is small enough to scan.
+        rows = db.query(models.HCPName.name_normalized).filter(
+            models.HCPName.name_normalized.contains(query_normalized, autoescape=True)
+        )
+        return [name for (name,) in rows]
+
+    # A name can only contain the query if it contains all of the query's trigrams.
+    candidate_ids = (
+        select(models.HCPNameTrigram.hcp_name_id)
+        .where(models.HCPNameTrigram.trigram.in_(trigrams))
+        .group_by(models.HCPNameTrigram.hcp_name_id)
+        .having(func.count() == len(trigrams))
+    )
+    candidates = db.query(models.HCPName.name_normalized).filter(models.HCPName.id.in_(candidate_ids))
+    return [name for (name,) in candidates if query_normalized in name]
+
+
+def search_hcp_names(db: Session, hcp_name: str, limit: int = 10, min_similarity: float = 0.5) -> List[Dict[str, Any]]:
+    """
+    Ranked fuzzy lookup for typeahead and "did you mean" suggestions.
+
+    The score is the share of the query's trigrams found in a name, so a short
+    query is not penalized for matching a long full name. Names that contain the
+    query outright rank first; ties are broken by how much of the name matched.
+    """
+    query_normalized = normalize_hcp_name(hcp_name)
+    trigrams = name_trigrams(query_normalized)
+    if not trigrams:
+        names = find_hcp_names(db, hcp_name)
+        rows = db.query(models.HCPName).filter(models.HCPName.name_normalized.in_(names)).limit(limit)
+        return [{"hcp_name": row.display_name, "score": 1.0, "contains_query": True} for row in rows]
+
+    shared = func.count().label("shared")
+    matches = (
+        db.query(models.HCPName, shared)
+        .join(models.HCPNameTrigram, models.HCPNameTrigram.hcp_name_id == models.HCPName.id)
+        .filter(models.HCPNameTrigram.trigram.in_(trigrams))
+        .group_by(models.HCPName.id)
+        .order_by(shared.desc())
+        .limit(limit * 5)
+        .all()
+    )
+
+    ranked = []
+    for entry, shared_count in matches:
+        score = shared_count / len(trigrams)
+        contains_query = query_normalized in entry.name_normalized
+        if contains_query or score >= min_similarity:
+            name_coverage = shared_count / max(entry.trigram_count, 1)
+            ranked.append((contains_query, score, name_coverage, entry.display_name))
+
+    ranked.sort(reverse=True)
+    return [
+        {"hcp_name": name, "score": round(score, 4), "contains_query": contains_query}
+        for contains_query, score, _, name in ranked[:limit]
+    ]
+
+
+def rebuild_hcp_name_index(db: Session, batch_size: int = 1000) -> int:
+    """
+    Backfills `hcp_name_normalized` on existing rows and registers every distinct
+    name. Safe to re-run. Returns the number of distinct names indexed.
+    """
+    M = models.HCPInteraction
+    last_id = 0
+    while True:
+        batch = db.query(M).filter(M.id > last_id).order_by(M.id).limit(batch_size).all()
+        if not batch:
+            break
+        for interaction in batch:
+            normalized = normalize_hcp_name(interaction.hcp_name)
+            if interaction.hcp_name_normalized != normalized:
+                interaction.hcp_name_normalized = normalized
+        last_id = batch[-1].id
+        db.commit()
+
+    names = db.query(M.hcp_name).distinct().all()
+    for (name,) in names:
+        register_hcp_name(db, name)
+    db.commit()
+    return db.query(models.HCPName).count()
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["rebuild"]:
+        sys.exit("usage: python -m app.services.hcp_name_index rebuild")
+    from app.database import SessionLocal
+    with SessionLocal() as session:
+        print(f"Indexed {rebuild_hcp_name_index(session)} distinct HCP names.")
@@ -0,0 +1,56 @@
+"""
+Column-projected reads of interactions for list responses.
+
+Selecting InteractionOut's columns returns plain rows: no ORM objects, identity
+map or change tracking. The rows come straight from the database, so they are
+turned into response dicts as they are instead of being validated again through
+InteractionOut, and the routes encode them with orjson (ORJSONResponse).
+
+The dicts have the same keys and values as `InteractionOut.model_dump()`, so they
+also serve as history snapshots for the AI tools.
+"""
+from collections import defaultdict
+from typing import Any, Dict, List, Sequence
+from sqlalchemy import select
+from sqlalchemy.orm import Query, Session
+from app import models, schemas
+from app.core.config import settings
+from app.services.list_items import LIST_FIELDS
+
+M = models.HCPInteraction
+I = models.HCPInteractionListItem
+
+FIELD_NAMES = list(schemas.InteractionOut.model_fields)
+OUT_COLUMNS = [getattr(M, name) for name in FIELD_NAMES]
+
+
+def projected_query(db: Session) -> Query:
+    """An HCPInteraction query that returns rows of InteractionOut's columns."""
+    return db.query(*OUT_COLUMNS)
+
+
+def to_dicts(db: Session, rows: Sequence) -> List[Dict[str, Any]]:
+    """
+    Response dicts for rows of `projected_query`. With LIST_ITEMS_READ_ENABLED the
+    list fields come from the child rows, read in one query for the whole page.
+    """
+    # Enum columns come back as enum members; responses carry their plain values.
+    dicts = [
+        {name: getattr(value, "value", value) for name, value in zip(FIELD_NAMES, row)}
+        for row in rows
+    ]
+    if settings.LIST_ITEMS_READ_ENABLED and dicts:
+        lists: Dict[int, Dict[str, List[str]]] = defaultdict(lambda: defaultdict(list))
+        items = db.execute(
+            select(I.interaction_id, I.field, I.value)
+            .where(I.interaction_id.in_([interaction["id"] for interaction in dicts]))
+            .order_by(I.interaction_id, I.field, I.position)
+        )
+        for interaction_id, field, value in items:
+            lists[interaction_id][field].append(value)
+        for interaction in dicts:
+            found = lists.get(interaction["id"], {})
+            for field in LIST_FIELDS:
+                # Same null-vs-empty rule as list_items.lists_from_items.
+                interaction[field] = found.get(field, None if interaction[field] is None else [])
+    return dicts
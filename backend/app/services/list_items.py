@@ -0,0 +1,206 @@
+"""
+Indexed child rows for the JSON list columns of `hcp_interactions`.
+
+Every entry of `attendees`, `materials_shared`, `samples_distributed`,
+`follow_up_actions` and `ai_suggested_followups` is also written to
+`hcp_interaction_list_items` as (interaction_id, field, position, value), indexed
+on (field, value_key). Questions like "who got the starter kit sample this month"
+then become index lookups instead of parsing every row's JSON in Python.
+
+Migration path:
+  1. Writes go to both places (dual-write); the JSON columns stay authoritative.
+  2. Backfill rows written before the table existed:
+         python -m app.services.list_items backfill
+  3. Set LIST_ITEMS_READ_ENABLED so reads build the list fields of InteractionOut
+     from the child rows, loaded in one batched SELECT ... IN per page.
+"""
+import sys
+from typing import Any, Dict, Iterable, List, Optional, Set
+from datetime import date
+from sqlalchemy import delete, exists, func, insert, select
+from sqlalchemy.orm import Query, Session, selectinload
+from app import models
+from app.core.config import settings
+
+LIST_FIELDS = ("attendees", "materials_shared", "samples_distributed", "follow_up_actions", "ai_suggested_followups")
+# Short names accepted by the query endpoints.
+FIELD_ALIASES = {
+    "attendee": "attendees",
+    "material": "materials_shared",
+    "sample": "samples_distributed",
+    "follow_up": "follow_up_actions",
+    "ai_followup": "ai_suggested_followups",
+}
+
+M = models.HCPInteraction
+I = models.HCPInteractionListItem
+
+
+def value_key(value: str) -> str:
+    return " ".join(str(value).split()).lower()[:255]
+
+
+def item_rows(interaction_id: Optional[int], data: Dict[str, Any], fields: Iterable[str] = LIST_FIELDS) -> List[Dict[str, Any]]:
+    """Child rows for the list fields of `data` (an interaction dict) that are present in `fields`."""
+    rows = []
+    for field in fields:
+        for position, value in enumerate(data.get(field) or []):
+            if value is None or str(value).strip() == "":
+                continue
+            rows.append({
+                "interaction_id": interaction_id, "field": field, "position": position,
+                "value": str(value), "value_key": value_key(value),
+            })
+    return rows
+
+
+def build_items(data: Dict[str, Any]) -> List[models.HCPInteractionListItem]:
+    """ORM child objects for a new interaction; the flush fills in interaction_id."""
+    return [models.HCPInteractionListItem(**row) for row in item_rows(None, data)]
+
+
+def insert_interactions(db: Session, rows: List[Dict[str, Any]]) -> None:
+    """
+    Inserts interaction rows (Core, executemany) together with their list items,
+    in the caller's transaction.
+
+    The child rows need the new ids. Where the dialect can return them from an
+    executemany (SQLite, PostgreSQL, MariaDB) that is one statement; MySQL can't,
+    so rows with list values are inserted one at a time to read `lastrowid`.
+    """
+    dialect = db.get_bind().dialect
+    if dialect.insert_executemany_returning_sort_by_parameter_order:
+        ids = db.execute(insert(M).returning(M.id, sort_by_parameter_order=True), rows).scalars().all()
+    else:
+        plain = [row for row in rows if not any(row.get(field) for field in LIST_FIELDS)]
+        if plain:
+            db.execute(insert(M), plain)
+        ids, rows = [], [row for row in rows if any(row.get(field) for field in LIST_FIELDS)]
+        for row in rows:
+            ids.append(db.execute(insert(M).values(**row)).inserted_primary_key[0])
+
+    items = [item for interaction_id, row in zip(ids, rows) for item in item_rows(interaction_id, row)]
+    if items:
+        db.execute(insert(I), items)
+
+
+def replace_items(db: Session, interaction_id: int, changes: Dict[str, Any]) -> None:
+    """Rewrites the child rows of the list fields present in `changes`."""
+    fields = [field for field in LIST_FIELDS if field in changes]
+    if not fields:
+        return
+    db.execute(delete(I).where(I.interaction_id == interaction_id, I.field.in_(fields)))
+    items = item_rows(interaction_id, changes, fields)
+    if items:
+        db.execute(insert(I), items)
+
+
+def with_list_items(query: Query) -> Query:
+    """Eager-loads the child rows (one batched SELECT per page) when reads come from them."""
+    if settings.LIST_ITEMS_READ_ENABLED:
+        return query.options(selectinload(M.list_items))
+    return query
+
+
+def lists_from_items(interaction: models.HCPInteraction) -> Optional[Dict[str, Optional[List[str]]]]:
+    """
+    The list fields rebuilt from eager-loaded child rows, or None if they weren't
+    loaded. A field without rows keeps the JSON column's null-vs-empty distinction.
+    """
+    items = interaction.__dict__.get("list_items")  # Never triggers a lazy load
+    if items is None:
+        return None
+    lists: Dict[str, List[str]] = {}
+    for item in items:
+        lists.setdefault(item.field, []).append(item.value)
+    return {
+        field: lists.get(field, None if getattr(interaction, field) is None else [])
+        for field in LIST_FIELDS
+    }
+
+
+def _item_filter(field: str, value: str):
+    return exists().where(I.interaction_id == M.id, I.field == field, I.value_key == value_key(value))
+
+
+def filter_by_items(query: Query, filters: Dict[str, Optional[str]]) -> Query:
+    """Keeps interactions that have every given (field, value) pair."""
+    for field, value in filters.items():
+        if value:
+            query = query.filter(_item_filter(field, value))
+    return query
+
+
+def _date_range(statement, start_date: Optional[date], end_date: Optional[date]):
+    if start_date or end_date:
+        statement = statement.join(M, M.id == I.interaction_id)
+    if start_date:
+        statement = statement.where(M.date >= start_date)
+    if end_date:
+        statement = statement.where(M.date <= end_date)
+    return statement
+
+
+def top_values(db: Session, field: str, start_date: Optional[date] = None, end_date: Optional[date] = None,
+               limit: int = 20) -> List[Dict[str, Any]]:
+    """Most frequent values of one list field, e.g. the most-shared brochures."""
+    statement = _date_range(
+        select(func.max(I.value).label("value"), func.count(I.interaction_id.distinct()).label("interactions"))
+        .where(I.field == field)
+        .group_by(I.value_key),
+        start_date, end_date,
+    )
+    rows = db.execute(statement.order_by(func.count(I.interaction_id.distinct()).desc(), I.value_key).limit(limit))
+    return [{"value": row.value, "interactions": row.interactions} for row in rows]
+
+
+def hcps_with_value(db: Session, field: str, value: str, start_date: Optional[date] = None,
+                    end_date: Optional[date] = None, limit: int = 100) -> List[Dict[str, Any]]:
+    """HCPs with at least one interaction carrying `value` in `field`, most recent first."""
+    statement = (
+        select(func.max(M.hcp_name).label("hcp_name"), func.count(M.id).label("interactions"),
+               func.max(M.date).label("last_date"))
+        .where(_item_filter(field, value))
+        .group_by(M.hcp_name_normalized)
+    )
+    if start_date:
+        statement = statement.where(M.date >= start_date)
+    if end_date:
+        statement = statement.where(M.date <= end_date)
+    rows = db.execute(statement.order_by(func.max(M.date).desc()).limit(limit))
+    return [
+        {"hcp_name": row.hcp_name, "interactions": row.interactions, "last_interaction_date": row.last_date}
+        for row in rows
+    ]
+
+
+def backfill_list_items(db: Session, batch_size: int = 1000) -> int:
+    """
+    Rewrites the child rows of every interaction from its JSON columns, one id
+    range per transaction. Safe to re-run. Returns the number of items written.
+    """
+    last_id, written = 0, 0
+    while True:
+        batch = db.execute(
+            select(M.id, *(getattr(M, field) for field in LIST_FIELDS))
+            .where(M.id > last_id).order_by(M.id).limit(batch_size)
+        ).all()
+        if not batch:
+            break
+        ids: Set[int] = {row.id for row in batch}
+        items = [item for row in batch for item in item_rows(row.id, row._mapping)]
+        db.execute(delete(I).where(I.interaction_id.in_(ids)))
+        if items:
+            db.execute(insert(I), items)
+        db.commit()
+        written += len(items)
+        last_id = batch[-1].id
+    return written
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["backfill"]:
+        sys.exit("usage: python -m app.services.list_items backfill")
+    from app.database import SessionLocal
+    with SessionLocal() as session:
+        print(f"Wrote {backfill_list_items(session)} list items.")
@@ -0,0 +1,248 @@
+"""
+Per-HCP, per-period interaction rollups.
+
+`hcp_interaction_rollups` holds one row per (HCP, week) and (HCP, month) with
+interaction counts by type and sentiment and the last contact date in the period.
+Dashboards read these aggregates in O(periods) instead of scanning interactions.
+
+The table is kept current in the same transaction as the write that changes it:
+inserts add their counts with an atomic `UPDATE ... SET n = n + 1` (falling back
+to an INSERT for a new bucket), and edits recompute just the buckets they touch.
+
+Rebuild from scratch, e.g. after adding the table to an existing database:
+    python -m app.services.rollups rebuild
+"""
+import sys
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import and_, case, delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app import models
+from app.core.names import normalize_hcp_name
+
+PERIODS = ("week", "month")
+TYPE_COLUMNS = {"Meeting": "meetings", "Call": "calls", "Virtual": "virtual"}
+SENTIMENT_COLUMNS = {"Positive": "positive", "Neutral": "neutral", "Negative": "negative"}
+COUNT_COLUMNS = ["total", *TYPE_COLUMNS.values(), *SENTIMENT_COLUMNS.values()]
+
+R = models.HCPInteractionRollup
+M = models.HCPInteraction
+
+
+def period_start(day: date, period: str) -> date:
+    if period == "week":
+        return day - timedelta(days=day.weekday())  # ISO weeks start on Monday
+    return day.replace(day=1)
+
+
+def period_end(start: date, period: str) -> date:
+    if period == "week":
+        return start + timedelta(days=6)
+    next_month = (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return next_month - timedelta(days=1)
+
+
+def _plain(value: Any) -> str:
+    return getattr(value, "value", value)
+
+
+def _counts_for(interaction_type: Any, sentiment: Any, n: int = 1) -> Dict[str, int]:
+    counts = {"total": n}
+    type_column = TYPE_COLUMNS.get(_plain(interaction_type))
+    sentiment_column = SENTIMENT_COLUMNS.get(_plain(sentiment))
+    if type_column:
+        counts[type_column] = n
+    if sentiment_column:
+        counts[sentiment_column] = n
+    return counts
+
+
+def _add_to_bucket(db: Session, key: Tuple[str, str, date], hcp_name: str,
+                   counts: Dict[str, int], last_date: date) -> None:
+    normalized, period, start = key
+    where = and_(R.hcp_name_normalized == normalized, R.period == period, R.period_start == start)
+    values = {column: getattr(R, column) + n for column, n in counts.items()}
+    values["hcp_name"] = hcp_name
+    values["last_interaction_date"] = case(
+        (R.last_interaction_date.is_(None), last_date),
+        (R.last_interaction_date < last_date, last_date),
+        else_=R.last_interaction_date,
+    )
+    if db.execute(update(R).where(where).values(**values)).rowcount:
+        return
+    try:
+        with db.begin_nested():
+            db.execute(insert(R).values(
+                hcp_name_normalized=normalized, period=period, period_start=start, hcp_name=hcp_name,
+                last_interaction_date=last_date, **{column: counts.get(column, 0) for column in COUNT_COLUMNS},
+            ))
+    except IntegrityError:
+        # Another writer created the bucket first; add to theirs.
+        db.execute(update(R).where(where).values(**values))
+
+
+def record_interactions(db: Session, rows: Iterable[Dict[str, Any]]) -> None:
+    """
+    Adds new interactions (dicts with hcp_name, interaction_type, sentiment, date)
+    to their week and month buckets. Runs in the caller's transaction.
+    """
+    buckets: Dict[Tuple[str, str, date], list] = {}
+    for row in rows:
+        normalized = normalize_hcp_name(row["hcp_name"])
+        for period in PERIODS:
+            key = (normalized, period, period_start(row["date"], period))
+            bucket = buckets.setdefault(key, [row["hcp_name"], defaultdict(int), row["date"]])
+            for column, n in _counts_for(row["interaction_type"], row["sentiment"]).items():
+                bucket[1][column] += n
+            bucket[2] = max(bucket[2], row["date"])
+    for key, (hcp_name, counts, last_date) in buckets.items():
+        _add_to_bucket(db, key, hcp_name, counts, last_date)
+
+
+def recompute_buckets(db: Session, hcp_name_normalized: str, days: Iterable[date]) -> None:
+    """Recomputes the week and month buckets containing `days` for one HCP from the interactions table."""
+    for period in PERIODS:
+        for start in {period_start(day, period) for day in days}:
+            end = period_end(start, period)
+            groups = (
+                db.query(M.hcp_name, M.interaction_type, M.sentiment, func.count(M.id), func.max(M.date))
+                .filter(M.hcp_name_normalized == hcp_name_normalized, M.date >= start, M.date <= end)
+                .group_by(M.hcp_name, M.interaction_type, M.sentiment)
+                .all()
+            )
+            db.execute(delete(R).where(
+                R.hcp_name_normalized == hcp_name_normalized, R.period == period, R.period_start == start
+            ))
+            if not groups:
+                continue
+            counts = defaultdict(int)
+            for _, interaction_type, sentiment, n, _ in groups:
+                for column, value in _counts_for(interaction_type, sentiment, n).items():
+                    counts[column] += value
+            db.execute(insert(R).values(
+                hcp_name_normalized=hcp_name_normalized, period=period, period_start=start,
+                hcp_name=groups[-1][0], last_interaction_date=max(group[4] for group in groups),
+                **{column: counts.get(column, 0) for column in COUNT_COLUMNS},
+            ))
+
+
+def rebuild_rollups(db: Session, batch_size: int = 5000) -> int:
+    """Recreates every bucket from the interactions table. Returns the number of buckets."""
+    buckets: Dict[Tuple[str, str, date], list] = {}
+    rows = db.execute(
+        select(M.hcp_name, M.hcp_name_normalized, M.interaction_type, M.sentiment, M.date)
+        .execution_options(stream_results=True, yield_per=batch_size)
+    )
+    for hcp_name, normalized, interaction_type, sentiment, day in rows:
+        normalized = normalized or normalize_hcp_name(hcp_name)
+        for period in PERIODS:
+            key = (normalized, period, period_start(day, period))
+            bucket = buckets.setdefault(key, [hcp_name, defaultdict(int), day])
+            for column, n in _counts_for(interaction_type, sentiment).items():
+                bucket[1][column] += n
+            bucket[2] = max(bucket[2], day)
+
+    db.execute(delete(R))
+    values = [
+        {
+            "hcp_name_normalized": normalized, "period": period, "period_start": start, "hcp_name": hcp_name,
+            "last_interaction_date": last_date, **{column: counts.get(column, 0) for column in COUNT_COLUMNS},
+        }
+        for (normalized, period, start), (hcp_name, counts, last_date) in buckets.items()
+    ]
+    for offset in range(0, len(values), batch_size):
+        db.execute(insert(R), values[offset:offset + batch_size])
+    db.commit()
+    return len(values)
+
+
+def _bucket_out(row) -> Dict[str, Any]:
+    return {
+        "period_start": row.period_start,
+        "period_end": period_end(row.period_start, row.period),
+        "total": row.total,
+        "by_type": {name: getattr(row, column) for name, column in TYPE_COLUMNS.items()},
+        "by_sentiment": {name: getattr(row, column) for name, column in SENTIMENT_COLUMNS.items()},
+        "last_interaction_date": row.last_interaction_date,
+    }
+
+
+def get_hcp_analytics(db: Session, hcp_name: str, period: str = "month", start_date: Optional[date] = None,
+                      end_date: Optional[date] = None, today: Optional[date] = None) -> Optional[Dict[str, Any]]:
+    """Per-period counts for one HCP (exact name), oldest first, plus totals and days since last contact."""
+    normalized = normalize_hcp_name(hcp_name)
+    query = db.query(R).filter(R.hcp_name_normalized == normalized, R.period == period)
+    if start_date:
+        query = query.filter(R.period_start >= period_start(start_date, period))
+    if end_date:
+        query = query.filter(R.period_start <= end_date)
+    rows = query.order_by(R.period_start).all()
+
+    last_contact = (
+        db.query(func.max(R.last_interaction_date))
+        .filter(R.hcp_name_normalized == normalized, R.period == "month")
+        .scalar()
+    )
+    if last_contact is None:
+        return None
+
+    periods = [_bucket_out(row) for row in rows]
+    totals = {"total": 0, "by_type": defaultdict(int), "by_sentiment": defaultdict(int)}
+    for bucket in periods:
+        totals["total"] += bucket["total"]
+        for name, n in bucket["by_type"].items():
+            totals["by_type"][name] += n
+        for name, n in bucket["by_sentiment"].items():
+            totals["by_sentiment"][name] += n
+    return {
+        "hcp_name": rows[-1].hcp_name if rows else hcp_name,
+        "period": period,
+        "last_interaction_date": last_contact,
+        "days_since_last_contact": ((today or date.today()) - last_contact).days,
+        "totals": totals,
+        "periods": periods,
+    }
+
+
+def get_analytics_overview(db: Session, period: str = "month", start_date: Optional[date] = None,
+                           end_date: Optional[date] = None, limit: int = 100, offset: int = 0,
+                           today: Optional[date] = None) -> List[Dict[str, Any]]:
+    """
+    One row per HCP with counts summed over the selected periods and days since
+    last contact, longest-uncontacted first.
+    """
+    sums = [func.sum(getattr(R, column)).label(column) for column in COUNT_COLUMNS]
+    query = (
+        db.query(R.hcp_name_normalized, func.max(R.hcp_name).label("hcp_name"),
+                 func.max(R.last_interaction_date).label("last_interaction_date"), *sums)
+        .filter(R.period == period)
+        .group_by(R.hcp_name_normalized)
+    )
+    if start_date:
+        query = query.filter(R.period_start >= period_start(start_date, period))
+    if end_date:
+        query = query.filter(R.period_start <= end_date)
+    rows = query.order_by(func.max(R.last_interaction_date), R.hcp_name_normalized).offset(offset).limit(limit)
+
+    today = today or date.today()
+    return [
+        {
+            "hcp_name": row.hcp_name,
+            "total": row.total,
+            "by_type": {name: getattr(row, column) for name, column in TYPE_COLUMNS.items()},
+            "by_sentiment": {name: getattr(row, column) for name, column in SENTIMENT_COLUMNS.items()},
+            "last_interaction_date": row.last_interaction_date,
+            "days_since_last_contact": (today - row.last_interaction_date).days,
+        }
+        for row in rows
+    ]
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["rebuild"]:
+        sys.exit("usage: python -m app.services.rollups rebuild")
+    from app.database import SessionLocal
+    with SessionLocal() as session:
+        print(f"Rebuilt {rebuild_rollups(session)} rollup buckets.")
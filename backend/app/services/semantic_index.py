@@ -0,0 +1,422 @@
+"""
+Local semantic search over interaction notes.
+
+Each interaction's topics_discussed, outcomes and voice_note_summary are embedded
+with a signed feature-hashing vectorizer (unigrams and bigrams, sublinear term
+frequency, L2-normalized), so there is no model or vocabulary to download and a
+vector only depends on its own text. Queries are weighted by inverse document
+frequency from per-dimension counts kept alongside the vectors, so rare terms like
+a product name count for more than "discussed".
+
+The vectors live in SEMANTIC_INDEX_PATH as a float16 matrix memory-mapped from
+disk, so startup reads only a small metadata file and the OS pages rows in as
+searches touch them. The index catches up incrementally, by embedding the rows
+whose `updated_at` (or id) is past the last sync. While the app runs,
+`start()` does this in the background: a few seconds after this process
+writes (SEMANTIC_INDEX_SYNC_DEBOUNCE_SECONDS, so a burst shares one sync), and
+otherwise every SEMANTIC_INDEX_SYNC_INTERVAL_SECONDS to see other processes'
+writes. Searches never wait for it; on a cold index they see whatever has been
+embedded so far. Without the background sync (CLI, benchmarks) a search syncs
+first. Edited rows are overwritten in place; new ones are appended, doubling the
+files when full. Each row's `updated_at` is stored too, so rows read again are
+only re-embedded if they actually changed.
+
+One process must own an index directory. The default path suits a single app
+process; with several workers, put "{pid}" in SEMANTIC_INDEX_PATH so each gets
+its own directory (each one is then built from scratch when its worker starts).
+
+Rebuild from scratch, e.g. after changing SEMANTIC_INDEX_DIM:
+    python -m app.services.semantic_index rebuild
+"""
+import asyncio
+import json
+import math
+import os
+import re
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import xxhash
+from sqlalchemy import or_, select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app import models
+from app.core.config import settings
+from app.database import with_session
+from app.services.hcp_name_index import find_hcp_names
+from app.services.interaction_rows import projected_query, to_dicts
+
+INDEX_VERSION = 1
+TEXT_FIELDS = ("topics_discussed", "outcomes", "voice_note_summary")
+STOPWORDS = frozenset(
+    "a about after again all also an and any are as at be been before but by can did do does for from had has have "
+    "he her his how i if in into is it its me more my no not of on or our she so some than that the their them then "
+    "there they this to up was we were what when which who will with would you your".split()
+)
+SCORE_CHUNK_ROWS = 65536
+ROW_FILES = ("vectors.f16", "ids.i64", "stamps.i64")
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+M = models.HCPInteraction
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Lowercased word tokens without stopwords; a trailing plural "s" is dropped."""
+    tokens = []
+    for token in _TOKEN.findall((text or "").lower()):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def _stamp(updated_at: Optional[datetime]) -> int:
+    """`updated_at` as whole microseconds, 0 for NULL."""
+    return int(updated_at.timestamp() * 1_000_000) if updated_at else 0
+
+
+def embed(texts: Iterable[Optional[str]], dim: int) -> np.ndarray:
+    """Hashing-vectorizer embedding of `texts` (bigrams never span two texts), L2-normalized."""
+    counts: Dict[int, float] = {}
+    for text in texts:
+        tokens = tokenize(text)
+        for feature in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+            digest = xxhash.xxh3_64_intdigest(feature)
+            # The top bit picks the sign, so colliding features tend to cancel rather than add up.
+            sign = 1.0 if digest >> 63 else -1.0
+            counts[digest % dim] = counts.get(digest % dim, 0.0) + sign
+    vector = np.zeros(dim, dtype=np.float32)
+    for column, count in counts.items():
+        if count:
+            vector[column] = math.copysign(1.0 + math.log(abs(count)), count)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class SemanticIndex:
+    def __init__(self, path: Optional[str] = None, dim: Optional[int] = None):
+        self.path = (path or settings.SEMANTIC_INDEX_PATH).format(pid=os.getpid())
+        self.dim = dim or settings.SEMANTIC_INDEX_DIM
+        # _lock guards the arrays searches read; _sync_lock keeps one sync at a time.
+        self._lock = threading.Lock()
+        self._sync_lock = threading.RLock()
+        self._loaded = False
+        self._dirty = True
+        self._synced_at = 0.0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._syncer: Optional[asyncio.Task] = None
+        self.sync_errors = 0
+
+    def start(self) -> None:
+        """Keeps the index in sync from a background task instead of on search."""
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._syncer = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        if self._syncer is not None:
+            self._syncer.cancel()
+            await asyncio.gather(self._syncer, return_exceptions=True)
+        self._loop = self._syncer = None
+
+    def mark_dirty(self) -> None:
+        """Called after writes (from any thread) so the next sync picks them up."""
+        self._dirty = True
+        loop = self._loop
+        if loop is not None:
+            loop.call_soon_threadsafe(self._wake.set)
+
+    async def _run(self) -> None:
+        while True:
+            self._wake.clear()
+            try:
+                await run_in_threadpool(with_session, self.sync)
+            except Exception:
+                self.sync_errors += 1  # e.g. the database is briefly away; try again next round
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=settings.SEMANTIC_INDEX_SYNC_INTERVAL_SECONDS)
+            except asyncio.TimeoutError:
+                continue
+            # Let a burst of writes land, so it costs one sync rather than one per write.
+            await asyncio.sleep(settings.SEMANTIC_INDEX_SYNC_DEBOUNCE_SECONDS)
+
+    def sync(self, db: Session, force: bool = False, batch_size: int = 2000) -> int:
+        """Embeds rows changed since the last sync. Returns how many were (re)embedded."""
+        with self._sync_lock:
+            with self._lock:
+                self._load()
+                interval = settings.SEMANTIC_INDEX_SYNC_INTERVAL_SECONDS
+                if not (force or self._dirty or time.monotonic() - self._synced_at >= interval):
+                    return 0
+                # Cleared before reading, so a write that lands during the sync marks it again.
+                self._dirty = False
+                watermark, max_id = self.watermark, self.max_id
+            query = select(M.id, M.updated_at, *(getattr(M, field) for field in TEXT_FIELDS))
+            if watermark is not None:
+                # Re-read a margin before the watermark for transactions that committed late.
+                since = watermark - timedelta(seconds=settings.SEMANTIC_INDEX_SYNC_OVERLAP_SECONDS)
+                query = query.where(or_(M.updated_at >= since, M.id > max_id))
+            embedded, last_id = 0, 0
+            while True:
+                rows = db.execute(query.where(M.id > last_id).order_by(M.id).limit(batch_size)).all()
+                # Ends the read transaction before embedding, so it doesn't hold up writers
+                # (SQLite blocks them behind an open reader).
+                db.rollback()
+                if not rows:
+                    break
+                last_id = rows[-1].id
+                # One batch at a time, so searches can run in between.
+                with self._lock:
+                    embedded += self._apply(rows)
+            with self._lock:
+                self._save()
+                self._synced_at = time.monotonic()
+            return embedded
+
+    def rebuild(self, db: Session) -> int:
+        """Drops the index files and embeds every interaction."""
+        with self._sync_lock, self._lock:
+            self._close()
+            self._remove_files()
+            self._loaded = False
+        return self.sync(db, force=True)
+
+    def search(self, db: Session, query: str, k: int = 10, candidate_ids: Optional[List[int]] = None
+               ) -> List[Tuple[int, float]]:
+        """
+        `(interaction id, score)` for the `k` rows most similar to `query`, best
+        first, among `candidate_ids` if given. Rows sharing no terms are left out.
+        """
+        if self._loop is None:
+            self.sync(db)
+        with self._lock:
+            self._load()
+            if not self.count:
+                return []
+            weights = embed([query], self.dim)
+            weights *= np.log((1.0 + self.count) / (1.0 + self._df)) + 1.0
+            norm = np.linalg.norm(weights)
+            if not norm:
+                return []
+            weights /= norm
+
+            if candidate_ids is None:
+                rows = None
+            else:
+                rows = np.fromiter(
+                    (self._row_of[i] for i in candidate_ids if i in self._row_of), dtype=np.int64
+                )
+                rows.sort()  # Read the mapped file front to back.
+            scores = self._scores(weights, rows)
+            ids = self._ids[:self.count] if rows is None else self._ids[rows]
+
+        k = min(k, len(scores))
+        if not k:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(ids[i]), float(scores[i])) for i in top if scores[i] > 0]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._load()
+            return {
+                "path": self.path,
+                "dim": self.dim,
+                "documents": self.count,
+                "capacity": self.capacity,
+                "watermark": self.watermark.isoformat() if self.watermark else None,
+                "dirty": self._dirty,
+                "background_sync": self._loop is not None,
+                "sync_errors": self.sync_errors,
+            }
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def _load(self) -> None:
+        if self._loaded:
+            return
+        meta = None
+        if os.path.exists(self._file("meta.json")):
+            with open(self._file("meta.json")) as f:
+                meta = json.load(f)
+            if meta.get("version") != INDEX_VERSION or meta.get("dim") != self.dim:
+                meta = None  # Built with other settings; start over.
+                self._remove_files()
+        self._vectors = self._ids = self._stamps = None
+        if meta is None:
+            self.count, self.capacity, self.max_id, self.watermark = 0, 0, 0, None
+            self._df = np.zeros(self.dim, dtype=np.int64)
+        else:
+            self.count, self.capacity, self.max_id = meta["count"], meta["capacity"], meta["max_id"]
+            self.watermark = datetime.fromisoformat(meta["watermark"]) if meta["watermark"] else None
+            self._df = np.load(self._file("df.npy"))
+            self._open(self.capacity)
+        self._row_of = {i: row for row, i in enumerate(self._ids[:self.count].tolist())} if self.count else {}
+        self._loaded = True
+
+    def _remove_files(self) -> None:
+        for name in ROW_FILES + ("df.npy", "meta.json"):
+            if os.path.exists(self._file(name)):
+                os.remove(self._file(name))
+
+    def _open(self, capacity: int) -> None:
+        self._vectors = np.memmap(self._file("vectors.f16"), dtype=np.float16, mode="r+", shape=(capacity, self.dim))
+        self._ids = np.memmap(self._file("ids.i64"), dtype=np.int64, mode="r+", shape=(capacity,))
+        self._stamps = np.memmap(self._file("stamps.i64"), dtype=np.int64, mode="r+", shape=(capacity,))
+
+    def _flush(self) -> None:
+        for array in (self._vectors, self._ids, self._stamps):
+            array.flush()
+
+    def _close(self) -> None:
+        if getattr(self, "_vectors", None) is not None:
+            self._flush()
+        self._vectors = self._ids = self._stamps = None
+
+    def _ensure_capacity(self, needed: int) -> None:
+        if needed <= self.capacity:
+            return
+        capacity = max(needed, self.capacity * 2, 1024)
+        os.makedirs(self.path, exist_ok=True)
+        self._close()
+        # Growing the files zero-fills the new rows; the existing ones stay where they are.
+        row_bytes = {"vectors.f16": 2 * self.dim, "ids.i64": 8, "stamps.i64": 8}
+        for name in ROW_FILES:
+            with open(self._file(name), "ab") as f:
+                f.truncate(capacity * row_bytes[name])
+        self.capacity = capacity
+        self._open(capacity)
+
+    def _apply(self, rows) -> int:
+        """Embeds the rows that are new or changed since they were indexed; returns how many."""
+        self.max_id = max(self.max_id, *(row.id for row in rows))
+        updated = [row.updated_at for row in rows if row.updated_at is not None]
+        if updated:
+            self.watermark = max(updated + ([self.watermark] if self.watermark else []))
+
+        existing, new = [], []
+        for row in rows:
+            target = self._row_of.get(row.id)
+            if target is None:
+                new.append(row)
+            else:
+                existing.append((row, target))
+        if existing:
+            stamps = np.array([_stamp(row.updated_at) for row, _ in existing], dtype=np.int64)
+            changed = self._stamps[np.array([target for _, target in existing])] != stamps
+            existing = [pair for pair, is_changed in zip(existing, changed) if is_changed]
+        changed = [row for row, _ in existing] + new
+        if not changed:
+            return 0
+        vectors = np.stack([embed(row[2:], self.dim) for row in changed]).astype(np.float16)
+
+        if existing:
+            targets = np.array([target for _, target in existing])
+            self._df -= np.count_nonzero(self._vectors[targets], axis=0)
+            self._vectors[targets] = vectors[:len(existing)]
+            self._stamps[targets] = [_stamp(row.updated_at) for row, _ in existing]
+        if new:
+            self._ensure_capacity(self.count + len(new))
+            end = self.count + len(new)
+            self._vectors[self.count:end] = vectors[len(existing):]
+            self._ids[self.count:end] = [row.id for row in new]
+            self._stamps[self.count:end] = [_stamp(row.updated_at) for row in new]
+            for offset, row in enumerate(new):
+                self._row_of[row.id] = self.count + offset
+            self.count = end
+        self._df += np.count_nonzero(vectors, axis=0)
+        return len(changed)
+
+    def _save(self) -> None:
+        if self._vectors is None:
+            return
+        self._flush()
+        np.save(self._file("df.tmp.npy"), self._df)
+        os.replace(self._file("df.tmp.npy"), self._file("df.npy"))
+        meta = {
+            "version": INDEX_VERSION, "dim": self.dim, "count": self.count, "capacity": self.capacity,
+            "max_id": self.max_id, "watermark": self.watermark.isoformat() if self.watermark else None,
+        }
+        # The metadata is replaced last: after a crash mid-sync, the old watermark
+        # makes the next sync read the same rows again.
+        with open(self._file("meta.tmp.json"), "w") as f:
+            json.dump(meta, f)
+        os.replace(self._file("meta.tmp.json"), self._file("meta.json"))
+
+    def _scores(self, weights: np.ndarray, rows: Optional[np.ndarray]) -> np.ndarray:
+        # A query only sets a few dimensions, and the others add nothing to the dot
+        # product, so only those columns are read and converted to float32.
+        columns = np.flatnonzero(weights)
+        weights = weights[columns]
+        total = self.count if rows is None else len(rows)
+        scores = np.empty(total, dtype=np.float32)
+        for start in range(0, total, SCORE_CHUNK_ROWS):
+            end = min(start + SCORE_CHUNK_ROWS, total)
+            if rows is None:
+                chunk = self._vectors[start:end, columns]
+            else:
+                chunk = self._vectors[np.ix_(rows[start:end], columns)]
+            scores[start:end] = chunk.astype(np.float32) @ weights
+        return scores
+
+
+def _candidate_ids(db: Session, hcp_name: Optional[str], start_date: Optional[date],
+                   end_date: Optional[date]) -> Optional[List[int]]:
+    if not (hcp_name or start_date or end_date):
+        return None
+    query = select(M.id)
+    if hcp_name:
+        query = query.where(M.hcp_name_normalized.in_(find_hcp_names(db, hcp_name)))
+    if start_date:
+        query = query.where(M.date >= start_date)
+    if end_date:
+        query = query.where(M.date <= end_date)
+    return db.execute(query).scalars().all()
+
+
+def search_interactions(db: Session, query: str, k: int = 10, hcp_name: Optional[str] = None,
+                        start_date: Optional[date] = None, end_date: Optional[date] = None
+                        ) -> List[Dict[str, Any]]:
+    """
+    The `k` interactions whose notes best match `query`, best first, as
+    InteractionOut dicts with a `score`. `hcp_name` matches partial names.
+    """
+    matches = semantic_index.search(db, query, k, _candidate_ids(db, hcp_name, start_date, end_date))
+    if not matches:
+        return []
+    rows = projected_query(db).filter(M.id.in_([i for i, _ in matches])).all()
+    by_id = {interaction["id"]: interaction for interaction in to_dicts(db, rows)}
+    return [{"score": round(score, 4), **by_id[i]} for i, score in matches if i in by_id]
+
+
+def relevant_history_snapshot(db: Session, hcp_name: str, focus: str, limit: int = 5) -> Dict[str, Any]:
+    """
+    The HCP's `limit` interactions most relevant to `focus`, newest first, shaped
+    like fetch_hcp_history_snapshot's result so the summary prompt can use it.
+    """
+    if not hcp_name:
+        return {"status": "error", "message": "HCP name must be provided."}
+    matches = search_interactions(db, focus, k=limit, hcp_name=hcp_name)
+    matches.sort(key=lambda interaction: (interaction["date"], interaction["time"]), reverse=True)
+    return {"status": "success", "data": matches}
+
+
+# Create a single, shared index instance
+semantic_index = SemanticIndex()
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] != ["rebuild"]:
+        sys.exit("usage: python -m app.services.semantic_index rebuild")
+    from app.database import SessionLocal
+    with SessionLocal() as session:
+        print(f"Embedded {semantic_index.rebuild(session)} interactions into {semantic_index.path}.")
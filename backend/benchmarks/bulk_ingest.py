@@ -0,0 +1,89 @@
+"""
+Throughput of the bulk ingestion path against the single-row create path.
+
+Runs against a throwaway SQLite database, so no MySQL or Groq key is needed:
+
+    cd backend
+    python -m benchmarks.bulk_ingest --rows 5000 --transaction-size 1000
+"""
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from benchmarks import environment  # noqa: F401
+from app import crud, models, schemas  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.migrations import upgrade  # noqa: E402
+from app.services.bulk_ingest import BulkIngestor  # noqa: E402
+
+
+def make_payloads(count: int, hcp_count: int = 200):
+    rng = random.Random(42)
+    start = date(2024, 1, 1)
+    return [
+        {
+            "hcp_name": f"Dr. Bench {rng.randrange(hcp_count)}",
+            "interaction_type": rng.choice(["Meeting", "Call", "Virtual"]),
+            "date": (start + timedelta(days=rng.randrange(600))).isoformat(),
+            "time": f"{rng.randrange(8, 18):02d}:{rng.choice(['00', '30'])}",
+            "attendees": ["Rep A"],
+            "topics_discussed": "CardioPlus efficacy data",
+            "materials_shared": ["efficacy brochure"],
+            "sentiment": rng.choice(["Positive", "Neutral", "Negative"]),
+            "outcomes": "Agreed to review the data.",
+        }
+        for _ in range(count)
+    ]
+
+
+def reset_tables():
+    Base.metadata.drop_all(bind=engine)
+    upgrade(engine)
+
+
+def run_single_row(payloads) -> float:
+    reset_tables()
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        for payload in payloads:
+            crud.create_interaction(db, schemas.InteractionCreate.model_validate(payload))
+    return time.perf_counter() - started
+
+
+def run_bulk(payloads, chunk_size: int, transaction_size: int) -> float:
+    reset_tables()
+    started = time.perf_counter()
+    ingestor = BulkIngestor(transaction_size=transaction_size)
+    with SessionLocal() as db:
+        for offset in range(0, len(payloads), chunk_size):
+            chunk = list(enumerate(payloads[offset:offset + chunk_size], start=offset))
+            ingestor.add_chunk(db, chunk)
+        report = ingestor.finish(db)
+    elapsed = time.perf_counter() - started
+    assert report["inserted"] == len(payloads), report
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--chunk-size", type=int, default=500)
+    parser.add_argument("--transaction-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    payloads = make_payloads(args.rows)
+    single = run_single_row(payloads)
+    bulk = run_bulk(payloads, args.chunk_size, args.transaction_size)
+
+    with SessionLocal() as db:
+        assert db.query(models.HCPInteraction).count() == args.rows
+
+    print(f"rows: {args.rows}  (SQLite at {engine.url.database})")
+    print(f"single-row create : {single:8.3f}s  {args.rows / single:10.0f} rows/s")
+    print(f"bulk ingest       : {bulk:8.3f}s  {args.rows / bulk:10.0f} rows/s")
+    print(f"speedup           : {single / bulk:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
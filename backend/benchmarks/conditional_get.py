@@ -0,0 +1,72 @@
+"""
+Cost of a repeat read of the interaction list and an HCP's history, four ways:
+  plain         - conditional GET disabled: page query + serialization every time
+  miss          - validator query, then page query + serialization (first read)
+  cache hit     - validator query, body from the in-process response cache
+  304           - validator query only; the client sent a matching If-None-Match
+
+    cd backend
+    python -m benchmarks.conditional_get --rows 50000 --limit 100 --requests 300
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from benchmarks import environment  # noqa: F401
+from benchmarks.seed import hcp_names, seed_database  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.http_cache import response_cache  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+async def timed(client: httpx.AsyncClient, url: str, params: dict, requests: int, headers=None, before=None):
+    latencies = []
+    for _ in range(requests):
+        if before:
+            before()
+        started = time.perf_counter()
+        response = await client.get(url, params=params, headers=headers)
+        latencies.append(time.perf_counter() - started)
+    ordered = sorted(latencies)
+    return response, ordered[len(ordered) // 2] * 1000, ordered[max(int(len(ordered) * 0.95) - 1, 0)] * 1000
+
+
+async def run(args):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        routes = [
+            ("list", "/interactions/", {"limit": args.limit}),
+            ("history", f"/interactions/ai/history/{hcp_names(1)[0]}", {"page_size": args.limit}),
+        ]
+        print(f"{'route':<9}{'mode':<11}{'p50 ms':>9}{'p95 ms':>9}{'status':>8}")
+        for label, url, params in routes:
+            settings.CONDITIONAL_GET_ENABLED = False
+            modes = [("plain", await timed(client, url, params, args.requests))]
+            settings.CONDITIONAL_GET_ENABLED = True
+            modes.append(("miss", await timed(client, url, params, args.requests, before=response_cache.clear)))
+            response, *hit = await timed(client, url, params, args.requests)
+            modes.append(("cache hit", (response, *hit)))
+            etag = {"If-None-Match": response.headers["etag"]}
+            modes.append(("304", await timed(client, url, params, args.requests, headers=etag)))
+            for mode, (response, p50, p95) in modes:
+                print(f"{label:<9}{mode:<11}{p50:>9.2f}{p95:>9.2f}{response.status_code:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--limit", type=int, default=100, help="Page size of both reads.")
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+
+    settings.BRIEFING_STORE_ENABLED = False
+    # Seeded rows are brand new; don't wait out the settle window.
+    settings.CONDITIONAL_GET_SETTLE_SECONDS = 0
+    seed_database(hcp_count=max(args.rows // 50, 1), interactions_per_hcp=50)
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+"""
+Import this before anything from `app`.
+
+Points the backend at a throwaway SQLite database, so the benchmarks run without
+MySQL. LLM calls go to fakes (benchmarks.fake_llm) or a local stand-in server
+(benchmarks.stand_in_llm), never the network. Set DATABASE_URL yourself to keep
+the seeded database between runs, e.g.
+
+    DATABASE_URL=sqlite:///bench.db python -m benchmarks.load ...
+"""
+import os
+import tempfile
+
+if "DATABASE_URL" not in os.environ:
+    _db_dir = tempfile.mkdtemp(prefix="hcp-bench-")
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'bench.db')}"
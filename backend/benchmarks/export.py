@@ -0,0 +1,48 @@
+"""
+Throughput and peak Python memory of the streaming export at growing table sizes.
+
+Peak memory (tracemalloc) should stay flat as the row count grows; only the
+batch size moves it.
+
+    cd backend
+    python -m benchmarks.export --rows 10000,50000 --batch-size 1000
+"""
+import argparse
+import time
+import tracemalloc
+
+from benchmarks import environment  # noqa: F401
+from benchmarks.seed import seed_database  # noqa: E402
+from app.services.export import export_interactions  # noqa: E402
+
+
+def measure(export_format: str, compress: bool, batch_size: int):
+    tracemalloc.start()
+    started = time.perf_counter()
+    total_bytes = 0
+    for chunk in export_interactions(export_format=export_format, compress=compress, batch_size=batch_size):
+        total_bytes += len(chunk)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, total_bytes, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", default="10000,50000", help="Comma-separated table sizes to test.")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'format':<12}{'seconds':>9}{'rows/s':>10}{'MB out':>9}{'peak MB':>9}")
+    for rows in (int(value) for value in args.rows.split(",")):
+        seed_database(hcp_count=max(rows // 50, 1), interactions_per_hcp=50)
+        for export_format, compress in [("ndjson", False), ("csv", False), ("ndjson", True), ("csv", True)]:
+            elapsed, total_bytes, peak = measure(export_format, compress, args.batch_size)
+            label = export_format + (".zst" if compress else "")
+            print(f"{rows:>8} {label:<12}{elapsed:>9.2f}{rows / elapsed:>10.0f}"
+                  f"{total_bytes / 1e6:>9.2f}{peak / 1e6:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+A stand-in for ChatGroq with configurable latency and canned responses.
+
+`install_fake_llms()` overrides every tool's client in the LLM registry with a
+FakeLLM that answers in the shape that tool's parser expects, so every AI route
+can be exercised offline.
+"""
+import asyncio
+import json
+import random
+import time
+from typing import Any, Dict, Optional
+from app.core.config import settings
+from app.core.llm_clients import llm_clients
+from app.core.llm_scheduler import llm_scheduler
+
+CANNED_RESPONSES: Dict[str, Dict[str, Any]] = {
+    "conversation_tool": {
+        "sentiment": "Positive",
+        "topics_discussed": "CardioPlus efficacy data",
+        "materials_shared": ["efficacy brochure"],
+    },
+    "log_interaction_tool": {
+        "hcp_name": "Dr. Bench Note",
+        "interaction_type": "Call",
+        "date": "2025-01-15",
+        "time": "10:30",
+        "attendees": ["Dr. Bench Note"],
+        "topics_discussed": "CardioPlus dosing",
+        "sentiment": "Neutral",
+        "outcomes": "Will review the dosing guide.",
+        "follow_up_actions": ["Send dosing guide"],
+    },
+    "edit_interaction_tool": {"outcomes": "Agreed to enroll two patients."},
+    "summarize_history_tool": {
+        "relationship_status": "Advancing Positively",
+        "key_takeaways": ["Consistently positive sentiment.", "Interested in efficacy data."],
+        "suggested_focus": "Discuss patient onboarding.",
+    },
+    "suggest_next_action_tool": {
+        "suggestions": [
+            {"suggestion": "Send the prescribing information.", "rationale": "It was requested."},
+            {"suggestion": "Book a follow-up call.", "rationale": "Keeps momentum."},
+            {"suggestion": "Share a case study.", "rationale": "Reinforces efficacy."},
+        ]
+    },
+}
+
+
+class FakeMessage:
+    def __init__(self, content: str, prompt: str = ""):
+        self.content = content
+        # Rough token counts, about four characters per token.
+        input_tokens = len(prompt) // 4
+        output_tokens = len(content) // 4
+        self.usage_metadata = {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+
+
+class FakeLLM:
+    """
+    Mimics the parts of ChatGroq the agent tools use: `ainvoke`, `invoke` and
+    `astream`. Each call waits `latency` seconds (plus up to `jitter` seconds)
+    and returns `payload` in a ```json block after a short <thinking> block.
+    """
+
+    def __init__(self, payload: Dict[str, Any], latency: float = 0.0, jitter: float = 0.0,
+                 model_name: str = "fake-llm", stream_chunk_chars: int = 16, seed: Optional[int] = None):
+        self.payload = payload
+        self.latency = latency
+        self.jitter = jitter
+        self.model_name = model_name
+        self.temperature = 0
+        self.stream_chunk_chars = stream_chunk_chars
+        self.calls = 0
+        self._rng = random.Random(seed)
+
+    def _text(self) -> str:
+        return "<thinking>Canned benchmark response.</thinking>\n```json\n" + json.dumps(self.payload) + "\n```"
+
+    def _delay(self) -> float:
+        return self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+
+    async def ainvoke(self, prompt, *args, **kwargs) -> FakeMessage:
+        self.calls += 1
+        await asyncio.sleep(self._delay())
+        return FakeMessage(self._text(), str(prompt))
+
+    def invoke(self, prompt, *args, **kwargs) -> FakeMessage:
+        self.calls += 1
+        time.sleep(self._delay())
+        return FakeMessage(self._text(), str(prompt))
+
+    async def astream(self, prompt, *args, **kwargs):
+        self.calls += 1
+        text = self._text()
+        chunks = range(0, len(text), self.stream_chunk_chars)
+        per_chunk = self._delay() / max(len(chunks), 1)
+        for offset in chunks:
+            await asyncio.sleep(per_chunk)
+            yield FakeMessage(text[offset:offset + self.stream_chunk_chars])
+
+
+def install_fake_llms(latency: float = 0.0, jitter: float = 0.0,
+                      responses: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, FakeLLM]:
+    """
+    Registers a FakeLLM override for every agent tool and returns the fakes by
+    tool name, so callers can inspect `calls`. `responses` overrides
+    CANNED_RESPONSES per tool.
+
+    The fakes have no provider quota, so the scheduler's rate limits are lifted;
+    concurrency limits still apply.
+    """
+    settings.LLM_RATE_LIMIT_REQUESTS_PER_MINUTE = None
+    settings.LLM_RATE_LIMIT_TOKENS_PER_MINUTE = None
+    llm_scheduler.configure()
+    payloads = {**CANNED_RESPONSES, **(responses or {})}
+    fakes = {}
+    for seed, tool_name in enumerate(CANNED_RESPONSES):
+        fakes[tool_name] = FakeLLM(payloads[tool_name], latency=latency, jitter=jitter, seed=seed)
+        llm_clients.override(tool_name, fakes[tool_name])
+    return fakes
@@ -0,0 +1,114 @@
+"""
+Create latency with and without background follow-up generation, and how fast
+the in-process worker drains the queue.
+
+  with follow-ups   - POST /interactions/ that sends ai_suggested_followups (no job)
+  enqueued          - POST /interactions/ without them (one followup_jobs row each)
+
+Then the worker drains the jobs against a fake LLM that takes --llm-latency
+seconds and fails a --fail-rate fraction of calls, so retries and dead-lettering
+show up in the counts. Backoff is shortened to keep the run short.
+
+    cd backend
+    python -m benchmarks.followup_jobs --creates 200 --llm-latency 0.5 --fail-rate 0.3
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import httpx
+
+from benchmarks import environment  # noqa: F401
+from benchmarks.fake_llm import CANNED_RESPONSES, FakeLLM, install_fake_llms  # noqa: E402
+from benchmarks.seed import hcp_names, seed_database  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.llm_clients import llm_clients  # noqa: E402
+from app.database import with_session  # noqa: E402
+from app.main import app  # noqa: E402
+from app.services.followup_jobs import followup_worker, job_counts  # noqa: E402
+
+
+class FlakyLLM(FakeLLM):
+    """FakeLLM whose calls fail with probability `fail_rate`."""
+
+    def __init__(self, *args, fail_rate: float = 0.0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fail_rate = fail_rate
+
+    async def ainvoke(self, prompt, *args, **kwargs):
+        if self._rng.random() < self.fail_rate:
+            self.calls += 1
+            await asyncio.sleep(self._delay())
+            raise RuntimeError("Simulated provider failure")
+        return await super().ainvoke(prompt, *args, **kwargs)
+
+
+def payload(rng: random.Random, hcps, followups: bool):
+    body = {
+        "hcp_name": rng.choice(hcps), "interaction_type": "Meeting", "date": "2025-06-01", "time": "10:00",
+        "topics_discussed": "CardioPlus efficacy data", "sentiment": "Positive",
+    }
+    if followups:
+        body["ai_suggested_followups"] = ["Send the efficacy brochure."]
+    return body
+
+
+async def create_many(client: httpx.AsyncClient, count: int, hcps, followups: bool):
+    rng = random.Random(7)
+    latencies = []
+    for _ in range(count):
+        started = time.perf_counter()
+        response = await client.post("/interactions/", json=payload(rng, hcps, followups))
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - started)
+    ordered = sorted(latencies)
+    return ordered[len(ordered) // 2] * 1000, ordered[max(int(len(ordered) * 0.95) - 1, 0)] * 1000
+
+
+async def run(args):
+    hcps = hcp_names(args.hcps)
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            print(f"{'create':<18}{'p50 ms':>9}{'p95 ms':>9}")
+            for label, followups in (("with follow-ups", True), ("enqueued", False)):
+                p50, p95 = await create_many(client, args.creates, hcps, followups)
+                print(f"{label:<18}{p50:>9.2f}{p95:>9.2f}")
+
+            started = time.perf_counter()
+            while True:
+                counts = await asyncio.to_thread(with_session, job_counts)
+                if counts["queued"] + counts["running"] == 0 or time.perf_counter() - started > args.timeout:
+                    break
+                await asyncio.sleep(0.1)
+            drained = time.perf_counter() - started
+    print(f"\ndrained in {drained:.1f}s with concurrency {followup_worker.concurrency}: {counts}")
+    print(f"worker: {followup_worker.stats()}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hcps", type=int, default=50)
+    parser.add_argument("--creates", type=int, default=200, help="Creates per mode.")
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--fail-rate", type=float, default=0.3)
+    parser.add_argument("--concurrency", type=int, default=4, help="Worker concurrency.")
+    parser.add_argument("--timeout", type=float, default=300.0, help="Give up draining after this many seconds.")
+    args = parser.parse_args()
+
+    settings.BRIEFING_STORE_ENABLED = False
+    seed_database(hcp_count=args.hcps, interactions_per_hcp=20)
+    install_fake_llms(latency=args.llm_latency)
+    llm_clients.override("suggest_next_action_tool", FlakyLLM(
+        CANNED_RESPONSES["suggest_next_action_tool"], latency=args.llm_latency, fail_rate=args.fail_rate, seed=1
+    ))
+    followup_worker.concurrency = args.concurrency
+    followup_worker.poll_seconds = 0.5
+    followup_worker.retry_base_seconds = 0.5
+    followup_worker.retry_max_seconds = 2.0
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
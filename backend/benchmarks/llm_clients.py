@@ -0,0 +1,121 @@
+"""
+Cold start and per-call connection cost of the shared LLM client registry.
+
+Cold start: time to `import app.main` in a fresh interpreter, with clients
+created lazily (now) versus the five per-tool ChatGroq clients the agents used
+to build at import time.
+
+Per call: sequential and concurrent calls spread over all five tools against a
+local stand-in server (benchmarks.stand_in_llm), comparing
+  shared     - the registry: one keep-alive pool for every tool
+  per-tool   - one ChatGroq (and pool) per tool, as before
+  no-reuse   - a fresh client per call, i.e. a new connection every time
+and reporting latency and the number of TCP connections the server saw.
+
+    cd backend
+    python -m benchmarks.llm_clients --calls 200 --concurrency 10
+"""
+import argparse
+import asyncio
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks import environment  # noqa: F401
+from benchmarks.stand_in_llm import StandInLLM, start_in_thread  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.llm_clients import LLMClientRegistry  # noqa: E402
+
+TOOLS = [
+    "conversation_tool", "log_interaction_tool", "edit_interaction_tool",
+    "summarize_history_tool", "suggest_next_action_tool",
+]
+PROMPT = "Summarize: relationship_status please."
+
+IMPORT_APP = "import time; t = time.perf_counter(); import app.main; print(time.perf_counter() - t)"
+IMPORT_APP_EAGER = (
+    "import time; t = time.perf_counter(); import app.main\n"
+    "from langchain_groq import ChatGroq\n"
+    f"clients = [ChatGroq(temperature=0, model_name='gemma2-9b-it', groq_api_key='x') for _ in range({len(TOOLS)})]\n"
+    "print(time.perf_counter() - t)"
+)
+
+
+def cold_start(code: str, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        timings.append(float(output.strip().splitlines()[-1]))
+    return statistics.median(timings)
+
+
+def per_tool_client(tool_name: str, base_url: str):
+    from langchain_groq import ChatGroq
+    return ChatGroq(temperature=0, model_name="gemma2-9b-it", groq_api_key="x", groq_api_base=base_url)
+
+
+async def run_calls(get_client, calls: int, concurrency: int):
+    slots = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(number: int):
+        async with slots:
+            client = get_client(TOOLS[number % len(TOOLS)])
+            started = time.perf_counter()
+            await client.ainvoke(PROMPT)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(number) for number in range(calls)))
+    return latencies, time.perf_counter() - started
+
+
+def report(label: str, latencies, elapsed: float, connections: int):
+    ordered = sorted(latencies)
+    p50 = ordered[len(ordered) // 2] * 1000
+    p95 = ordered[int(len(ordered) * 0.95) - 1] * 1000
+    print(f"{label:<10}{p50:>9.2f}{p95:>9.2f}{len(latencies) / elapsed:>9.0f}{connections:>13}")
+
+
+async def per_call(calls: int, concurrency: int, latency: float):
+    stand_in = StandInLLM(latency=latency)
+    base_url = start_in_thread(stand_in)
+    settings.LLM_BASE_URL = base_url
+
+    registry = LLMClientRegistry()
+    per_tool = {tool_name: per_tool_client(tool_name, base_url) for tool_name in TOOLS}
+    modes = [
+        ("shared", registry.get),
+        ("per-tool", per_tool.__getitem__),
+        ("no-reuse", lambda tool_name: per_tool_client(tool_name, base_url)),
+    ]
+
+    print(f"{'mode':<10}{'p50 ms':>9}{'p95 ms':>9}{'calls/s':>9}{'connections':>13}")
+    for label, get_client in modes:
+        await run_calls(get_client, len(TOOLS), 1)  # Warm up: build clients, import the SDK
+        stand_in.connections.clear()
+        latencies, elapsed = await run_calls(get_client, calls, concurrency)
+        report(label, latencies, elapsed, len(stand_in.connections))
+    await registry.aclose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Stand-in server latency in seconds.")
+    parser.add_argument("--cold-start-runs", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.cold_start_runs:
+        lazy = cold_start(IMPORT_APP, args.cold_start_runs)
+        eager = cold_start(IMPORT_APP_EAGER, args.cold_start_runs)
+        print(f"import app.main, lazy clients:           {lazy * 1000:8.1f} ms")
+        print(f"import app.main + {len(TOOLS)} eager ChatGroq clients: {eager * 1000:8.1f} ms\n")
+
+    asyncio.run(per_call(args.calls, args.concurrency, args.llm_latency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Throughput and interactive latency under a provider rate limit.
+
+Runs a burst of background summary calls plus a steady trickle of interactive
+conversation calls against the local stand-in server (benchmarks.stand_in_llm)
+enforcing a per-minute quota, in three modes:
+  scheduler   - calls paced to the quota, interactive ahead of background
+  unpaced     - no pacing, but 429s still retried with jittered backoff
+  no-retry    - no pacing and no retries (every 429 is a failed call)
+
+    cd backend
+    python -m benchmarks.llm_scheduler --rpm 120 --tpm 12000 --background 40 --interactive 20
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks import environment  # noqa: F401
+from benchmarks.stand_in_llm import StandInLLM, start_in_thread  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.llm import ainvoke_llm  # noqa: E402
+from app.core.llm_clients import llm_clients  # noqa: E402
+from app.core.llm_scheduler import llm_scheduler  # noqa: E402
+from app.core.metrics import LLM_RETRIES  # noqa: E402
+
+# Long enough that tokens, not requests, are the binding limit for summaries.
+BACKGROUND_PROMPT = "Summarize this history and return relationship_status. " + "Met to discuss dosing. " * 80
+INTERACTIVE_PROMPT = "Extract materials_shared from: I shared the efficacy brochure."
+
+
+async def timed_call(tool_name: str, prompt: str, results: list, delay: float = 0.0):
+    await asyncio.sleep(delay)
+    started = time.perf_counter()
+    try:
+        await ainvoke_llm(tool_name, prompt)
+        results.append((True, time.perf_counter() - started))
+    except Exception:
+        results.append((False, time.perf_counter() - started))
+
+
+def summarize(label: str, results: list) -> str:
+    latencies = sorted(seconds for ok, seconds in results if ok)
+    failed = sum(1 for ok, _ in results if not ok)
+    if not latencies:
+        return f"{label:<12}{0:>5}{failed:>7}{'-':>9}{'-':>9}"
+    p50 = latencies[len(latencies) // 2]
+    p95 = latencies[max(int(len(latencies) * 0.95) - 1, 0)]
+    return f"{label:<12}{len(latencies):>5}{failed:>7}{p50:>9.2f}{p95:>9.2f}"
+
+
+async def run_mode(label: str, args, paced: bool, retry_attempts: int):
+    stand_in = StandInLLM(latency=args.llm_latency, rpm=args.rpm, tpm=args.tpm)
+    settings.LLM_BASE_URL = start_in_thread(stand_in)
+    settings.LLM_RATE_LIMIT_REQUESTS_PER_MINUTE = args.rpm if paced else None
+    settings.LLM_RATE_LIMIT_TOKENS_PER_MINUTE = args.tpm if paced else None
+    settings.LLM_RETRY_ATTEMPTS = retry_attempts
+    await llm_clients.aclose()
+    llm_scheduler.configure()
+    retries_before = sum(LLM_RETRIES._values.values())
+
+    background, interactive = [], []
+    started = time.perf_counter()
+    await asyncio.gather(
+        *(timed_call("summarize_history_tool", BACKGROUND_PROMPT, background) for _ in range(args.background)),
+        *(timed_call("conversation_tool", INTERACTIVE_PROMPT, interactive, delay=number * args.interactive_interval)
+          for number in range(args.interactive)),
+    )
+    elapsed = time.perf_counter() - started
+
+    print(f"\n{label}: {elapsed:.1f} s, {stand_in.rejected} of {stand_in.requests} upstream requests got 429, "
+          f"{sum(LLM_RETRIES._values.values()) - retries_before:.0f} retries")
+    print(f"{'class':<12}{'ok':>5}{'failed':>7}{'p50 s':>9}{'p95 s':>9}")
+    print(summarize("interactive", interactive))
+    print(summarize("background", background))
+    await llm_clients.aclose()
+
+
+async def main_async(args):
+    await run_mode("scheduler", args, paced=True, retry_attempts=args.retry_attempts)
+    await run_mode("unpaced", args, paced=False, retry_attempts=args.retry_attempts)
+    await run_mode("no-retry", args, paced=False, retry_attempts=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rpm", type=int, default=120, help="Stand-in quota: requests per minute.")
+    parser.add_argument("--tpm", type=int, default=12000, help="Stand-in quota: tokens per minute.")
+    parser.add_argument("--background", type=int, default=40, help="Summary calls fired at once.")
+    parser.add_argument("--interactive", type=int, default=20, help="Conversation calls, one per interval.")
+    parser.add_argument("--interactive-interval", type=float, default=2.0)
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--retry-attempts", type=int, default=settings.LLM_RETRY_ATTEMPTS)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
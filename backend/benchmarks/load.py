@@ -0,0 +1,322 @@
+"""
+Offline load test for every route in `routers/interactions.py`.
+
+Runs the FastAPI app in-process over httpx's ASGI transport, against a seeded
+SQLite database and fake LLMs (see benchmarks/fake_llm.py), so results measure
+this code rather than the network or Groq. Each scenario reports p50/p95/p99
+latency and requests per second. Save a run with --output and compare a later
+one against it with --compare:
+
+    cd backend
+    python -m benchmarks.load --output before.json
+    git checkout my-branch
+    python -m benchmarks.load --compare before.json
+
+    python -m benchmarks.load --scenarios history,summary --requests 500 --concurrency 32 --llm-latency 0.8
+"""
+import argparse
+import asyncio
+import json
+import math
+import platform
+import random
+import subprocess
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks import environment  # noqa: F401
+from benchmarks.fake_llm import install_fake_llms  # noqa: E402
+from benchmarks.seed import database_is_seeded, hcp_names, seed_database  # noqa: E402
+from app.main import app  # noqa: E402
+
+
+@dataclass
+class Context:
+    """What scenarios may draw on: the seeded HCPs and interaction ids, and a seeded RNG."""
+    hcps: List[str]
+    interaction_ids: List[int]
+    cursors: List[str]
+    rng: random.Random
+
+
+Scenario = Callable[[httpx.AsyncClient, Context], Awaitable[httpx.Response]]
+
+
+def _new_interaction(ctx: Context) -> Dict[str, Any]:
+    return {
+        "hcp_name": ctx.rng.choice(ctx.hcps),
+        "interaction_type": "Meeting",
+        "date": "2025-03-04",
+        "time": "14:30",
+        "attendees": ["Rep A"],
+        "topics_discussed": "Benchmark visit",
+        "sentiment": "Positive",
+    }
+
+
+async def create(client, ctx):
+    return await client.post("/interactions/", json=_new_interaction(ctx))
+
+
+async def bulk(client, ctx):
+    body = "\n".join(json.dumps(_new_interaction(ctx)) for _ in range(100))
+    return await client.post("/interactions/bulk", content=body, headers={"Content-Type": "application/x-ndjson"})
+
+
+async def list_offset(client, ctx):
+    return await client.get("/interactions/", params={"skip": ctx.rng.randrange(1000), "limit": 50})
+
+
+async def list_cursor(client, ctx):
+    return await client.get("/interactions/", params={"cursor": ctx.rng.choice(ctx.cursors), "limit": 50})
+
+
+async def export(client, ctx):
+    return await client.get("/interactions/export", params={"hcp_name": ctx.rng.choice(ctx.hcps)})
+
+
+async def hcp_search(client, ctx):
+    name = ctx.rng.choice(ctx.hcps)
+    return await client.get("/interactions/hcps/search", params={"q": name[-7:]})
+
+
+async def history(client, ctx):
+    return await client.get(f"/interactions/ai/history/{ctx.rng.choice(ctx.hcps)}", params={"page_size": 10})
+
+
+async def summary(client, ctx):
+    return await client.get(f"/interactions/ai/summary/{ctx.rng.choice(ctx.hcps)}")
+
+
+async def suggestions(client, ctx):
+    return await client.get(f"/interactions/ai/suggestions/{ctx.rng.choice(ctx.hcps)}")
+
+
+async def briefing(client, ctx):
+    return await client.get(f"/interactions/ai/briefing/{ctx.rng.choice(ctx.hcps)}", params={"exact_name": "true"})
+
+
+async def conversation(client, ctx):
+    return await client.post("/interactions/ai/conversation", json={
+        "message": "Met Dr. Bench today, talked about CardioPlus, she was positive.",
+        "current_data": _new_interaction(ctx),
+    })
+
+
+async def conversation_stream(client, ctx):
+    return await client.post("/interactions/ai/conversation/stream", json={
+        "message": "Met Dr. Bench today, talked about CardioPlus, she was positive.",
+        "current_data": _new_interaction(ctx),
+    })
+
+
+async def conversation_session(client, ctx):
+    # One full conversation: start, one turn, read the draft back, end it.
+    started = await client.post("/interactions/ai/conversation/sessions", json={"current_data": {}})
+    conversation_id = started.json()["conversation_id"]
+    await client.post(f"/interactions/ai/conversation/sessions/{conversation_id}/messages",
+                      json={"message": "Talked about CardioPlus, she was positive."})
+    await client.get(f"/interactions/ai/conversation/sessions/{conversation_id}")
+    return await client.delete(f"/interactions/ai/conversation/sessions/{conversation_id}")
+
+
+async def edit_local(client, ctx):
+    command = ctx.rng.choice(["Change the sentiment to Neutral", "move it to tomorrow at 3pm", "type is Call"])
+    return await client.patch(f"/interactions/ai/{ctx.rng.choice(ctx.interaction_ids)}", json={"command": command})
+
+
+async def edit_llm(client, ctx):
+    return await client.patch(f"/interactions/ai/{ctx.rng.choice(ctx.interaction_ids)}",
+                              json={"command": "She agreed to enroll two patients next quarter."})
+
+
+async def extract_batch(client, ctx):
+    batch_id = f"bench-{ctx.rng.getrandbits(64):016x}"
+    notes = [f"Called Dr. Bench about dosing, note {number}" for number in range(5)]
+    response = await client.post("/interactions/ai/extract/batch", json={"notes": notes, "batch_id": batch_id})
+    if response.status_code != 200:
+        return response
+    return await client.get(f"/interactions/ai/extract/batch/{batch_id}")
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "create": create,
+    "bulk": bulk,
+    "list_offset": list_offset,
+    "list_cursor": list_cursor,
+    "export": export,
+    "hcp_search": hcp_search,
+    "history": history,
+    "summary": summary,
+    "suggestions": suggestions,
+    "briefing": briefing,
+    "conversation": conversation,
+    "conversation_stream": conversation_stream,
+    "conversation_session": conversation_session,
+    "edit_local": edit_local,
+    "edit_llm": edit_llm,
+    "extract_batch": extract_batch,
+}
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return float("nan")
+    rank = max(math.ceil(fraction * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+async def run_scenario(client: httpx.AsyncClient, ctx: Context, scenario: Scenario,
+                       requests: int, concurrency: int, warmup: int) -> Dict[str, Any]:
+    for _ in range(warmup):
+        await scenario(client, ctx)
+
+    latencies: List[float] = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                response = await scenario(client, ctx)
+                failed = response.status_code >= 400
+            except Exception:
+                failed = True
+            latencies.append(time.perf_counter() - started)
+            errors += failed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": round(elapsed, 4),
+        "rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+        "mean_ms": round(1000 * sum(latencies) / len(latencies), 3) if latencies else None,
+        "p50_ms": round(1000 * percentile(latencies, 0.50), 3),
+        "p95_ms": round(1000 * percentile(latencies, 0.95), 3),
+        "p99_ms": round(1000 * percentile(latencies, 0.99), 3),
+    }
+
+
+async def build_context(client: httpx.AsyncClient, hcp_count: int, seed: int) -> Context:
+    from app import models
+    from app.database import SessionLocal
+
+    with SessionLocal() as db:
+        interaction_ids = [row_id for (row_id,) in db.query(models.HCPInteraction.id).limit(5000)]
+    hcps = hcp_names(hcp_count)
+
+    # Walk the first pages once so cursor scenarios start from real positions.
+    cursors, cursor = [], None
+    for _ in range(20):
+        response = await client.get("/interactions/", params={"limit": 50, **({"cursor": cursor} if cursor else {})})
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+        cursors.append(cursor)
+    return Context(hcps=hcps, interaction_ids=interaction_ids, cursors=cursors or [""], rng=random.Random(seed))
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run(args) -> Dict[str, Any]:
+    install_fake_llms(latency=args.llm_latency, jitter=args.llm_jitter)
+    if args.reseed or not database_is_seeded():
+        seed_database(args.hcps, args.interactions, args.seed)
+
+    names = args.scenarios.split(",") if args.scenarios else list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        raise SystemExit(f"Unknown scenarios: {', '.join(unknown)}. Choose from: {', '.join(SCENARIOS)}")
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            ctx = await build_context(client, args.hcps, args.seed)
+            for name in names:
+                results[name] = await run_scenario(
+                    client, ctx, SCENARIOS[name], args.requests, args.concurrency, args.warmup
+                )
+                print_row(name, results[name])
+
+    return {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "config": {
+            "hcps": args.hcps, "interactions_per_hcp": args.interactions, "requests": args.requests,
+            "concurrency": args.concurrency, "llm_latency": args.llm_latency, "llm_jitter": args.llm_jitter,
+        },
+        "scenarios": results,
+    }
+
+
+HEADER = f"{'scenario':<22}{'reqs':>7}{'err':>6}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+
+
+def print_row(name: str, result: Dict[str, Any]) -> None:
+    print(f"{name:<22}{result['requests']:>7}{result['errors']:>6}{result['rps']:>10}"
+          f"{result['p50_ms']:>10}{result['p95_ms']:>10}{result['p99_ms']:>10}")
+
+
+def print_comparison(baseline: Dict[str, Any], current: Dict[str, Any]) -> None:
+    print(f"\nCompared with {baseline.get('revision') or 'baseline'} (negative latency change is better):")
+    print(f"{'scenario':<22}{'rps':>12}{'p50':>10}{'p95':>10}{'p99':>10}")
+
+    def change(key, name):
+        before = baseline["scenarios"][name][key]
+        after = current["scenarios"][name][key]
+        return f"{100 * (after - before) / before:+.1f}%" if before else "n/a"
+
+    for name in current["scenarios"]:
+        if name in baseline.get("scenarios", {}):
+            print(f"{name:<22}{change('rps', name):>12}{change('p50_ms', name):>10}"
+                  f"{change('p95_ms', name):>10}{change('p99_ms', name):>10}")
+    if baseline.get("config") != current["config"]:
+        print("warning: the two runs used different settings; see the 'config' of each report.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", help=f"Comma-separated subset of: {', '.join(SCENARIOS)}")
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per scenario.")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--hcps", type=int, default=200)
+    parser.add_argument("--interactions", type=int, default=50, help="Seeded interactions per HCP.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reseed", action="store_true", help="Recreate the database even if it has data.")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Seconds each fake LLM call takes.")
+    parser.add_argument("--llm-jitter", type=float, default=0.0, help="Extra random seconds per fake LLM call.")
+    parser.add_argument("--output", help="Write the report as JSON to this file.")
+    parser.add_argument("--compare", help="A report written by --output to compare against.")
+    args = parser.parse_args()
+
+    print(HEADER)
+    report = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Query-plan regression check for the hot reads on hcp_interactions.
+
+Seeds a large table through the migrations, then EXPLAINs the history, summary,
+briefing, interaction list, rollup and semantic-sync queries and checks that
+each one reads through the index it was built for, and (where it pages newest
+first) without sorting. Prints every plan and exits non-zero on a regression,
+so it can run in CI. Works on SQLite and MySQL (set DATABASE_URL to check the
+production engine; with --no-seed it only reads, against an existing database).
+
+    cd backend
+    python -m benchmarks.query_plans --rows 50000
+"""
+import argparse
+import sys
+from datetime import date, datetime, timedelta
+from typing import List, NamedTuple
+
+from benchmarks import environment  # noqa: F401
+from benchmarks.seed import hcp_names, seed_database  # noqa: E402
+from sqlalchemy import func, text  # noqa: E402
+from sqlalchemy.orm import Query, Session  # noqa: E402
+from app import models  # noqa: E402
+from app.agents.fetch_hcp_history_tool import filter_history  # noqa: E402
+from app.core.names import normalize_hcp_name  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from app.pagination import NEWEST_FIRST, apply_cursor, encode_cursor  # noqa: E402
+from app.services.interaction_rows import projected_query  # noqa: E402
+
+M = models.HCPInteraction
+
+
+class Check(NamedTuple):
+    label: str
+    query: Query
+    index: str
+    # Ordered pages must come straight off the index, without a sort step.
+    ordered: bool
+
+
+def checks(db: Session) -> List[Check]:
+    name = hcp_names(1)[0]
+    newest = projected_query(db).order_by(*NEWEST_FIRST).first()
+    cursor = encode_cursor(newest)
+
+    def history(**filters) -> Query:
+        return filter_history(db, projected_query(db), name, **filters).order_by(*NEWEST_FIRST)
+
+    by_name, by_date = "ix_hcp_interactions_name_date_time_id", "ix_hcp_interactions_date_time_id"
+    return [
+        Check("history / summary page 1", history().limit(11), by_name, True),
+        Check("history cursor page", apply_cursor(history(), cursor).limit(11), by_name, True),
+        Check("history date range", history(start_date=date(2024, 3, 1), end_date=date(2024, 9, 1)).limit(11),
+              by_name, True),
+        Check("briefing (exact name)", history(exact_name=True).limit(11), by_name, True),
+        Check("list page 1", projected_query(db).order_by(*NEWEST_FIRST).limit(100), by_date, True),
+        Check("list cursor page", apply_cursor(projected_query(db).order_by(*NEWEST_FIRST), cursor).limit(100),
+              by_date, True),
+        Check("rollup recompute", db.query(M.interaction_type, func.count(M.id)).filter(
+            M.hcp_name_normalized == normalize_hcp_name(name),
+            M.date >= date(2024, 1, 1), M.date <= date(2024, 1, 31),
+        ).group_by(M.interaction_type), by_name, False),
+        Check("semantic index sync", db.query(M.id).filter(
+            M.updated_at >= datetime.utcnow() - timedelta(minutes=1)
+        ), "ix_hcp_interactions_updated_at", False),
+    ]
+
+
+def explain(db: Session, query: Query) -> List[str]:
+    """The plan of `query`, one line per step."""
+    sql = str(query.statement.compile(dialect=db.bind.dialect, compile_kwargs={"literal_binds": True}))
+    if db.bind.dialect.name == "sqlite":
+        return [row.detail for row in db.execute(text("EXPLAIN QUERY PLAN " + sql))]
+    return [
+        f"{row.table}: type={row.type} key={row.key} extra={row.Extra}"
+        for row in db.execute(text("EXPLAIN " + sql))
+    ]
+
+
+def problems(check: Check, plan: List[str]) -> List[str]:
+    found = []
+    joined = "\n".join(plan)
+    if check.index not in joined:
+        found.append(f"does not use {check.index}")
+    for step in plan:
+        # SQLite "SCAN hcp_interactions" / MySQL "type=ALL": every row is read.
+        if step == f"SCAN {M.__tablename__}" or "type=ALL" in step:
+            found.append(f"full scan: {step}")
+        if check.ordered and ("TEMP B-TREE FOR ORDER BY" in step or "Using filesort" in step):
+            found.append(f"sorts instead of reading in index order: {step}")
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--no-seed", action="store_true", help="Check the database as it is.")
+    args = parser.parse_args()
+
+    if not args.no_seed:
+        seed_database(hcp_count=max(args.rows // 50, 1), interactions_per_hcp=50)
+    failures = 0
+    with SessionLocal() as db:
+        if db.bind.dialect.name == "sqlite":
+            # Plans depend on table statistics, as they would after MySQL's ANALYZE.
+            db.execute(text("ANALYZE"))
+        for check in checks(db):
+            plan = explain(db, check.query)
+            found = problems(check, plan)
+            failures += bool(found)
+            print(f"{'FAIL' if found else 'ok':<6}{check.label}")
+            for step in plan:
+                print(f"        {step}")
+            for problem in found:
+                print(f"      ! {problem}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Fills the configured database with N HCPs × M interactions of deterministic data.
+
+    cd backend
+    DATABASE_URL=sqlite:///bench.db python -m benchmarks.seed --hcps 200 --interactions 50
+"""
+import argparse
+import random
+from datetime import date, timedelta
+from typing import Any, Dict, Iterator, List
+
+from benchmarks import environment  # noqa: F401
+from app import models  # noqa: E402
+from app.database import Base, SessionLocal, engine  # noqa: E402
+from app.migrations import upgrade  # noqa: E402
+from app.services.bulk_ingest import BulkIngestor  # noqa: E402
+
+TOPICS = [
+    "CardioPlus efficacy data", "OncoBoost patient eligibility", "NeuroCalm side effects",
+    "Formulary access for CardioPlus", "Dosing questions on OncoBoost", "Upcoming symposium",
+]
+MATERIALS = ["efficacy brochure", "dosing guide", "clinical trial summary", "patient leaflet"]
+SAMPLES = ["CardioPlus 10mg", "OncoBoost starter kit", "NeuroCalm 5mg"]
+OUTCOMES = ["Agreed to review the data.", "Will prescribe to two patients.", "Needs more safety data.", ""]
+
+
+def hcp_names(hcp_count: int) -> List[str]:
+    return [f"Dr. Bench {number:05d}" for number in range(hcp_count)]
+
+
+def generate_interactions(hcp_count: int, interactions_per_hcp: int, seed: int = 42) -> Iterator[Dict[str, Any]]:
+    rng = random.Random(seed)
+    start = date(2024, 1, 1)
+    for name in hcp_names(hcp_count):
+        for _ in range(interactions_per_hcp):
+            yield {
+                "hcp_name": name,
+                "interaction_type": rng.choice(["Meeting", "Call", "Virtual"]),
+                "date": (start + timedelta(days=rng.randrange(600))).isoformat(),
+                "time": f"{rng.randrange(8, 18):02d}:{rng.choice(['00', '15', '30', '45'])}",
+                "attendees": [name, "Rep A"],
+                "topics_discussed": rng.choice(TOPICS),
+                "materials_shared": rng.sample(MATERIALS, rng.randrange(3)),
+                "samples_distributed": rng.sample(SAMPLES, rng.randrange(2)),
+                "sentiment": rng.choice(["Positive", "Neutral", "Negative"]),
+                "outcomes": rng.choice(OUTCOMES) or None,
+            }
+
+
+def seed_database(hcp_count: int, interactions_per_hcp: int, seed: int = 42, reset: bool = True) -> Dict[str, Any]:
+    """Recreates the tables (unless `reset` is False) and bulk-inserts the generated rows."""
+    if reset:
+        Base.metadata.drop_all(bind=engine)
+    upgrade(engine)
+
+    ingestor = BulkIngestor(transaction_size=2000)
+    chunk = []
+    with SessionLocal() as db:
+        for index, payload in enumerate(generate_interactions(hcp_count, interactions_per_hcp, seed)):
+            chunk.append((index, payload))
+            if len(chunk) == 2000:
+                ingestor.add_chunk(db, chunk)
+                chunk = []
+        ingestor.add_chunk(db, chunk)
+        report = ingestor.finish(db)
+    if report["failed"]:
+        raise RuntimeError(f"Seeding failed for {report['failed']} rows: {report['errors'][:3]}")
+    return {"hcps": hcp_count, "interactions": report["inserted"]}
+
+
+def database_is_seeded() -> bool:
+    upgrade(engine)
+    with SessionLocal() as db:
+        return db.query(models.HCPInteraction.id).first() is not None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hcps", type=int, default=200)
+    parser.add_argument("--interactions", type=int, default=50, help="Interactions per HCP.")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    result = seed_database(args.hcps, args.interactions, args.seed)
+    print(f"Seeded {result['interactions']} interactions for {result['hcps']} HCPs into {engine.url}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Build, startup, incremental sync and query cost of the local semantic index.
+
+For each table size: a full build, the first search from a freshly started
+process's view of the on-disk index (memory-mapped, nothing re-embedded), the
+sync after editing a handful of rows, and search latency unfiltered and narrowed
+to one HCP. Seeded rows are backdated, so the sync only reads the edits.
+
+    cd backend
+    python -m benchmarks.semantic_search --rows 10000,50000 --queries 50
+"""
+import argparse
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from benchmarks import environment  # noqa: F401
+from benchmarks.seed import hcp_names, seed_database  # noqa: E402
+from sqlalchemy import update  # noqa: E402
+from app import models  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from app.services import semantic_index as semantic  # noqa: E402
+from app.services.semantic_index import SemanticIndex  # noqa: E402
+
+QUERIES = ["CardioPlus side effects", "OncoBoost dosing", "formulary access", "patient eligibility", "symposium"]
+M = models.HCPInteraction
+
+
+def percentiles(latencies):
+    ordered = sorted(latencies)
+    return ordered[len(ordered) // 2] * 1000, ordered[max(int(len(ordered) * 0.95) - 1, 0)] * 1000
+
+
+def timed_queries(fn, queries: int):
+    latencies = []
+    for number in range(queries):
+        started = time.perf_counter()
+        fn(QUERIES[number % len(QUERIES)])
+        latencies.append(time.perf_counter() - started)
+    return percentiles(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", default="10000,50000", help="Comma-separated table sizes to test.")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--edits", type=int, default=20, help="Rows edited before the incremental sync.")
+    args = parser.parse_args()
+
+    print(f"{'rows':>8}{'build s':>9}{'open+1st ms':>13}{'sync ms':>9}"
+          f"{'search p50/p95 ms':>19}{'one HCP p50/p95':>17}")
+    for rows in (int(value) for value in args.rows.split(",")):
+        seed_database(hcp_count=max(rows // 50, 1), interactions_per_hcp=50)
+        path = tempfile.mkdtemp(prefix="semantic-index-")
+        try:
+            with SessionLocal() as db:
+                # Spread the seeded rows over the past day, a thousand per timestamp.
+                day_ago = datetime.utcnow() - timedelta(days=1)
+                for first_id in range(1, rows + 1, 1000):
+                    db.execute(update(M).where(M.id >= first_id, M.id < first_id + 1000).values(
+                        updated_at=day_ago + timedelta(seconds=first_id)
+                    ))
+                db.commit()
+                index = SemanticIndex(path=path)
+                started = time.perf_counter()
+                index.rebuild(db)
+                build = time.perf_counter() - started
+
+                # A new instance over the same files, as after a restart.
+                started = time.perf_counter()
+                reopened = SemanticIndex(path=path)
+                reopened.search(db, QUERIES[0])
+                first_search = time.perf_counter() - started
+
+                db.execute(update(M).where(M.id <= args.edits).values(
+                    topics_discussed="Reported CardioPlus side effects in two patients", updated_at=datetime.utcnow()
+                ))
+                db.commit()
+                reopened.mark_dirty()
+                started = time.perf_counter()
+                reopened.sync(db)
+                sync = time.perf_counter() - started
+
+                semantic.semantic_index = reopened
+                search = timed_queries(lambda q: reopened.search(db, q, 10), args.queries)
+                one_hcp = timed_queries(
+                    lambda q: semantic.search_interactions(db, q, 10, hcp_name=hcp_names(1)[0]), args.queries
+                )
+        finally:
+            shutil.rmtree(path, ignore_errors=True)
+        print(f"{rows:>8}{build:>9.2f}{first_search * 1000:>13.1f}{sync * 1000:>9.1f}"
+              f"{search[0]:>10.1f}/{search[1]:<8.1f}{one_hcp[0]:>8.1f}/{one_hcp[1]:<8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Cost of reading and encoding a page of interactions, three ways:
+  orm + fastapi     - ORM objects with eager-loaded list items, validated through
+                      InteractionOut, then jsonable_encoder + JSONResponse (what a
+                      route returning the objects with response_model does)
+  orm + adapter     - the same objects, validated and dumped by a TypeAdapter
+                      (what the list route did before projected reads)
+  projected+orjson  - InteractionOut's columns as rows, to_dicts, orjson
+
+All three bodies are decoded and compared before timing, for every page size.
+
+    cd backend
+    python -m benchmarks.serialization --sizes 100,1000,10000 --repeat 20
+"""
+import argparse
+import time
+from typing import List
+
+import orjson
+
+from benchmarks import environment  # noqa: F401
+from benchmarks.seed import seed_database  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from pydantic import TypeAdapter  # noqa: E402
+from app import crud, schemas  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from app.services.interaction_rows import to_dicts  # noqa: E402
+
+INTERACTION_LIST = TypeAdapter(List[schemas.InteractionOut])
+
+
+def orm_fastapi(db, limit: int) -> bytes:
+    interactions = crud.get_all_interactions(db, limit=limit)
+    validated = [schemas.InteractionOut.model_validate(interaction) for interaction in interactions]
+    return JSONResponse(jsonable_encoder(validated)).body
+
+
+def orm_adapter(db, limit: int) -> bytes:
+    interactions = crud.get_all_interactions(db, limit=limit)
+    return INTERACTION_LIST.dump_json(INTERACTION_LIST.validate_python(interactions, from_attributes=True))
+
+
+def projected_orjson(db, limit: int) -> bytes:
+    return orjson.dumps(to_dicts(db, crud.get_all_interactions(db, limit=limit, projected=True)))
+
+
+PATHS = [("orm + fastapi", orm_fastapi), ("orm + adapter", orm_adapter), ("projected+orjson", projected_orjson)]
+
+
+def timed(fn, db, limit: int, repeat: int):
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(db, limit)
+        latencies.append(time.perf_counter() - started)
+        # Each read starts from an empty identity map, as a request's session does.
+        db.expire_all()
+        db.expunge_all()
+    ordered = sorted(latencies)
+    return ordered[len(ordered) // 2] * 1000, ordered[max(int(len(ordered) * 0.95) - 1, 0)] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="100,1000,10000", help="Comma-separated page sizes to test.")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    sizes = [int(value) for value in args.sizes.split(",")]
+    seed_database(hcp_count=max(max(sizes) // 50, 1), interactions_per_hcp=50)
+    print(f"list items read: {settings.LIST_ITEMS_READ_ENABLED}")
+    print(f"{'rows':>7}  {'path':<18}{'p50 ms':>9}{'p95 ms':>9}{'speedup':>9}")
+    with SessionLocal() as db:
+        for limit in sizes:
+            bodies = []
+            for _, fn in PATHS:
+                bodies.append(orjson.loads(fn(db, limit)))
+                db.expunge_all()
+            if any(body != bodies[0] for body in bodies[1:]):
+                raise SystemExit(f"bodies differ at {limit} rows")
+
+            baseline = None
+            for label, fn in PATHS:
+                p50, p95 = timed(fn, db, limit, args.repeat)
+                baseline = baseline or p50
+                print(f"{limit:>7}  {label:<18}{p50:>9.2f}{p95:>9.2f}{baseline / p50:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
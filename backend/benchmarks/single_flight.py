@@ -0,0 +1,99 @@
+"""
+Checks that concurrent identical AI requests share one upstream LLM call.
+
+Fires N concurrent GET /interactions/ai/summary/{hcp_name} and
+/ai/suggestions/{hcp_name} requests (with name variants that normalize to the
+same HCP) and counts the fake LLM's calls, then repeats with a failing LLM to
+show every caller receives the same error. Exits non-zero if either check fails.
+
+    cd backend
+    python -m benchmarks.single_flight --callers 50 --llm-latency 0.2
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+import httpx
+
+from benchmarks import environment  # noqa: F401
+from benchmarks.fake_llm import install_fake_llms  # noqa: E402
+from benchmarks.seed import seed_database  # noqa: E402
+from app.core.config import settings  # noqa: E402
+from app.core.llm_cache import llm_cache  # noqa: E402
+from app.core.single_flight import SingleFlight  # noqa: E402
+from app.main import app  # noqa: E402
+
+HCP = "Dr. Bench 00001"
+VARIANTS = [HCP, "dr. bench 00001", "DR BENCH 00001", "Dr.  Bench 00001"]
+
+
+async def coalesced_route(client: httpx.AsyncClient, route: str, tool: str, fakes, callers: int) -> bool:
+    llm_cache.invalidate_hcp(HCP)
+    before = fakes[tool].calls
+    started = time.perf_counter()
+    responses = await asyncio.gather(*(
+        client.get(f"/interactions/ai/{route}/{VARIANTS[number % len(VARIANTS)]}") for number in range(callers)
+    ))
+    elapsed = time.perf_counter() - started
+    upstream_calls = fakes[tool].calls - before
+    bodies = {response.text for response in responses}
+    ok = upstream_calls == 1 and all(r.status_code == 200 for r in responses) and len(bodies) == 1
+    print(f"{route:<12} {callers} callers -> {upstream_calls} LLM call(s), "
+          f"{len(bodies)} distinct body, {elapsed * 1000:.1f} ms  {'OK' if ok else 'FAIL'}")
+    return ok
+
+
+async def uncoalesced_baseline(tool_fn, tool: str, fakes, callers: int) -> None:
+    llm_cache.invalidate_hcp(HCP)
+    before = fakes[tool].calls
+    # __wrapped__ is the tool without the single-flight decorator.
+    await asyncio.gather(*(tool_fn.__wrapped__(hcp_name=HCP) for _ in range(callers)))
+    print(f"{'(baseline)':<12} {callers} callers without coalescing -> {fakes[tool].calls - before} LLM call(s)")
+
+
+async def errors_propagate(callers: int) -> bool:
+    group = SingleFlight()
+    runs = 0
+
+    async def failing():
+        nonlocal runs
+        runs += 1
+        await asyncio.sleep(0.05)
+        raise RuntimeError("upstream failed")
+
+    results = await asyncio.gather(*(group.run(("failing", 1), failing) for _ in range(callers)),
+                                   return_exceptions=True)
+    ok = runs == 1 and all(isinstance(r, RuntimeError) for r in results) and group.in_flight() == 0
+    print(f"{'errors':<12} {callers} callers -> {runs} run(s), "
+          f"{sum(isinstance(r, RuntimeError) for r in results)} received the error  {'OK' if ok else 'FAIL'}")
+    return ok
+
+
+async def run(args) -> bool:
+    # Measure the live routes; stored briefings would answer from the database.
+    settings.BRIEFING_STORE_ENABLED = False
+    fakes = install_fake_llms(latency=args.llm_latency)
+    seed_database(hcp_count=5, interactions_per_hcp=10)
+    from app.agents.summarize_history_tool import summarize_history_tool
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        ok = await coalesced_route(client, "summary", "summarize_history_tool", fakes, args.callers)
+        ok &= await coalesced_route(client, "suggestions", "suggest_next_action_tool", fakes, args.callers)
+    await uncoalesced_baseline(summarize_history_tool, "summarize_history_tool", fakes, args.callers)
+    ok &= await errors_propagate(args.callers)
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--callers", type=int, default=50)
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    args = parser.parse_args()
+    if not asyncio.run(run(args)):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
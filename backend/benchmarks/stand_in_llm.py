@@ -0,0 +1,143 @@
+"""
+A local, Groq-compatible chat completions server for tests and benchmarks.
+
+Answers POST /openai/v1/chat/completions (plain and streamed) after a fixed
+latency, with the canned response of the tool whose prompt it recognises, and
+counts the distinct client connections it has seen. With --rpm/--tpm it enforces
+a per-minute quota like Groq's, answering 429 with Retry-After when exceeded.
+Point the backend at it with LLM_BASE_URL:
+
+    cd backend
+    python -m benchmarks.stand_in_llm --port 8600 --latency 0.05 --rpm 30 --tpm 15000
+    LLM_BASE_URL=http://127.0.0.1:8600 uvicorn app.main:app
+"""
+import argparse
+import asyncio
+import json
+import socket
+import threading
+import time
+from typing import Optional, Set
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from benchmarks import environment  # noqa: F401
+from benchmarks.fake_llm import CANNED_RESPONSES  # noqa: E402
+
+# A phrase from each tool's prompt, used to pick the canned answer; checked in order.
+PROMPT_MARKERS = {
+    "summarize_history_tool": "relationship_status",
+    "suggest_next_action_tool": "suggestions",
+    "edit_interaction_tool": "command",
+    "conversation_tool": "materials_shared",
+    "log_interaction_tool": "hcp_name",
+}
+
+
+def _answer_for(prompt: str) -> str:
+    for tool_name, marker in PROMPT_MARKERS.items():
+        if marker in prompt:
+            return f"```json\n{json.dumps(CANNED_RESPONSES[tool_name])}\n```"
+    return "```json\n{}\n```"
+
+
+class Quota:
+    """Provider-side per-minute limit, refilled continuously."""
+
+    def __init__(self, per_minute: Optional[int]):
+        self.per_minute = per_minute
+        self.available = float(per_minute or 0)
+        self.updated_at = time.monotonic()
+
+    def try_take(self, amount: float) -> Optional[float]:
+        """Takes `amount` and returns None, or returns the seconds until it would fit."""
+        if not self.per_minute:
+            return None
+        now = time.monotonic()
+        self.available = min(self.per_minute, self.available + (now - self.updated_at) * self.per_minute / 60)
+        self.updated_at = now
+        if self.available >= amount:
+            self.available -= amount
+            return None
+        return (amount - self.available) * 60 / self.per_minute
+
+
+class StandInLLM:
+    def __init__(self, latency: float = 0.0, rpm: Optional[int] = None, tpm: Optional[int] = None):
+        self.latency = latency
+        self.requests = 0
+        self.rejected = 0
+        self.connections: Set[tuple] = set()
+        self.request_quota = Quota(rpm)
+        self.token_quota = Quota(tpm)
+        self.app = Starlette(routes=[Route("/openai/v1/chat/completions", self.completions, methods=["POST"])])
+
+    async def completions(self, request: Request):
+        self.requests += 1
+        self.connections.add(request.scope.get("client"))
+        body = await request.json()
+        prompt = "".join(message.get("content") or "" for message in body.get("messages", []))
+        content = _answer_for(prompt)
+        usage = {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4}
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        wait = self.request_quota.try_take(1) or self.token_quota.try_take(usage["total_tokens"])
+        if wait:
+            self.rejected += 1
+            return JSONResponse(
+                {"error": {"message": "Rate limit reached.", "type": "tokens", "code": "rate_limit_exceeded"}},
+                status_code=429, headers={"retry-after": f"{wait:.2f}"},
+            )
+        await asyncio.sleep(self.latency)
+        base = {"id": f"stand-in-{self.requests}", "created": int(time.time()), "model": body.get("model")}
+        if body.get("stream"):
+            return StreamingResponse(self._stream(base, content, usage), media_type="text/event-stream")
+        return JSONResponse({
+            **base,
+            "object": "chat.completion",
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": usage,
+        })
+
+    async def _stream(self, base, content: str, usage):
+        for start in range(0, len(content), 16):
+            chunk = {**base, "object": "chat.completion.chunk", "choices": [
+                {"index": 0, "delta": {"content": content[start:start + 16]}, "finish_reason": None}
+            ]}
+            yield f"data: {json.dumps(chunk)}\n\n"
+        last = {**base, "object": "chat.completion.chunk",
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}], "x_groq": {"usage": usage}}
+        yield f"data: {json.dumps(last)}\n\ndata: [DONE]\n\n"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_in_thread(stand_in: StandInLLM, port: Optional[int] = None) -> str:
+    """Serves `stand_in` from a daemon thread and returns its base URL once it is up."""
+    port = port or free_port()
+    server = uvicorn.Server(uvicorn.Config(stand_in.app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return f"http://127.0.0.1:{port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds before each answer.")
+    parser.add_argument("--rpm", type=int, default=None, help="Requests per minute before answering 429.")
+    parser.add_argument("--tpm", type=int, default=None, help="Tokens per minute before answering 429.")
+    args = parser.parse_args()
+    uvicorn.run(StandInLLM(args.latency, args.rpm, args.tpm).app, host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+"""
+Shared setup for the backend tests: a throwaway SQLite database (see
+benchmarks/environment.py) and fake LLMs, so they run without MySQL or Groq.
+
+    cd backend
+    python -m pytest
+"""
+import pytest
+
+from benchmarks import environment  # noqa: F401
+from benchmarks.fake_llm import install_fake_llms  # noqa: E402
+
+
+@pytest.fixture
+def fake_llms():
+    """Fresh fake LLMs for every agent tool, by tool name; each counts its `calls`."""
+    return install_fake_llms(latency=0.05)
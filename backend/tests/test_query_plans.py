@@ -0,0 +1,17 @@
+from sqlalchemy import text
+
+from benchmarks.query_plans import checks, explain, problems
+from benchmarks.seed import seed_database
+from app.database import SessionLocal
+
+
+def test_hot_reads_use_their_indexes():
+    seed_database(hcp_count=100, interactions_per_hcp=50)
+    failures = []
+    with SessionLocal() as db:
+        # Plans depend on table statistics, as they would after MySQL's ANALYZE.
+        db.execute(text("ANALYZE"))
+        for check in checks(db):
+            plan = explain(db, check.query)
+            failures.extend(f"{check.label}: {problem} (plan: {plan})" for problem in problems(check, plan))
+    assert not failures, "\n".join(failures)
@@ -0,0 +1,61 @@
+import asyncio
+
+import httpx
+import pytest
+
+from benchmarks.seed import seed_database
+from benchmarks.single_flight import HCP, VARIANTS
+from app.core.llm_cache import llm_cache
+from app.core.single_flight import SingleFlight
+from app.main import app
+
+CALLERS = 20
+
+
+@pytest.fixture(scope="module", autouse=True)
+def seeded():
+    seed_database(hcp_count=5, interactions_per_hcp=10)
+
+
+async def _get_concurrently(route: str):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        # Name variants that normalize to the same HCP share one computation too.
+        return await asyncio.gather(*(
+            client.get(f"/interactions/ai/{route}/{VARIANTS[number % len(VARIANTS)]}") for number in range(CALLERS)
+        ))
+
+
+@pytest.mark.parametrize("route, tool", [
+    ("summary", "summarize_history_tool"),
+    ("suggestions", "suggest_next_action_tool"),
+])
+def test_concurrent_identical_requests_make_one_llm_call(fake_llms, route, tool):
+    llm_cache.invalidate_hcp(HCP)
+    responses = asyncio.run(_get_concurrently(route))
+
+    assert [response.status_code for response in responses] == [200] * CALLERS
+    assert len({response.text for response in responses}) == 1
+    assert fake_llms[tool].calls == 1
+
+
+def test_every_caller_receives_the_leaders_error():
+    group = SingleFlight()
+    runs = 0
+
+    async def failing():
+        nonlocal runs
+        runs += 1
+        await asyncio.sleep(0.05)
+        raise RuntimeError("upstream failed")
+
+    async def call_concurrently():
+        return await asyncio.gather(
+            *(group.run(("failing", 1), failing) for _ in range(CALLERS)), return_exceptions=True
+        )
+
+    results = asyncio.run(call_concurrently())
+
+    assert runs == 1
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert group.in_flight() == 0